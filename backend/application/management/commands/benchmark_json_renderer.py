@@ -0,0 +1,99 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from application.utils.fast_json import ORJSONRenderer
+
+SURNAMES = ["पाटील", "जाधव", "कुलकर्णी", "शिंदे", "पवार", "देशमुख"]
+NAMES = ["राम", "सीता", "गणेश", "सुनीता", "विठ्ठल", "लक्ष्मी"]
+TAGS = ["Green", "Orange", "Red", "Golden", "White", None]
+
+
+def synthetic_row(i):
+    """A voter_rows() dict (Marathi variant) with realistic field sizes."""
+    surname, name = random.choice(SURNAMES), random.choice(NAMES)
+    mobile = f"9{random.randint(100000000, 999999999)}" if i % 3 else None
+    return {
+        "sr_no": i,
+        "voter_list_id": i,
+        "voter_id": f"XYZ{i:07d}",
+        "first_name": name,
+        "last_name": surname,
+        "voter_name_eng": f"{surname} {name} {random.choice(NAMES)}",
+        "kramank": f"37/{i // 1000}/{i}",
+        "age": str(random.randint(18, 90)),
+        "gender": random.choice(["पुरुष", "स्त्री"]),
+        "ward_id": 12,
+        "tag": random.choice(TAGS),
+        "badge": None,
+        "location": random.choice(["रिमोट", "स्थानिक"]),
+        "show_whatsapp": mobile is not None,
+        "mobile_no": f"91{mobile}" if mobile else None,
+    }
+
+
+def voters_info_payload(rows):
+    return {
+        "status": True,
+        "source": "db",
+        "page": 1,
+        "page_size": len(rows),
+        "total_pages": 1200,
+        "total_records": 120000,
+        "records_returned": len(rows),
+        "data": rows,
+        "generated_at": timezone.now(),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSONRenderer with the orjson renderer on voters_info payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=100, help="Rows per page")
+        parser.add_argument("--iterations", type=int, default=500)
+        parser.add_argument(
+            "--from-db",
+            action="store_true",
+            help="Render real voters (first page of final_voter_list) instead of synthetic rows",
+        )
+
+    def _rows(self, size, from_db):
+        if not from_db:
+            return [synthetic_row(i) for i in range(1, size + 1)]
+
+        from application.models import VoterList
+        from application.utils.voter_rows import project_voters, voter_rows
+        qs = project_voters(VoterList.objects.order_by("sr_no"), True)[:size]
+        return voter_rows(qs, True, localize_location=True)
+
+    def _time(self, renderer, payload, iterations):
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                body = renderer.render(payload, "application/json", {})
+            best = min(best, time.perf_counter() - start)
+        return best / iterations, body
+
+    def handle(self, *args, **options):
+        payload = voters_info_payload(self._rows(options["size"], options["from_db"]))
+        iterations = options["iterations"]
+
+        drf_time, drf_body = self._time(JSONRenderer(), payload, iterations)
+        orjson_time, orjson_body = self._time(ORJSONRenderer(), payload, iterations)
+
+        if json.loads(drf_body) != json.loads(orjson_body):
+            self.stdout.write(self.style.ERROR("Renderers produced different JSON"))
+
+        self.stdout.write(f"Rows per page : {options['size']}")
+        self.stdout.write(f"Body size     : {len(drf_body)} bytes (drf) / {len(orjson_body)} bytes (orjson)")
+        self.stdout.write(f"JSONRenderer  : {drf_time * 1e6:8.1f} µs / page")
+        self.stdout.write(f"ORJSONRenderer: {orjson_time * 1e6:8.1f} µs / page")
+        self.stdout.write(
+            self.style.SUCCESS(f"Speed-up      : {drf_time / orjson_time:.1f}x")
+        )
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from application.models import VoterList
+from application.utils.display_columns import DISPLAY_COLUMNS, display_values
+
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        "Add and backfill the Marathi display columns "
+        "(first/middle/last_name_mar, location_mar)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every voter, not only the ones never backfilled",
+        )
+
+    def handle(self, *args, **options):
+
+        # final_voter_list is unmanaged, so the columns are added here
+        with connection.cursor() as cursor:
+            for column in DISPLAY_COLUMNS:
+                cursor.execute(
+                    f"ALTER TABLE final_voter_list ADD COLUMN IF NOT EXISTS {column} text"
+                )
+
+        qs = VoterList.objects.all()
+        if not options["all"]:
+            # location_mar is never NULL once computed
+            qs = qs.filter(location_mar__isnull=True)
+
+        total_done = 0
+        batch = []
+
+        for voter_list_id, voter_name_marathi, location in (
+            qs.order_by("voter_list_id")
+            .values_list("voter_list_id", "voter_name_marathi", "location")
+            .iterator(chunk_size=BATCH_SIZE)
+        ):
+            batch.append(VoterList(
+                voter_list_id=voter_list_id,
+                **display_values(voter_name_marathi, location),
+            ))
+
+            if len(batch) >= BATCH_SIZE:
+                VoterList.objects.bulk_update(batch, DISPLAY_COLUMNS)
+                total_done += len(batch)
+                batch = []
+                self.stdout.write(f"✔ Backfilled {total_done} voters", ending="\r")
+
+        if batch:
+            VoterList.objects.bulk_update(batch, DISPLAY_COLUMNS)
+            total_done += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"\n🎉 Display columns ready | Updated: {total_done}")
+        )
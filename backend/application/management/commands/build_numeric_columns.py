@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from application.models import VoterList
+from application.utils.numeric_columns import NUMERIC_COLUMNS, numeric_values
+
+BATCH_SIZE = 2000
+
+# final_voter_list is unmanaged, so the columns and indexes live here
+# instead of in a migration; every statement is idempotent
+INDEXES = [
+    ("fvl_age_num", "(age_num)"),
+    ("fvl_kramank_serial_num", "(kramank_serial_num)"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Add, backfill and index the integer shadow columns "
+        "(age_num, kramank_serial_num)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every voter, not only the ones never backfilled",
+        )
+
+    def handle(self, *args, **options):
+
+        with connection.cursor() as cursor:
+            for column in NUMERIC_COLUMNS:
+                cursor.execute(
+                    f"ALTER TABLE final_voter_list ADD COLUMN IF NOT EXISTS {column} integer"
+                )
+
+        qs = VoterList.objects.all()
+        if not options["all"]:
+            qs = qs.filter(age_num__isnull=True, kramank_serial_num__isnull=True)
+
+        total_done = 0
+        batch = []
+
+        for voter_list_id, age_eng, kramank in (
+            qs.order_by("voter_list_id")
+            .values_list("voter_list_id", "age_eng", "kramank")
+            .iterator(chunk_size=BATCH_SIZE)
+        ):
+            batch.append(VoterList(
+                voter_list_id=voter_list_id,
+                **numeric_values(age_eng, kramank),
+            ))
+
+            if len(batch) >= BATCH_SIZE:
+                VoterList.objects.bulk_update(batch, NUMERIC_COLUMNS)
+                total_done += len(batch)
+                batch = []
+                self.stdout.write(f"✔ Backfilled {total_done} voters", ending="\r")
+
+        if batch:
+            VoterList.objects.bulk_update(batch, NUMERIC_COLUMNS)
+            total_done += len(batch)
+
+        self.stdout.write("\nCreating indexes...")
+        with connection.cursor() as cursor:
+            for name, columns in INDEXES:
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON final_voter_list {columns}"
+                )
+            cursor.execute("ANALYZE final_voter_list")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"🎉 Numeric columns ready | Updated: {total_done}")
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from application.utils.progress_rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the daily progress rollup (voter_progress_daily) and rebuild "
+        "it from the tag changes in voter_activity_log"
+    )
+
+    def handle(self, *args, **options):
+
+        with transaction.atomic():
+            rows = rebuild_rollup()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"🎉 Progress rollup rebuilt | Rows: {rows}")
+        )
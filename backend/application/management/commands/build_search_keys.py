@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from application.models import VoterList
+from application.utils.name_index import invalidate_name_index
+from application.utils.phonetic import name_phonetic_codes
+from application.utils.transliteration import marathi_name_key
+
+BATCH_SIZE = 2000
+
+KEY_COLUMNS = ["voter_name_translit", "voter_name_phonetic"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Add and backfill the name search key columns "
+        "(voter_name_translit, voter_name_phonetic) and index them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute keys for every voter, not only the missing ones",
+        )
+
+    def handle(self, *args, **options):
+
+        with connection.cursor() as cursor:
+            for column in KEY_COLUMNS:
+                cursor.execute(
+                    f"ALTER TABLE final_voter_list ADD COLUMN IF NOT EXISTS {column} text"
+                )
+
+        qs = VoterList.objects.all()
+        if not options["all"]:
+            qs = qs.filter(voter_name_phonetic__isnull=True)
+
+        total_done = 0
+        batch = []
+
+        for voter_list_id, name_eng, name_marathi in (
+            qs.order_by("voter_list_id")
+            .values_list("voter_list_id", "voter_name_eng", "voter_name_marathi")
+            .iterator(chunk_size=BATCH_SIZE)
+        ):
+            batch.append(VoterList(
+                voter_list_id=voter_list_id,
+                voter_name_translit=marathi_name_key(name_marathi),
+                voter_name_phonetic=name_phonetic_codes(name_eng, name_marathi),
+            ))
+
+            if len(batch) >= BATCH_SIZE:
+                VoterList.objects.bulk_update(batch, KEY_COLUMNS)
+                total_done += len(batch)
+                batch = []
+                self.stdout.write(f"✔ Keys built for {total_done} voters", ending="\r")
+
+        if batch:
+            VoterList.objects.bulk_update(batch, KEY_COLUMNS)
+            total_done += len(batch)
+
+        self.stdout.write("\nCreating trigram indexes...")
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for column in KEY_COLUMNS:
+                cursor.execute(
+                    f"""
+                    CREATE INDEX IF NOT EXISTS fvl_{column}_trgm
+                    ON final_voter_list USING gin ({column} gin_trgm_ops)
+                    """
+                )
+
+        invalidate_name_index()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"🎉 Search keys ready | Updated: {total_done}")
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from application.utils.etags import bump_master_data_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Invalidate the tag / role / religion / caste / occupation ETags "
+        "after editing those tables directly in the database"
+    )
+
+    def handle(self, *args, **options):
+
+        bump_master_data_version()
+
+        self.stdout.write(
+            self.style.SUCCESS("🎉 Master data version bumped")
+        )
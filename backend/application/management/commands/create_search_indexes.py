@@ -0,0 +1,99 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+# final_voter_list is unmanaged, so search objects are created here instead of
+# in migrations. Every statement is idempotent and safe to re-run.
+STATEMENTS = [
+    (
+        "pg_trgm extension",
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    ),
+    (
+        "search_vector column",
+        """
+        ALTER TABLE final_voter_list
+        ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector(
+                'simple'::regconfig,
+                coalesce(voter_name_eng, '') || ' ' ||
+                coalesce(voter_name_marathi, '') || ' ' ||
+                coalesce(voter_id, '')
+            )
+        ) STORED
+        """,
+    ),
+    (
+        "search_vector GIN index",
+        """
+        CREATE INDEX IF NOT EXISTS fvl_search_vector_gin
+        ON final_voter_list USING gin (search_vector)
+        """,
+    ),
+    (
+        "voter_name_eng trigram index",
+        """
+        CREATE INDEX IF NOT EXISTS fvl_voter_name_eng_trgm
+        ON final_voter_list USING gin (voter_name_eng gin_trgm_ops)
+        """,
+    ),
+    (
+        "voter_name_marathi trigram index",
+        """
+        CREATE INDEX IF NOT EXISTS fvl_voter_name_marathi_trgm
+        ON final_voter_list USING gin (voter_name_marathi gin_trgm_ops)
+        """,
+    ),
+    (
+        # matches the UPPER(...) LIKE UPPER(...) Django emits for __icontains
+        "voter_id trigram index",
+        """
+        CREATE INDEX IF NOT EXISTS fvl_voter_id_upper_trgm
+        ON final_voter_list USING gin (upper(voter_id::text) gin_trgm_ops)
+        """,
+    ),
+    (
+        # EPIC fast path: __iexact / __istartswith on voter_id (utils/id_lookup.py)
+        "voter_id normalized btree index",
+        """
+        CREATE INDEX IF NOT EXISTS fvl_voter_id_upper_pattern
+        ON final_voter_list (upper(voter_id::text) text_pattern_ops)
+        """,
+    ),
+    (
+        # kramank equality uses the unique constraint; this one serves prefixes
+        "kramank prefix index",
+        """
+        CREATE INDEX IF NOT EXISTS fvl_kramank_pattern
+        ON final_voter_list (kramank varchar_pattern_ops)
+        """,
+    ),
+    *[
+        (
+            # "ends with" filters: FilterSpec compiles them to
+            # REVERSE(LOWER(col)) LIKE 'rak%'
+            f"{column} reversed index",
+            f"""
+            CREATE INDEX IF NOT EXISTS fvl_{column}_rev
+            ON final_voter_list (reverse(lower({column})) text_pattern_ops)
+            """,
+        )
+        for column in ("first_name", "middle_name", "last_name")
+    ],
+]
+
+
+class Command(BaseCommand):
+    help = "Create pg_trgm / full-text search indexes on final_voter_list"
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            for label, sql in STATEMENTS:
+                self.stdout.write(f"Creating {label}...")
+                cursor.execute(sql)
+
+            cursor.execute("ANALYZE final_voter_list")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Search indexes ready ({len(STATEMENTS)} statements applied)")
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from application.utils.segments import create_segment_table
+
+
+class Command(BaseCommand):
+    help = "Create the saved segments table (voter_segment) if it does not exist"
+
+    def handle(self, *args, **options):
+
+        create_segment_table()
+
+        self.stdout.write(
+            self.style.SUCCESS("🎉 Segment table ready")
+        )
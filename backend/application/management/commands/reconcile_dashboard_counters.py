@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from application.utils.assignment_counts import invalidate_assignment_counts
+from application.utils.dashboard_counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the dashboard counters table (voter_dashboard_counter) and "
+        "rebuild it from final_voter_list"
+    )
+
+    def handle(self, *args, **options):
+
+        # one transaction: dashboards keep reading the old counters until
+        # the rebuilt ones are committed
+        with transaction.atomic():
+            rows = rebuild_counters()
+        invalidate_assignment_counts()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"🎉 Dashboard counters rebuilt | Rows: {rows}")
+        )
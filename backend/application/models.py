@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.contrib.postgres.fields import ArrayField
 from django.core.validators import RegexValidator
 from django.utils import timezone
 from django.db import models
@@ -59,7 +60,31 @@ class LoginAttempt(models.Model):
         return f"{self.key_type}:{self.key_value}"
 
 
-class Occupation(models.Model):
+class MasterDataModel(models.Model):
+    """
+    Dropdown master tables: every save() / delete() bumps the version the
+    master data ETags are built from (utils/etags.py). Queryset .update()
+    and raw SQL skip this; run `manage.py bump_master_data_version` after.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        from .utils.etags import bump_master_data_version
+
+        super().save(*args, **kwargs)
+        transaction.on_commit(bump_master_data_version)
+
+    def delete(self, *args, **kwargs):
+        from .utils.etags import bump_master_data_version
+
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(bump_master_data_version)
+        return result
+
+
+class Occupation(MasterDataModel):
 
     occupation_id = models.AutoField(primary_key=True)
 
@@ -73,7 +98,7 @@ class Occupation(models.Model):
         return self.occupation_name
 
 # roles list
-class Roles(models.Model):
+class Roles(MasterDataModel):
     role_id = models.AutoField(primary_key=True)
     role_name = models.CharField(
         max_length=100,
@@ -98,7 +123,7 @@ class Roles(models.Model):
         return self.role_name
 
 # voter tags list
-class VoterTag(models.Model):
+class VoterTag(MasterDataModel):
     tag_id = models.AutoField(primary_key=True)
 
     tag_name = models.CharField(max_length=20, unique=True)
@@ -122,7 +147,7 @@ class VoterTag(models.Model):
         return self.tag_name
 
 # voter_religion_master
-class Religion(models.Model):
+class Religion(MasterDataModel):
     religion_id = models.AutoField(primary_key=True)
     religion_name = models.CharField(max_length=100)
     religion_name_mar = models.CharField(max_length=150, null=True, blank=True)
@@ -133,7 +158,7 @@ class Religion(models.Model):
 
 
 # voter_caste_master
-class Caste(models.Model):
+class Caste(MasterDataModel):
     caste_id = models.AutoField(primary_key=True)
 
     religion = models.ForeignKey(
@@ -354,6 +379,24 @@ class VoterList(models.Model):
     matdankendra = models.TextField(null=True,blank=True)
     address_marathi = models.TextField(null=True, blank=True)
 
+    # phonetic latin keys of voter_name_marathi, see utils/transliteration.py
+    # (column added / backfilled by `manage.py build_search_keys`)
+    voter_name_translit = models.TextField(null=True, blank=True)
+    # fuzzy phonetic codes of both names, see utils/phonetic.py
+    voter_name_phonetic = models.TextField(null=True, blank=True)
+
+    # integer shadows of age_eng / kramank for indexed range queries,
+    # see utils/numeric_columns.py (`manage.py build_numeric_columns`)
+    age_num = models.IntegerField(null=True, blank=True)
+    kramank_serial_num = models.IntegerField(null=True, blank=True)
+
+    # Marathi display values (name split, localized location) for list rows,
+    # see utils/display_columns.py (`manage.py build_display_columns`)
+    first_name_mar = models.TextField(null=True, blank=True)
+    middle_name_mar = models.TextField(null=True, blank=True)
+    last_name_mar = models.TextField(null=True, blank=True)
+    location_mar = models.TextField(null=True, blank=True)
+
     class Meta:
         db_table = "final_voter_list"
         managed = False
@@ -363,16 +406,31 @@ class VoterList(models.Model):
 
     def save(self, *args, **kwargs):
 
-        # -------- FETCH OLD tag_id --------
+        # -------- FETCH OLD tag_id (dashboard counter key, indexed columns) --------
+        from .utils.facet_index import FACET_FIELDS
+        from .utils.name_index import INDEX_FIELDS
         old_tag_id = None
+        old_key = None
+        old_index_values = None
+        old_facet_values = None
         if self.pk:
-            old_tag_id = (
+            old_row = (
                 self.__class__
                 .objects
                 .filter(pk=self.pk)
-                .values_list("tag_id", flat=True)
+                .values(
+                    "tag_id", "user_id", "check_progress_date",
+                    *INDEX_FIELDS, *FACET_FIELDS.values()
+                )
                 .first()
             )
+            if old_row:
+                old_tag_id = old_row["tag_id"]
+                old_key = (old_row["user_id"], old_tag_id, old_row["check_progress_date"])
+                old_index_values = tuple(old_row[f] for f in INDEX_FIELDS)
+                old_facet_values = {
+                    facet: old_row[field] for facet, field in FACET_FIELDS.items()
+                }
 
         # -------- RULE 1: tag_id == 5 → CLEAR DATE --------
         if self.tag_id == 5:
@@ -382,8 +440,52 @@ class VoterList(models.Model):
         elif self.tag_id and self.tag_id != old_tag_id:
             self.check_progress_date = timezone.now().date()
 
+        # -------- RULE 3: KEEP NAME SEARCH KEYS IN SYNC --------
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"voter_name_eng", "voter_name_marathi"} & set(update_fields):
+            from .utils.phonetic import name_phonetic_codes
+            from .utils.transliteration import marathi_name_key
+            self.voter_name_translit = marathi_name_key(self.voter_name_marathi)
+            self.voter_name_phonetic = name_phonetic_codes(
+                self.voter_name_eng, self.voter_name_marathi
+            )
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields, "voter_name_translit", "voter_name_phonetic"
+                }
+
+        # -------- RULE 4: KEEP NUMERIC SHADOW COLUMNS IN SYNC --------
+        from .utils.numeric_columns import shadow_columns, sync_numeric_columns
+        update_fields = kwargs.get("update_fields")
+        columns = shadow_columns(update_fields)
+        if columns:
+            sync_numeric_columns(self, columns)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *columns}
+
+        # -------- RULE 5: KEEP MARATHI DISPLAY COLUMNS IN SYNC --------
+        from .utils.display_columns import display_columns, sync_display_columns
+        update_fields = kwargs.get("update_fields")
+        columns = display_columns(update_fields)
+        if columns:
+            sync_display_columns(self, columns)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *columns}
+
         super().save(*args, **kwargs)
 
+        # -------- KEEP DASHBOARD COUNTERS IN SYNC --------
+        from .utils.dashboard_counters import COUNTER_FIELDS, move_voter, voter_key
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or COUNTER_FIELDS & set(update_fields):
+            move_voter(old_key, voter_key(self))
+
+        # -------- KEEP IN-PROCESS INDEXES IN SYNC --------
+        from .utils.facet_index import refresh_voter_in_facets
+        from .utils.name_index import refresh_voter_in_index
+        refresh_voter_in_index(self, old_index_values)
+        refresh_voter_in_facets(self, old_facet_values)
+
 
 class UserContactPayload(models.Model):
     user = models.ForeignKey(
@@ -633,3 +735,74 @@ class UserVoterContact(models.Model):
         indexes = [
             models.Index(fields=["user", "mobile_no"]),
         ]
+
+
+class VoterSegment(models.Model):
+    """
+    A saved, named voter set: the filter definition plus its materialized
+    voter_list_ids, kept current by utils/segments.py (table created by
+    `manage.py create_segment_table`).
+    """
+    name = models.CharField(max_length=255)
+
+    owner = models.ForeignKey(
+        VoterUserMaster,
+        on_delete=models.CASCADE,
+        related_name="segments"
+    )
+
+    # filter query params as accepted by FilterSpec.from_params
+    params = models.JSONField(default=dict)
+    spec_key = models.CharField(max_length=32)
+
+    # voters of this user only (volunteer scope); null = every voter
+    scope_user_id = models.IntegerField(null=True, blank=True)
+
+    voter_ids = ArrayField(models.IntegerField(), default=list)
+    member_count = models.IntegerField(default=0)
+
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "voter_segment"
+        managed = False
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.name} ({self.member_count})"
+
+
+class DashboardCounter(models.Model):
+    """
+    Voters per (user, tag, check_progress_date), maintained incrementally
+    by utils/dashboard_counters.py (table created / rebuilt by
+    `manage.py reconcile_dashboard_counters`).
+    """
+    id = models.BigAutoField(primary_key=True)
+    user_id = models.IntegerField(null=True, blank=True)
+    tag_id = models.IntegerField(null=True, blank=True)
+    check_progress_date = models.DateField(null=True, blank=True)
+    voters = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "voter_dashboard_counter"
+        managed = False
+
+
+class ProgressDaily(models.Model):
+    """
+    Tag transitions per (day, acting user, from tag, to tag), see
+    utils/progress_rollup.py (table created / backfilled by
+    `manage.py build_progress_rollup`).
+    """
+    id = models.BigAutoField(primary_key=True)
+    day = models.DateField()
+    user_id = models.IntegerField(null=True, blank=True)
+    from_tag_id = models.IntegerField(null=True, blank=True)
+    to_tag_id = models.IntegerField(null=True, blank=True)
+    transitions = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "voter_progress_daily"
+        managed = False
@@ -1,3 +1,867 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from .models import DashboardCounter, Roles, VoterList, VoterSegment, VoterTag, VoterUserMaster
+from .utils import assignment_counts as assignment_cache
+from .utils.assignment_counts import adjust_assignment_counts, assignment_counts
+from .utils.autocomplete import top_matches
+from .utils.compact_format import compact_payload
+from .utils.cursor_pagination import decode_cursor, encode_cursor, keyset_queryset, paginate_by_cursor
+from .utils.dashboard_counters import rebuild_counters, track_counters
+from .utils.dashboard_stats import dashboard_stats, week_bounds
+from .utils.display_columns import display_columns, display_values
+from .utils import etags, facet_index, name_index, search_backends, segments
+from .utils.facet_counts import facet_counts
+from .utils.fast_json import ORJSONParser, ORJSONRenderer
+from .utils.filter_spec import FilterSpec
+from .utils.id_lookup import classify_query
+from .utils.name_index import NameTokenIndex, search_tokens
+from .utils.numeric_columns import numeric_values, shadow_columns
+from .utils.phonetic import edit_distance, fuzzy_rank, name_phonetic_codes, phonetic_code
+from .utils.progress_rollup import progress_series, rebuild_rollup, record_tag_change
+from .utils.search_backends import NameIndexSearchBackend, PostgresSearchBackend, get_search_backend
+from .utils.search_cache import bump_search_cache_version, cached_voter_ids, search_cache_key
+from .utils.transliteration import fold_latin_word, marathi_name_key, token_key
+from .utils.user_scope import UserScope, get_user_scope
+from .utils.voter_rows import voter_rows
+from .views.progress_api import progress_trend
+
+# The voter tables are unmanaged (created outside Django); let the test
+# runner create them in the test database.
+for model in apps.get_app_config("application").get_models():
+    model._meta.managed = True
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class DashboardTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        roles = {
+            name: Roles.objects.create(role_name=name)
+            for name in ["SuperAdmin", "Admin", "Volunteer"]
+        }
+        for tag_id, tag_name in [(1, "Green"), (2, "Orange"), (3, "Red"), (4, "Golden")]:
+            VoterTag.objects.create(tag_id=tag_id, tag_name=tag_name)
+
+        cls.super_admin = VoterUserMaster.objects.create(mobile_no="9000000001", role=roles["SuperAdmin"])
+        cls.admin = VoterUserMaster.objects.create(mobile_no="9000000002", role=roles["Admin"])
+        cls.volunteer = VoterUserMaster.objects.create(
+            mobile_no="9000000003", role=roles["Volunteer"], created_by=cls.admin
+        )
+
+        start_of_week, start_of_last_week = week_bounds()
+        VoterList.objects.bulk_create([
+            VoterList(sr_no=1, ward_no=1, user=cls.volunteer, tag_id_id=1, check_progress_date=start_of_week),
+            VoterList(sr_no=2, ward_no=1, user=cls.volunteer, tag_id_id=4, check_progress_date=start_of_last_week),
+            VoterList(sr_no=3, ward_no=1, user=cls.volunteer),
+            VoterList(sr_no=4, ward_no=1, user=cls.admin, tag_id_id=3,
+                      check_progress_date=start_of_week + timedelta(days=1)),
+            VoterList(sr_no=5, ward_no=1),
+        ])
+        rebuild_counters()
+
+    def setUp(self):
+        cache.clear()  # cached counts must not outlive the test's rollback
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        get_user_scope(user)  # role lookup is cached between requests
+        return client
+
+    def test_dashboard_stats_is_one_query(self):
+        with self.assertNumQueries(1):
+            stats = dashboard_stats(assigned_to=self.admin.user_id)
+
+        self.assertEqual(stats["total"], 5)
+        self.assertEqual(stats["visited"], 3)
+        self.assertEqual(stats["this_week"], 2)
+        self.assertEqual(stats["last_week"], 1)
+        self.assertEqual(stats["week_difference"], 1)
+        self.assertEqual(stats["guaranteed_voter"], 1)
+        self.assertEqual(stats["golden_voter"], 1)
+        self.assertEqual(stats["red_color_tags"], 1)
+        self.assertEqual(stats["unsure_voter"], 0)
+        self.assertEqual(stats["assigned"], 1)
+        self.assertEqual(stats["assigned_visited"], 1)
+        self.assertEqual(len(stats["daywise"]), 7)
+        self.assertEqual(stats["daywise"][-1]["cumulative_count"], 2)
+
+    def test_dashboard_stats_scoped_to_user(self):
+        stats = dashboard_stats(user_id=self.volunteer.user_id)
+
+        self.assertEqual(stats["total"], 3)
+        self.assertEqual(stats["visited"], 2)
+        self.assertEqual(stats["this_week"], 1)
+        self.assertEqual(stats["red_color_tags"], 0)
+
+    def test_super_admin_dashboard_queries(self):
+        # counts + admin / karyakarta lists
+        client = self.client_for(self.super_admin)
+        with self.assertNumQueries(2):
+            response = client.get("/app/admin/dashboard/")
+
+        data = response.data["data"]
+        self.assertEqual(data["total_voters"], 5)
+        self.assertEqual(data["total_visited"], 3)
+        self.assertEqual(data["admins"][0]["karyakarta_allocated_count"], 1)
+        self.assertEqual(data["karyakartas"][0]["voter_allocated_count"], 3)
+
+    def test_admin_dashboard_queries(self):
+        client = self.client_for(self.admin)
+        with self.assertNumQueries(2):
+            response = client.get("/app/subadmin/dashboard/")
+
+        data = response.data["data"]
+        self.assertEqual(data["assigned"], 1)
+        self.assertEqual(data["pending"], 0)
+        self.assertEqual(data["total_visited"], 3)
+
+    def test_volunteer_dashboard_queries(self):
+        # user row + counts
+        client = self.client_for(self.volunteer)
+        with self.assertNumQueries(2):
+            response = client.get("/app/volunteer/dashboard/")
+
+        data = response.data["data"]
+        self.assertEqual(data["assigned"], 3)
+        self.assertEqual(data["visited"], 2)
+        self.assertEqual(data["pending"], 1)
+
+    def counters(self):
+        return {
+            (c.user_id, c.tag_id, c.check_progress_date): c.voters
+            for c in DashboardCounter.objects.exclude(voters=0)
+        }
+
+    def rebuilt_counters(self):
+        rebuild_counters()
+        return self.counters()
+
+    def test_save_keeps_counters_in_sync(self):
+        voter = VoterList.objects.get(sr_no=3)
+        voter.tag_id_id = 2
+        voter.check_progress_date = week_bounds()[0]
+        voter.save()
+
+        VoterList.objects.create(sr_no=6, ward_no=1, user=self.admin)
+
+        incremental = self.counters()
+        self.assertEqual(incremental, self.rebuilt_counters())
+
+    def test_bulk_update_keeps_counters_in_sync(self):
+        voter_ids = list(
+            VoterList.objects.filter(user=self.volunteer).values_list("voter_list_id", flat=True)
+        )
+        with track_counters(voter_ids):
+            VoterList.objects.filter(voter_list_id__in=voter_ids).update(user=None)
+
+        incremental = self.counters()
+        self.assertEqual(incremental, self.rebuilt_counters())
+
+    def test_allocation_panel_is_one_query(self):
+        client = self.client_for(self.super_admin)
+        client.get("/app/admin/dashboard/allocated/")  # fills the cached counts
+
+        with self.assertNumQueries(1):
+            response = client.get("/app/admin/dashboard/allocated/")
+
+        summary = response.data["data"]["summary"]
+        self.assertEqual(summary["total_voters"], 5)
+        self.assertEqual(summary["assigned_admins"], 1)
+        self.assertEqual(summary["assigned_karyakartas"], 2)
+
+    def test_assignment_updates_cached_counts(self):
+        assignment_counts([self.volunteer.user_id, self.admin.user_id])
+        voter_ids = [VoterList.objects.get(sr_no=5).voter_list_id]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with track_counters(voter_ids):
+                VoterList.objects.filter(voter_list_id__in=voter_ids).update(user=self.admin)
+
+        with self.assertNumQueries(0):
+            counts, total = assignment_counts([self.volunteer.user_id, self.admin.user_id])
+        self.assertEqual(counts, {self.volunteer.user_id: 3, self.admin.user_id: 2})
+        self.assertEqual(total, 5)
+
+
+class FacetCountsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for tag_id, tag_name in [(1, "Green"), (3, "Red")]:
+            VoterTag.objects.create(tag_id=tag_id, tag_name=tag_name)
+
+        VoterList.objects.bulk_create([
+            VoterList(sr_no=1, ward_no=1, tag_id_id=1, gender_eng="Male", age_num=22),
+            VoterList(sr_no=2, ward_no=1, tag_id_id=1, gender_eng="Female", age_num=30),
+            VoterList(sr_no=3, ward_no=1, tag_id_id=3, gender_eng="Female", age_num=40),
+            VoterList(sr_no=4, ward_no=1, gender_eng="Male", age_num=None),
+            VoterList(sr_no=5, ward_no=1, tag_id_id=3, gender_eng="Male", age_num=17),
+        ])
+
+    def test_counts_every_facet_in_one_query(self):
+        with self.assertNumQueries(1):
+            total, counts = facet_counts(VoterList.objects.all())
+
+        self.assertEqual(total, 5)
+        self.assertEqual(counts["tag"], {1: 2, 3: 2, None: 1})
+        self.assertEqual(counts["gender"], {"Male": 3, "Female": 2})
+        self.assertEqual(counts["religion"], {None: 5})
+        # under-18 and missing ages have no filterable band
+        self.assertEqual(counts["age_band"], {"18-25": 1, "26-35": 1, "36-45": 1})
+
+    def test_counts_follow_the_filter(self):
+        total, counts = facet_counts(VoterList.objects.filter(gender_eng="Female"))
+
+        self.assertEqual(total, 2)
+        self.assertEqual(counts["tag"], {1: 1, 3: 1})
+        self.assertEqual(counts["gender"], {"Female": 2})
+        self.assertEqual(counts["age_band"], {"26-35": 1, "36-45": 1})
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AssignmentCountCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_partial_miss_fills_only_missing_keys(self):
+        cache.set(assignment_cache._key(1), 5)  # already incremented past the DB read
+
+        with mock.patch.object(assignment_cache, "_load_counts", return_value=({1: 4, 2: 7}, 11)):
+            assignment_counts([1, 2])
+
+        self.assertEqual(cache.get(assignment_cache._key(1)), 5)
+        self.assertEqual(cache.get(assignment_cache._key(2)), 7)
+        self.assertEqual(cache.get(assignment_cache.TOTAL_KEY), 11)
+
+    def test_adjustment_during_load_drops_the_loaded_keys(self):
+        def load_racing_an_assignment():
+            adjust_assignment_counts({(2, None, None): 1})  # incr misses: key not cached yet
+            return {2: 7}, 11
+
+        with mock.patch.object(assignment_cache, "_load_counts", side_effect=load_racing_an_assignment):
+            assignment_counts([2])
+
+        self.assertIsNone(cache.get(assignment_cache._key(2)))
+        self.assertIsNone(cache.get(assignment_cache.TOTAL_KEY))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ProgressRollupTests(TestCase):
+
+    def setUp(self):
+        rebuild_rollup()
+
+    def test_series_by_day_week_and_month(self):
+        start = date(2026, 3, 1)  # a Sunday
+        record_tag_change(7, None, 1, day=start)
+        record_tag_change(7, 1, 4, day=start)
+        record_tag_change(7, 4, 5, day=start + timedelta(days=8))
+        record_tag_change(8, None, 3, day=start + timedelta(days=31))
+
+        with self.assertNumQueries(1):
+            days = progress_series(start, start + timedelta(days=13), "day", user_id=7)
+        self.assertEqual(len(days), 14)
+        self.assertEqual(days[0]["visits"], 2)
+        self.assertEqual(days[0]["golden_voter"], 1)
+        self.assertEqual(days[8]["visits"], 0)
+        self.assertEqual(days[8]["transitions"], 1)
+        self.assertEqual(days[-1]["cumulative_visits"], 2)
+
+        weeks = progress_series(start, start + timedelta(days=13), "week")
+        self.assertEqual([w["transitions"] for w in weeks], [2, 1])
+
+        months = progress_series(start, date(2026, 4, 30), "month")
+        self.assertEqual([m["period_start"] for m in months], [date(2026, 3, 1), date(2026, 4, 1)])
+        self.assertEqual([m["visits"] for m in months], [2, 1])
+
+
+class CursorPaginationTests(SimpleTestCase):
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(12, 3456)), (12, 3456))
+
+    def test_tampered_cursor_is_rejected(self):
+        for cursor in ["", "not-a-cursor", encode_cursor(1, 2)[:-2] + "!!"]:
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_values_queryset_gets_keyset_columns(self):
+        qs = keyset_queryset(VoterList.objects.values("voter_list_id", "voter_id"))
+        self.assertEqual(qs._fields, ("voter_list_id", "voter_id", "sr_no"))
+
+        qs = keyset_queryset(VoterList.objects.values())
+        self.assertEqual(qs._fields, ())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CursorPaginationQueryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        VoterList.objects.bulk_create([VoterList(sr_no=n, ward_no=1) for n in range(1, 6)])
+
+    def test_cursor_pages_values_queryset(self):
+        qs = VoterList.objects.values("voter_list_id", "voter_id")  # no sr_no
+
+        rows, cursor = paginate_by_cursor(qs, None, 2)
+        self.assertEqual([r["sr_no"] for r in rows], [1, 2])
+
+        rows, cursor = paginate_by_cursor(qs, cursor, 2)
+        self.assertEqual([r["sr_no"] for r in rows], [3, 4])
+
+        rows, cursor = paginate_by_cursor(qs, cursor, 2)
+        self.assertEqual([r["sr_no"] for r in rows], [5])
+        self.assertIsNone(cursor)
+
+
+class NameIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.idx = NameTokenIndex()
+        self.idx.build([
+            (1, "Patil Ramesh Shankar", "ABC1234567", None, None),
+            (2, "Patil Suresh Patil", "XYZ7654321", None, None),
+            (3, "Jadhav Ramdas", "AB1", None, None),
+        ])
+
+    def search(self, text):
+        return self.idx.search(search_tokens(text))
+
+    def test_token_prefixes(self):
+        self.assertEqual(self.search("pat"), {1, 2})
+        self.assertEqual(self.search("ram pat"), {1})
+        self.assertEqual(self.search("ram"), {1, 3})
+
+    def test_repeated_token_needs_repeated_words(self):
+        self.assertEqual(self.search("patil patil"), {2})
+
+    def test_voter_id_substring(self):
+        self.assertEqual(self.search("34567"), {1})
+        self.assertEqual(self.search("xyz765"), {2})
+        self.assertEqual(self.search("b1"), {3})  # token shorter than a trigram
+        self.assertEqual(self.idx._voter_id_ids("4"), {1, 2})
+
+    def test_upsert_and_remove(self):
+        self.idx.upsert(2, "Kale Suresh", "NEW0000001")
+        self.assertEqual(self.search("patil"), {1})
+        self.assertEqual(self.search("7654321"), set())
+        self.assertEqual(self.search("new000"), {2})
+
+        self.idx.remove(1)
+        self.assertEqual(self.search("ramesh"), set())
+        self.assertEqual(self.search("1234567"), set())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class NameIndexStalenessTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def voter(self, **values):
+        fields = dict.fromkeys(name_index.INDEX_FIELDS)
+        fields.update(values)
+        return VoterList(voter_list_id=1, **fields)
+
+    def test_unchanged_names_do_not_bump_the_version(self):
+        voter = self.voter(voter_name_eng="Patil Ramesh", voter_id="ABC1234567")
+
+        name_index.refresh_voter_in_index(voter, name_index.index_values(voter))
+        self.assertIsNone(cache.get(name_index.INDEX_VERSION_KEY))
+
+    def test_changed_or_new_voter_bumps_the_version(self):
+        old = self.voter(voter_name_eng="Patil Ramesh")
+        new = self.voter(voter_name_eng="Patil Rajesh")
+
+        name_index.refresh_voter_in_index(new, name_index.index_values(old))
+        self.assertEqual(cache.get(name_index.INDEX_VERSION_KEY), 1)
+
+        name_index.refresh_voter_in_index(new)
+        self.assertEqual(cache.get(name_index.INDEX_VERSION_KEY), 2)
+
+
+class FacetIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        # (voter_list_id, sr_no, tag, gender, caste, religion, occupation, location, ward, user)
+        self.idx = facet_index.FacetIndex()
+        self.idx.build([
+            (10, 1, 1, "Male", None, 1, None, "Local", 37, 5),
+            (11, 2, 2, "Female", None, 1, None, "Remote", 37, None),
+            (12, 4, 1, "Female", None, 2, None, "Local", 38, 5),
+        ])
+
+    def test_filters_and_counts(self):
+        mask = self.idx.mask({"tag": ["1"], "gender": ["Female", "Male"]})
+        self.assertEqual(self.idx.ids(mask), [10, 12])
+        self.assertEqual(self.idx.count(mask), 2)
+        self.assertEqual(self.idx.counts("ward", mask), {"37": 1, "38": 1})
+        self.assertEqual(self.idx.ids(self.idx.mask({"user": ["null"]})), [11])
+
+    def test_upsert_moves_voter_between_values(self):
+        self.idx.upsert(11, {"tag": 1, "gender": "Female", "ward": 38})
+        self.assertTrue(self.idx.upsert(13, {"tag": 2, "ward": 37}, sr_no=5))
+        self.idx.remove(10)
+
+        self.assertEqual(self.idx.ids(self.idx.mask({"tag": ["1"]})), [11, 12])
+        self.assertEqual(self.idx.ids(self.idx.mask({"tag": ["2"]})), [13])
+
+    def test_out_of_order_insert_is_refused(self):
+        # sr_no 3 belongs between 11 and 12: appending would break sr_no order
+        self.assertFalse(self.idx.upsert(14, {"tag": 1}, sr_no=3))
+        self.assertEqual(self.idx.ids(self.idx.mask({"tag": ["1"]})), [10, 12])
+
+        self.assertTrue(self.idx.upsert(15, {"tag": 1}, sr_no=9))
+        self.assertEqual(self.idx.ids(self.idx.mask({"tag": ["1"]})), [10, 12, 15])
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_out_of_order_insert_forces_a_rebuild(self):
+        cache.clear()
+        self.idx.version = 0
+        with mock.patch.object(facet_index, "_index", self.idx):
+            facet_index.refresh_voter_in_facets(VoterList(voter_list_id=14, sr_no=3, tag_id_id=1))
+
+        self.assertEqual(cache.get(facet_index.FACET_VERSION_KEY), 1)
+        self.assertEqual(self.idx.version, 0)  # stale: get_facet_index() rebuilds it
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class FacetIndexStalenessTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_only_facet_changes_bump_the_version(self):
+        voter = VoterList(voter_list_id=1, tag_id_id=1, gender_eng="Male", ward_no=37)
+        values = facet_index.voter_facet_values(voter)
+
+        facet_index.refresh_voter_in_facets(voter, dict(values))
+        self.assertIsNone(cache.get(facet_index.FACET_VERSION_KEY))
+
+        facet_index.refresh_voter_in_facets(voter, {**values, "tag": 2})
+        self.assertEqual(cache.get(facet_index.FACET_VERSION_KEY), 1)
+
+
+class SegmentRefreshTests(SimpleTestCase):
+
+    def test_failed_refresh_is_logged_not_raised(self):
+        with mock.patch.object(segments, "_refresh_segments", side_effect=RuntimeError("no table")), \
+                mock.patch.object(segments.logger, "error") as error:
+            segments._refresh_segments_safely({1, 2}, fields=None)
+        error.assert_called_once()
+
+    def test_invalid_segment_id_is_not_found(self):
+        with self.assertRaises(VoterSegment.DoesNotExist):
+            segments.segment_voter_ids("abc", user=None)
+
+    def test_only_segments_reading_a_changed_field_are_refreshed(self):
+        fields = segments.field_names(["religion_id", "mobile_no"])
+        self.assertTrue(segments.segment_reads({"religion": "2"}, None, fields))
+        self.assertFalse(segments.segment_reads({"caste": "Maratha"}, None, fields))
+        self.assertFalse(segments.segment_reads({"tag_id": "green"}, None, {"user"}))
+        self.assertTrue(segments.segment_reads({"tag_id": "green"}, 5, {"user"}))
+        self.assertTrue(segments.segment_reads({"caste": "Maratha"}, None, None))
+
+    def test_patched_members(self):
+        self.assertEqual(segments.patched_members({1, 2}, {3}, {3}), {1, 2, 3})  # joins
+        self.assertEqual(segments.patched_members({1, 2}, {2}, set()), {1})      # leaves
+        self.assertIsNone(segments.patched_members({1, 2}, {2, 4}, {2}))        # unchanged
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SegmentMembershipTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        role = Roles.objects.create(role_name="Admin")
+        cls.owner = VoterUserMaster.objects.create(mobile_no="9000000011", role=role)
+        for tag_id, tag_name in [(1, "Green"), (3, "Red")]:
+            VoterTag.objects.create(tag_id=tag_id, tag_name=tag_name)
+
+        VoterList.objects.bulk_create([
+            VoterList(sr_no=1, ward_no=1, tag_id_id=1),
+            VoterList(sr_no=2, ward_no=1, tag_id_id=3),
+        ])
+        cls.green = VoterList.objects.get(sr_no=1).voter_list_id
+        cls.red = VoterList.objects.get(sr_no=2).voter_list_id
+
+    def setUp(self):
+        self.segment = segments.materialize_segment(
+            VoterSegment(name="Green", owner=self.owner, params={"tag_id": "green"})
+        )
+        self.assertEqual(self.segment.voter_ids, [self.green])
+
+    def retag(self, voter_list_id, tag_id, **refresh):
+        VoterList.objects.filter(voter_list_id=voter_list_id).update(tag_id=tag_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            segments.refresh_segments([voter_list_id], **refresh)
+        self.segment.refresh_from_db()
+
+    def test_voter_joins(self):
+        self.retag(self.red, 1, fields={"tag_id"})
+        self.assertEqual(self.segment.voter_ids, [self.green, self.red])
+        self.assertEqual(self.segment.member_count, 2)
+
+    def test_voter_leaves(self):
+        self.retag(self.green, 3, fields={"tag_id"})
+        self.assertEqual(self.segment.voter_ids, [])
+        self.assertEqual(self.segment.member_count, 0)
+
+    def test_assignment_skips_unscoped_segments(self):
+        # not a real assignment: shows the tag filter is not re-evaluated
+        self.retag(self.red, 1, assignment=True)
+        self.assertEqual(self.segment.voter_ids, [self.green])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SearchRankCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_ranked_ids_are_computed_once_per_query(self):
+        ids_of = mock.Mock(return_value=[3, 1, 2])
+
+        self.assertEqual(cached_voter_ids("voter_search:test", None, ids_of), [3, 1, 2])
+        self.assertEqual(cached_voter_ids("voter_search:test", None, ids_of), [3, 1, 2])
+        ids_of.assert_called_once()
+
+    def test_index_backend_ranks_whole_result(self):
+        index = NameTokenIndex()
+        index.build([
+            (1, "Patil Rameshwar", "AB1", None, None),
+            (2, "Ram Patil", "AB2", None, None),
+        ])
+        qs = mock.Mock()
+        qs.values_list.return_value = [1, 2]
+
+        with mock.patch.object(search_backends, "get_name_index", return_value=index):
+            self.assertEqual(NameIndexSearchBackend().ranked_ids(qs, "ram"), [2, 1])
+
+
+class NumericColumnsTests(SimpleTestCase):
+
+    def test_numeric_values(self):
+        self.assertEqual(numeric_values(" 45 ", "37/123/456"), {"age_num": 45, "kramank_serial_num": 456})
+        self.assertEqual(numeric_values("45+", "37/123/"), {"age_num": None, "kramank_serial_num": None})
+
+    def test_shadow_columns_follow_updated_fields(self):
+        self.assertEqual(shadow_columns(["kramank", "mobile_no"]), ["kramank_serial_num"])
+        self.assertEqual(shadow_columns(None), ["age_num", "kramank_serial_num"])
+
+
+class MasterDataEtagTests(SimpleTestCase):
+
+    def test_etag_varies_by_language(self):
+        factory = RequestFactory()
+        en = factory.get("/api/tags/")
+        mr = factory.get("/api/tags/", HTTP_ACCEPT_LANGUAGE="mr")
+
+        with mock.patch.object(etags, "master_data_version", return_value="v1"):
+            self.assertNotEqual(etags.master_data_etag(en), etags.master_data_etag(mr))
+            self.assertEqual(etags.master_data_etag(mr), etags.master_data_etag(mr))
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_bump_changes_the_etag(self):
+        cache.clear()
+        request = RequestFactory().get("/api/tags/")
+        before = etags.master_data_etag(request)
+        self.assertEqual(etags.master_data_etag(request), before)
+
+        etags.bump_master_data_version()
+        self.assertNotEqual(etags.master_data_etag(request), before)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class MasterDataVersionTests(TestCase):
+
+    def test_master_table_writes_bump_the_version(self):
+        cache.clear()
+        version = etags.master_data_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = VoterTag.objects.create(tag_name="Supporter")
+        self.assertGreater(etags.master_data_version(), version)
+
+        version = etags.master_data_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.delete()
+        self.assertGreater(etags.master_data_version(), version)
+
+
+class ProgressRangeTests(SimpleTestCase):
+
+    def test_range_cap_applies_to_every_granularity(self):
+        factory = APIRequestFactory()
+        for granularity in ("day", "week", "month"):
+            request = factory.get("/api/dashboard/progress/", {
+                "from": "2024-01-01", "to": "2025-06-30", "granularity": granularity,
+            })
+            force_authenticate(request, user=VoterUserMaster(user_id=1))
+            self.assertEqual(progress_trend(request).status_code, 400, granularity)
+
+
+class AutocompleteRankTests(SimpleTestCase):
+
+    def test_prefix_matches_come_before_the_limit(self):
+        index = NameTokenIndex()
+        index.build([
+            (1, "Deshmukh Patil", "AB1", None, None),
+            (2, "Patil Rameshwar Dattatray", "AB2", None, None),
+            (3, "Patil Ram", "AB3", None, None),
+            (4, "Kale Patilbuva", "AB4", None, None),
+        ])
+
+        with mock.patch("application.utils.autocomplete.get_name_index", return_value=index):
+            self.assertEqual(top_matches([1, 2, 3, 4], "patil", 2), [3, 2])
+            self.assertEqual(top_matches([1, 2, 3, 4], "patil", 4), [3, 2, 1, 4])
+
+
+class TransliterationKeyTests(SimpleTestCase):
+
+    def test_latin_and_devanagari_spellings_fold_to_one_key(self):
+        self.assertEqual(fold_latin_word("Deshmukh"), "desmuk")
+        self.assertEqual(marathi_name_key("देशमुख पाटील"), "desmuk ptil")
+        self.assertEqual(token_key("deshmukh"), "desmuk")
+        self.assertEqual(token_key("patil"), "ptil")
+
+    def test_short_or_empty_input_has_no_key(self):
+        self.assertIsNone(token_key("ra"))
+        self.assertIsNone(marathi_name_key("  "))
+
+
+class PhoneticTests(SimpleTestCase):
+
+    def test_spelling_variants_share_a_code(self):
+        self.assertEqual(phonetic_code("Kulkarni"), "klkrn")
+        self.assertEqual(phonetic_code("Kulkarny"), "klkrn")
+        self.assertEqual(phonetic_code("कुलकर्णी"), "klkrn")
+        self.assertEqual(name_phonetic_codes("Kulkarni Ram", "कुलकर्णी राम"), "klkrn rm")
+
+    def test_fuzzy_rank_closest_first(self):
+        self.assertEqual(edit_distance("kulkarny", "kulkarni"), 1)
+        rows = [
+            (1, ("kulkarno", "ram"), ()),
+            (2, ("kulkarni", "ram"), ()),
+        ]
+        self.assertEqual(fuzzy_rank(["kulkarni"], rows), [2, 1])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SearchCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_key_ignores_token_order_and_pagination(self):
+        self.assertEqual(
+            search_cache_key("voters_search", {"search": "Ram  Patil", "page": "1"}, "all"),
+            search_cache_key("voters_search", {"search": "patil ram", "page": "3", "size": "50"}, "all"),
+        )
+        self.assertNotEqual(
+            search_cache_key("voters_search", {"search": "patil"}, "all"),
+            search_cache_key("voters_search", {"search": "patil"}, "assigned:5"),
+        )
+
+    def test_version_bump_invalidates_cached_ids(self):
+        ids_of = mock.Mock(side_effect=[[1, 2], [1, 2, 3]])
+
+        self.assertEqual(cached_voter_ids("voter_search:test", None, ids_of), [1, 2])
+        bump_search_cache_version()
+        self.assertEqual(cached_voter_ids("voter_search:test", None, ids_of), [1, 2, 3])
+
+
+class ClassifyQueryTests(SimpleTestCase):
+
+    def test_id_shaped_input(self):
+        self.assertEqual(classify_query(" abc 1234567 "), ("epic", "ABC1234567"))
+        self.assertEqual(classify_query("abc123"), ("epic_prefix", "ABC123"))
+        self.assertEqual(classify_query("37/123/456"), ("kramank", "37/123/456"))
+        self.assertEqual(classify_query("37/123"), ("kramank_prefix", "37/123/"))
+
+    def test_names_go_to_name_search(self):
+        self.assertIsNone(classify_query("patil"))
+        self.assertIsNone(classify_query("ram 12"))
+        self.assertIsNone(classify_query(""))
+
+
+class FilterSpecTests(SimpleTestCase):
+
+    def test_equivalent_params_give_one_spec(self):
+        a = FilterSpec.from_params({
+            "gender": "Male,Female", "age_ranges": "18-25,20-30", "tag_id": "Green,red", "page": "2",
+        })
+        b = FilterSpec.from_params({
+            "gender": "Female, Male", "age_ranges": "20-30,18-25", "tag_id": "red,green,unknown",
+        })
+        self.assertEqual(a, b)
+        self.assertEqual(a.key(), b.key())
+        self.assertEqual(a.age_ranges, ((18, 30),))
+        self.assertEqual(a.tag_ids, (1, 3))
+
+    def test_facet_filters_only_for_categorical_specs(self):
+        spec = FilterSpec.from_params({"caste": "Maratha", "tag_id": "green"})
+        self.assertEqual(spec.facet_filters(), {"caste": ("Maratha",), "tag": (1,)})
+        self.assertIsNone(FilterSpec.from_params({"caste": "Maratha", "first_name": "ra"}).facet_filters())
+        self.assertFalse(FilterSpec.from_params({"page": "1"}))
+
+    def test_compile_puts_plain_predicates_in_one_where(self):
+        spec = FilterSpec.from_params({"gender": "Male", "age_ranges": "18-25", "religion": "null"})
+        qs, plan = spec.compile(VoterList.objects.all())
+
+        self.assertEqual(plan, ["where: 3 predicates"])
+        sql = str(qs.query)
+        self.assertIn('"age_num" >= 18', sql)
+        self.assertIn('"religion_id" IS NULL', sql)
+
+
+class EndsWithFilterTests(SimpleTestCase):
+
+    def test_ends_with_is_a_prefix_match_on_the_reversed_name(self):
+        qs, plan = FilterSpec.from_params({"last_ends": "Kar"}).compile(VoterList.objects.all())
+
+        self.assertEqual(plan, ["where: 1 predicates"])
+        sql = str(qs.query)
+        self.assertIn('REVERSE(LOWER("final_voter_list"."last_name"))', sql)
+        self.assertIn("LIKE rak%", sql)
+
+
+class VoterRowsTests(SimpleTestCase):
+
+    row = {
+        "voter_list_id": 7, "sr_no": 3, "voter_id": "ABC1234567", "kramank": "37/1/3",
+        "ward_no": 37, "badge": None, "location": "Local", "mobile_no": None,
+        "alternate_mobile1": "9876543210", "alternate_mobile2": None, "tag_id__tag_name": "Green",
+        "first_name": "Ramesh", "last_name": "Patil", "voter_name_eng": "Patil Ramesh",
+        "age_eng": "45", "gender_eng": "Male",
+        "first_name_mar": "रमेश", "last_name_mar": "पाटील", "voter_name_marathi": "पाटील रमेश",
+        "age": "४५", "gender": "पुरुष", "location_mar": "स्थानिक",
+    }
+
+    def test_english_row(self):
+        [data] = voter_rows([self.row], is_marathi=False)
+        self.assertEqual(data["voter_name_eng"], "Patil Ramesh")
+        self.assertEqual(data["age"], "45")
+        self.assertEqual(data["mobile_no"], "919876543210")
+        self.assertTrue(data["show_whatsapp"])
+
+    def test_marathi_row(self):
+        [data] = voter_rows([self.row], is_marathi=True, localize_location=True)
+        self.assertEqual(data["first_name"], "रमेश")
+        self.assertEqual(data["gender"], "पुरुष")
+        self.assertEqual(data["location"], "स्थानिक")
+
+
+class CompactFormatTests(SimpleTestCase):
+
+    def test_rows_are_sent_column_wise(self):
+        payload = compact_payload({
+            "status": True,
+            "data": [
+                {"voter_list_id": 1, "tag": "Green", "gender": "Male"},
+                {"voter_list_id": 2, "tag": "Red", "gender": "Male"},
+                {"voter_list_id": 3, "tag": "Green", "gender": None},
+            ],
+        })
+
+        self.assertTrue(payload["status"])
+        self.assertEqual(payload["format"], "compact")
+        self.assertEqual(payload["data"], {
+            "columns": ["voter_list_id", "tag", "gender"],
+            "rows": [[1, 0, 0], [2, 1, 0], [3, 0, 1]],
+            "dicts": {"tag": ["Green", "Red"], "gender": ["Male", None]},
+        })
+
+    def test_round_trip(self):
+        rows = [{"voter_list_id": 1, "tag": "Green", "location": "Local"}]
+        data = compact_payload({"data": rows})["data"]
+        decoded = [
+            {
+                c: data["dicts"][c][v] if c in data["dicts"] else v
+                for c, v in zip(data["columns"], row)
+            }
+            for row in data["rows"]
+        ]
+        self.assertEqual(decoded, rows)
+
+
+class DisplayColumnsTests(SimpleTestCase):
+
+    def test_display_values(self):
+        self.assertEqual(display_values("पाटील रमेश शंकर", "Remote"), {
+            "first_name_mar": "रमेश",
+            "middle_name_mar": "शंकर",
+            "last_name_mar": "पाटील",
+            "location_mar": "रिमोट",
+        })
+        self.assertEqual(display_values(None, "Local")["location_mar"], "स्थानिक")
+
+    def test_display_columns_follow_updated_fields(self):
+        self.assertEqual(display_columns(["location", "mobile_no"]), ["location_mar"])
+
+
+class FastJSONTests(SimpleTestCase):
+
+    def test_renderer_matches_drf_output_types(self):
+        data = {"day": date(2025, 1, 2), "counts": {None: 1, 5: 2}, "name": "पाटील"}
+        rendered = ORJSONRenderer().render(data)
+
+        self.assertEqual(
+            ORJSONParser().parse(BytesIO(rendered)),
+            {"day": "2025-01-02", "counts": {"null": 1, "5": 2}, "name": "पाटील"},
+        )
+
+
+class SearchBackendSelectionTests(SimpleTestCase):
+
+    def test_backend_from_settings_with_index_fallback(self):
+        with self.settings(VOTER_SEARCH_BACKEND="postgres"):
+            self.assertIsInstance(get_search_backend(), PostgresSearchBackend)
+        self.assertIsInstance(get_search_backend("bogus"), NameIndexSearchBackend)
+
+    def test_postgres_search_stays_lazy(self):
+        qs = PostgresSearchBackend().search(VoterList.objects.all(), "patil ABC123")
+        sql = str(qs.query)
+        self.assertIn("to_tsquery", sql)
+        self.assertIn("%abc123%", sql.lower())  # voter_id substring
+
+    def test_broad_index_search_falls_back_to_postgres(self):
+        backend = NameIndexSearchBackend()
+        qs = VoterList.objects.all()
+
+        with mock.patch.object(search_backends, "search_voter_ids", return_value={1, 2}):
+            self.assertIn(" IN (1, 2)", str(backend.search(qs, "patil").query))
+
+        broad = set(range(search_backends.INDEX_MAX_IDS + 1))
+        with mock.patch.object(search_backends, "search_voter_ids", return_value=broad):
+            sql = str(backend.search(qs, "pa").query)
+        self.assertIn("to_tsquery", sql)
+        self.assertNotIn(" IN (", sql)
+
+
+class UserScopeTests(SimpleTestCase):
+
+    def test_only_volunteers_with_assignments_are_restricted(self):
+        volunteer = UserScope(5, "Volunteer", assigned_count=3)
+        self.assertTrue(volunteer.restricted)
+        self.assertEqual(volunteer.name, "assigned:5")
+
+        self.assertFalse(UserScope(5, "Volunteer", assigned_count=0).restricted)
+        self.assertEqual(UserScope(1, "Admin", assigned_count=3).name, "all")
+
+    def test_apply_filters_restricted_scopes_only(self):
+        qs = VoterList.objects.all()
+        self.assertIn('"user_id" = 5', str(UserScope(5, "Volunteer", 3).apply(qs).query))
+        self.assertIs(UserScope(1, "SuperAdmin", 0).apply(qs), qs)
@@ -11,10 +11,15 @@ urlpatterns = [
     path("tags/",views.tags,name="tags"),# tags   
     path("voters/search/", views.voters_search, name="voters_search"),# voter search api    
     path("voters/family_search/",views.family_dropdown_search, name = "family_dropdown_search"),# voter family search  
+    path("voters/autocomplete/",views.voters_autocomplete, name = "voters_autocomplete"),# search-as-you-type  
     path("roles/",views.roles,name="roles"),# roles 
     path("voters/relation_add/",views.add_relation,name="add_relation"),# voter relation add 
     path("voters/relation_remove/",views.remove_relation,name="remove_relation"),# voter relation remove
     path("voters/filter/",views.filter,name="filter"),# filter 
+    path("voters/filter/facets/",views.filter_facets,name="filter_facets"),# facet counts for the filter screen
+    path("voters/segments/",views.segments,name="segments"),# saved segments list / create
+    path("voters/segments/<int:segment_id>/",views.segment_detail,name="segment_detail"),
+    path("voters/segments/<int:segment_id>/refresh/",views.segment_refresh,name="segment_refresh"),
     path("dropdown/religion/",views.religion_dropdown,name="religion_dropdown"),
     path("dropdown/caste/",views.caste_dropdown,name="caste_dropdown"),
     path("dropdown/occupation/",views.occupation_dropdown,name="occupation_dropdown"),
@@ -44,6 +49,8 @@ urlpatterns = [
     path("subadmin/dashboard/",views.admin_dashboard,name="admin_dashboard"),
     path("subadmin/dashboard/allocated/",views.volunteer_allocation_panel,name="volunteer_allocation_panel"),
     
+    path("dashboard/progress/",views.progress_trend,name="progress_trend"),# visits per day / week / month
+    
     path("volunteer/dashboard/",views.volunteer_dashboard,name="volunteer_dashboard"),
     path("volunteer/dashboard/list_voters/",views.volunteer_voters_page,name="volunteer_voters_page"),
     path("volunteer/dashboard/list_voters/filter/",views.volunteer_voters_page_filter,name="volunteer_voters_page_filter"),
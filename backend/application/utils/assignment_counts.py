@@ -0,0 +1,137 @@
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Sum
+
+# Assigned voters per user (and the total voter count), one cache key per
+# user, for the allocation panels. A cold cache is refilled with one
+# GROUP BY over the dashboard counters (utils/dashboard_counters.py); after
+# that every counter delta is applied here too with cache.incr, so the
+# assignment endpoints, add_voter and update_voter keep the map current.
+
+ASSIGNMENT_COUNT_TTL = 30 * 60
+
+TOTAL_KEY = "voter_assignment_count:total"
+
+# bumped by every adjustment, so a reload that raced one can tell its
+# loaded counts may already be stale
+GENERATION_KEY = "voter_assignment_count:generation"
+
+
+def _key(user_id):
+    return f"voter_assignment_count:{user_id}"
+
+
+def _load_counts():
+    """{user_id: assigned voters} and the total, from the counters."""
+    from ..models import DashboardCounter
+
+    counts = {}
+    total = 0
+    for row in (
+        DashboardCounter.objects
+        .values("user_id")
+        .annotate(voters=Sum("voters"))
+        .order_by()
+    ):
+        total += row["voters"]
+        if row["user_id"] is not None:
+            counts[row["user_id"]] = row["voters"]
+    return counts, total
+
+
+def assignment_counts(user_ids):
+    """
+    ({user_id: assigned voter count}, total voters) for `user_ids`.
+    One cache read; one query over the counters on a miss.
+    """
+    user_ids = list(user_ids)
+    keys = {_key(u): u for u in user_ids}
+    cached = cache.get_many([TOTAL_KEY, *keys])
+
+    if TOTAL_KEY in cached and len(cached) == len(keys) + 1:
+        return {u: cached[k] for k, u in keys.items()}, cached[TOTAL_KEY]
+
+    generation = cache.get(GENERATION_KEY)
+    loaded, total = _load_counts()
+    counts = {u: loaded.get(u, 0) for u in user_ids}
+
+    # only the missing keys, and never over a value incremented meanwhile
+    fresh = {TOTAL_KEY: total, **{_key(u): c for u, c in counts.items()}}
+    missing = [k for k in fresh if k not in cached]
+    for key in missing:
+        cache.add(key, fresh[key], ASSIGNMENT_COUNT_TTL)
+
+    # an adjustment during the load may have missed these keys (incr on a
+    # key not yet cached) or be missing from the loaded counts: drop them
+    if cache.get(GENERATION_KEY) != generation:
+        cache.delete_many(missing)
+
+    return counts, total
+
+
+def adjust_assignment_counts(deltas):
+    """
+    Apply counter deltas ({(user_id, tag_id, date): delta}) to the cached
+    counts. Keys that are not cached are left alone (filled on next read).
+    """
+    cache.add(GENERATION_KEY, 0, timeout=None)
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        pass
+
+    per_user = Counter()
+    for (user_id, _tag_id, _date), delta in deltas.items():
+        per_user[user_id] += delta
+
+    changes = {_key(u): d for u, d in per_user.items() if u is not None and d}
+    total_delta = sum(per_user.values())
+    if total_delta:
+        changes[TOTAL_KEY] = total_delta
+
+    for key, delta in changes.items():
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            pass  # not cached
+
+
+def invalidate_assignment_counts():
+    """Drop every cached count (after a counters rebuild)."""
+    from ..models import VoterUserMaster
+
+    user_ids = VoterUserMaster.objects.values_list("user_id", flat=True)
+    cache.delete_many([TOTAL_KEY, *(_key(u) for u in user_ids)])
+
+
+def allocation_members(roles):
+    """
+    Users of `roles` with their assigned voter count, as one materialized
+    list (one query + the cached counts), plus the total voter count.
+    """
+    from ..models import VoterUserMaster
+
+    users = list(
+        VoterUserMaster.objects
+        .filter(role__role_name__in=roles)
+        .values("user_id", "first_name", "last_name", "mobile_no", "role__role_name")
+    )
+    counts, total_voters = assignment_counts(u["user_id"] for u in users)
+
+    members = []
+    for role in roles:
+        for u in users:
+            if u["role__role_name"] != role:
+                continue
+            assigned_count = counts[u["user_id"]]
+            members.append({
+                "user_id": u["user_id"],
+                "name": f"{u['first_name']} {u['last_name']}",
+                "mobile": u["mobile_no"],
+                "assigned_count": assigned_count,
+                "role": role,
+                "status": "assigned" if assigned_count > 0 else "unassigned"
+            })
+
+    return members, total_voters
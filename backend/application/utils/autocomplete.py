@@ -0,0 +1,122 @@
+import heapq
+
+from django.core.cache import cache
+
+from .name_index import get_name_index, relevance_score, search_tokens
+from .transliteration import token_key
+
+AUTOCOMPLETE_TTL = 60
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+# bigger candidate sets (one or two letter prefixes) are not worth shipping
+# to redis, the next keystroke rebuilds them from the index anyway
+AUTOCOMPLETE_MAX_CACHED = 20000
+
+
+def normalize_query(search):
+    return " ".join((search or "").lower().split())
+
+
+def _cache_key(user_id, scope):
+    return f"voter_autocomplete:{user_id}:{scope}"
+
+
+def _refines(previous, query):
+    """
+    True when every voter matching `query` is guaranteed to match `previous`,
+    i.e. the user only typed more characters / more tokens.
+    """
+    if not previous or not query.startswith(previous):
+        return False
+
+    old_tokens = previous.split()
+    new_tokens = query.split()
+
+    last = len(old_tokens) - 1
+    if new_tokens[:last] != old_tokens[:last]:
+        return False
+
+    old, new = old_tokens[last], new_tokens[last]
+    if old == new:
+        return True
+
+    # a repeated token that got extended no longer needs two separate words
+    if old_tokens.count(old) > 1:
+        return False
+
+    # the transliterated key of the longer token has to extend the old one,
+    # otherwise Marathi-only matches could have been missed last time
+    new_key = token_key(new)
+    if new_key is None:
+        return True
+    old_key = token_key(old)
+    return bool(old_key) and new_key.startswith(old_key)
+
+
+def autocomplete_ids(user_id, scope, search, scope_ids=None):
+    """
+    Candidate voter_list_ids (ascending) for a typeahead query.
+
+    The candidates of the previous keystroke are kept per user and scope for
+    AUTOCOMPLETE_TTL seconds; when the new query only extends that one they
+    are narrowed in memory instead of being searched again.
+
+    scope_ids: callable returning the ids the user may see, or None for all.
+    Returns (ids, narrowed).
+    """
+    query = normalize_query(search)
+    token_counts = search_tokens(query)
+    if not token_counts:
+        return [], False
+
+    idx = get_name_index()
+    key = _cache_key(user_id, scope)
+    cached = cache.get(key)
+
+    if (
+        cached
+        and cached["version"] == idx.version
+        and _refines(cached["query"], query)
+    ):
+        ids = idx.narrow(cached["ids"], token_counts)
+        narrowed = True
+    else:
+        ids = idx.search(token_counts)
+        if scope_ids is not None:
+            ids &= scope_ids()
+        ids = sorted(ids)
+        narrowed = False
+
+    if len(ids) <= AUTOCOMPLETE_MAX_CACHED:
+        cache.set(key, {"query": query, "version": idx.version, "ids": ids}, AUTOCOMPLETE_TTL)
+    else:
+        cache.delete(key)
+
+    return ids, narrowed
+
+
+def top_matches(ids, search, limit):
+    """
+    The `limit` best candidates by match quality: names that start with the
+    query first, then relevance_score (exact word > word prefix >
+    transliterated key), then the name closest in length to the query;
+    ties keep the given order.
+    """
+    query = normalize_query(search)
+    tokens = list(search_tokens(query).elements())
+    keys = [token_key(t) for t in tokens]
+    idx = get_name_index()
+    empty = ((), "", (), ())
+
+    def sort_key(pos):
+        entry = idx.entry(ids[pos]) or empty
+        name = " ".join(entry[0])
+        return (
+            not name.startswith(query),
+            -relevance_score(tokens, entry, keys),
+            abs(len(name) - len(query)),
+            pos,
+        )
+
+    return [ids[pos] for pos in heapq.nsmallest(limit, range(len(ids)), key=sort_key)]
@@ -0,0 +1,63 @@
+# `?format=compact` for the voter list endpoints (CompactJSONRenderer in
+# utils/fast_json.py): row lists are sent column-wise instead of as one
+# dict per voter, so the ~15 key names are sent once per page, and the
+# low-cardinality columns are dictionary encoded.
+#
+#   "data": {
+#       "columns": ["sr_no", "voter_list_id", ..., "tag", ...],
+#       "rows": [[1, 101, ..., 0, ...], [2, 102, ..., 1, ...]],
+#       "dicts": {"tag": ["Green", "Orange"], "gender": [...], "location": [...]}
+#   }
+#
+# A value in a dictionary encoded column is an index into dicts[column].
+
+# response keys that hold voter row lists
+ROW_KEYS = ("data", "results", "all", "visited", "pending")
+
+# columns with few distinct values, sent as indexes into "dicts"
+DICT_COLUMNS = ("tag", "gender", "location")
+
+
+def compact_rows(rows, dict_columns=DICT_COLUMNS):
+    """List of row dicts -> {"columns", "rows", "dicts"}."""
+    columns = []
+    seen = set()
+    for row in rows:
+        for key in row:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+
+    encoders = {c: {} for c in dict_columns if c in seen}
+    encoded = []
+
+    for row in rows:
+        values = []
+        for column in columns:
+            value = row.get(column)
+            codes = encoders.get(column)
+            if codes is not None:
+                value = codes.setdefault(value, len(codes))
+            values.append(value)
+        encoded.append(values)
+
+    return {
+        "columns": columns,
+        "rows": encoded,
+        "dicts": {c: list(codes) for c, codes in encoders.items()},
+    }
+
+
+def compact_payload(data):
+    """Response data with every row list (see ROW_KEYS) in compact form."""
+    if not isinstance(data, dict):
+        return data
+
+    compacted = dict(data)
+    for key in ROW_KEYS:
+        rows = data.get(key)
+        if isinstance(rows, list) and all(isinstance(r, dict) for r in rows):
+            compacted[key] = compact_rows(rows)
+
+    compacted["format"] = "compact"
+    return compacted
@@ -0,0 +1,122 @@
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.db.models.query import ValuesIterable
+
+from .search_cache import paginate_cached_ids, paginate_ids
+
+# keyset order shared by every voter list endpoint
+CURSOR_ORDERING = ("sr_no", "voter_list_id")
+
+TOTAL_COUNT_TTL = 60
+
+
+def encode_cursor(sr_no, voter_list_id):
+    raw = json.dumps([sr_no, voter_list_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """(sr_no, voter_list_id) from an opaque cursor; ValueError if it was tampered with."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sr_no, voter_list_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(sr_no), int(voter_list_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _row_key(row):
+    if isinstance(row, dict):
+        return row["sr_no"], row["voter_list_id"]
+    return row.sr_no, row.voter_list_id
+
+
+def cached_total(qs):
+    """COUNT(*) for a queryset, cached briefly per distinct SQL."""
+    sql, params = qs.query.sql_with_params()
+    key = "voter_count:" + hashlib.md5(f"{sql}|{params}".encode()).hexdigest()
+
+    total = cache.get(key)
+    if total is None:
+        total = qs.count()
+        cache.set(key, total, TOTAL_COUNT_TTL)
+    return total
+
+
+def keyset_queryset(qs):
+    """
+    qs in keyset order; .values() querysets projecting only some columns
+    get sr_no / voter_list_id added, the next cursor is built from them.
+    """
+    qs = qs.order_by(*CURSOR_ORDERING)
+
+    if qs._iterable_class is ValuesIterable and qs._fields:
+        missing = [c for c in CURSOR_ORDERING if c not in qs._fields]
+        if missing:
+            qs = qs.values(*qs._fields, *missing)
+    return qs
+
+
+def paginate_by_cursor(qs, cursor, size):
+    """
+    Keyset page on (sr_no, voter_list_id): constant cost per page, no
+    COUNT(*) and no OFFSET. Returns (rows, next_cursor or None).
+    """
+    qs = keyset_queryset(qs)
+
+    if cursor:
+        sr_no, voter_list_id = decode_cursor(cursor)
+        qs = qs.filter(Q(sr_no__gt=sr_no) | Q(sr_no=sr_no, voter_list_id__gt=voter_list_id))
+
+    rows = list(qs[:size + 1])
+    has_next = len(rows) > size
+    rows = rows[:size]
+
+    next_cursor = encode_cursor(*_row_key(rows[-1])) if has_next else None
+    return rows, next_cursor
+
+
+def paginate_voters(request, qs, size, page, cache_key=None, ids=None):
+    """
+    Page-number pagination by default; keyset mode when the request carries
+    `cursor` (empty for the first page). `include_total=1` adds a cached
+    total in cursor mode.
+
+    With a cache_key, page-number mode pages over the cached result ids
+    (see search_cache) instead of re-running the query and its COUNT(*);
+    `ids` (already known matching ids, e.g. from the facet index) skips
+    the query altogether.
+
+    Returns (rows, pagination keys for the response). Raises ValueError for
+    a bad cursor.
+    """
+    if "cursor" not in request.GET:
+        if ids is not None:
+            page_obj, paginator = paginate_ids(qs, ids, size, page)
+        elif cache_key:
+            page_obj, paginator = paginate_cached_ids(qs, cache_key, size, page)
+        else:
+            paginator = Paginator(qs, size)
+            page_obj = paginator.get_page(page)
+        return page_obj, {
+            "page": page,
+            "page_size": size,
+            "total_pages": paginator.num_pages,
+            "total_records": paginator.count,
+        }
+
+    rows, next_cursor = paginate_by_cursor(qs, request.GET.get("cursor"), size)
+    meta = {
+        "page_size": size,
+        "next_cursor": next_cursor,
+        "has_next": next_cursor is not None,
+    }
+    if request.GET.get("include_total") == "1":
+        meta["total_records"] = cached_total(qs)
+
+    return rows, meta
@@ -0,0 +1,133 @@
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .assignment_counts import adjust_assignment_counts
+
+# Dashboard counters: voters per (user_id, tag_id, check_progress_date),
+# kept in voter_dashboard_counter so dashboards sum O(#users x #tags x
+# #days) rows instead of scanning final_voter_list.
+#
+# Maintained incrementally: VoterList.save() moves its voter from the old
+# key to the new one, bulk .update() calls run inside track_counters().
+# `manage.py reconcile_dashboard_counters` creates the table and rebuilds
+# it from scratch (run it once, and whenever voters are changed outside
+# the app). Every delta is also applied to the cached per-user assignment
+# counts (utils/assignment_counts.py) once the transaction commits.
+
+# VoterList fields (names and attnames) that make up a counter key
+COUNTER_FIELDS = {"user", "user_id", "tag_id", "tag_id_id", "check_progress_date"}
+
+# NULL user / tag / date are valid keys, so the unique index is over
+# COALESCEd values; ON CONFLICT has to name the same expressions
+CONFLICT_KEY = (
+    "COALESCE(user_id, 0), COALESCE(tag_id, 0), "
+    "COALESCE(check_progress_date, DATE '0001-01-01')"
+)
+
+CREATE_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS voter_dashboard_counter (
+    id bigserial PRIMARY KEY,
+    user_id integer NULL,
+    tag_id integer NULL,
+    check_progress_date date NULL,
+    voters integer NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS voter_dashboard_counter_key
+    ON voter_dashboard_counter ({CONFLICT_KEY});
+"""
+
+
+def voter_key(voter):
+    """Counter key of a VoterList instance."""
+    return (voter.user_id, voter.tag_id_id, voter.check_progress_date)
+
+
+def key_counts(voter_ids):
+    """Counter of keys over the given voters (one GROUP BY)."""
+    from ..models import VoterList
+
+    rows = (
+        VoterList.objects
+        .filter(voter_list_id__in=voter_ids)
+        .values("user_id", "tag_id", "check_progress_date")
+        .annotate(n=Count("voter_list_id"))
+        .order_by()
+    )
+    return Counter({
+        (r["user_id"], r["tag_id"], r["check_progress_date"]): r["n"]
+        for r in rows
+    })
+
+
+def apply_counter_deltas(deltas):
+    """Add {key: delta} to the counters in one upsert (zero deltas skipped)."""
+    rows = [(*key, delta) for key, delta in deltas.items() if delta]
+    if not rows:
+        return
+
+    values = ", ".join(["(%s, %s, %s::date, %s)"] * len(rows))
+    params = [value for row in rows for value in row]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO voter_dashboard_counter
+                (user_id, tag_id, check_progress_date, voters)
+            VALUES {values}
+            ON CONFLICT ({CONFLICT_KEY})
+            DO UPDATE SET voters = voter_dashboard_counter.voters + EXCLUDED.voters
+            """,
+            params,
+        )
+
+    # the cached per-user assignment counts follow the same deltas
+    deltas = dict(deltas)
+    transaction.on_commit(lambda: adjust_assignment_counts(deltas))
+
+
+def move_voter(old_key, new_key):
+    """One voter changed key (old_key None = new voter)."""
+    if old_key == new_key:
+        return
+
+    deltas = Counter({new_key: 1})
+    if old_key is not None:
+        deltas[old_key] -= 1
+    apply_counter_deltas(deltas)
+
+
+@contextmanager
+def track_counters(voter_ids):
+    """
+    Keep the counters in sync around a bulk .update() of `voter_ids`:
+    the keys of those voters are counted before and after, and the
+    difference is applied. Use inside the update's transaction.
+    """
+    voter_ids = list(voter_ids)
+    before = key_counts(voter_ids)
+    yield
+    after = key_counts(voter_ids)
+
+    deltas = Counter(after)
+    deltas.subtract(before)
+    apply_counter_deltas(deltas)
+
+
+def rebuild_counters():
+    """Recompute every counter from final_voter_list; returns the row count."""
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute("DELETE FROM voter_dashboard_counter")
+        cursor.execute(
+            """
+            INSERT INTO voter_dashboard_counter
+                (user_id, tag_id, check_progress_date, voters)
+            SELECT user_id, tag_id, check_progress_date, COUNT(*)
+            FROM final_voter_list
+            GROUP BY user_id, tag_id, check_progress_date
+            """
+        )
+        return cursor.rowcount
@@ -0,0 +1,158 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# Dashboard counts (dashboard, admin_dashboard, volunteer_dashboard) in a
+# single aggregate(): every number is a conditional Sum(filter=Q(...)) over
+# the dashboard counters (voters per user / tag / check_progress_date, see
+# utils/dashboard_counters.py), so a dashboard reads a few hundred counter
+# rows instead of scanning final_voter_list.
+
+# response key -> tag_id
+TAG_COUNTS = {
+    "golden_voter": 4,
+    "guaranteed_voter": 1,
+    "unsure_voter": 2,
+    "red_color_tags": 3,
+}
+
+
+def week_bounds(today=None):
+    """(start_of_week, start_of_last_week); weeks start on Sunday."""
+    today = today or timezone.now().date()
+    start_of_week = today - timedelta(days=(today.weekday() + 1) % 7)
+    return start_of_week, start_of_week - timedelta(days=7)
+
+
+def daywise_progress(start_of_week, daily_counts):
+    """Sunday..Saturday rows with daily and running totals."""
+    daywise = []
+    running_total = 0
+
+    for i in range(7):
+        d = start_of_week + timedelta(days=i)
+        running_total += daily_counts[d]
+
+        daywise.append({
+            "date": d,
+            "day": d.strftime("%A"),
+            "daily_count": daily_counts[d],
+            "cumulative_count": running_total
+        })
+
+    return daywise
+
+
+def dashboard_stats(user_id=None, assigned_to=None, today=None):
+    """
+    All dashboard counts in one query over the dashboard counters.
+
+    user_id: count only the voters assigned to this user (volunteer
+    dashboard); None counts every voter. assigned_to: also return
+    "assigned" / "assigned_visited" for this user (admin dashboard).
+    """
+    from ..models import DashboardCounter
+
+    start_of_week, start_of_last_week = week_bounds(today)
+    days = [start_of_week + timedelta(days=i) for i in range(7)]
+
+    counts = {
+        "total": Sum("voters", default=0),
+        "visited": Sum("voters", default=0, filter=Q(check_progress_date__isnull=False)),
+        "this_week": Sum(
+            "voters",
+            default=0,
+            filter=Q(check_progress_date__range=(start_of_week, days[-1])),
+        ),
+        "last_week": Sum(
+            "voters",
+            default=0,
+            filter=Q(check_progress_date__range=(start_of_last_week, start_of_week - timedelta(days=1))),
+        ),
+    }
+    for key, tag_id in TAG_COUNTS.items():
+        counts[key] = Sum("voters", default=0, filter=Q(tag_id=tag_id))
+    for i, d in enumerate(days):
+        counts[f"day_{i}"] = Sum("voters", default=0, filter=Q(check_progress_date=d))
+    if assigned_to is not None:
+        counts["assigned"] = Sum("voters", default=0, filter=Q(user_id=assigned_to))
+        counts["assigned_visited"] = Sum(
+            "voters",
+            default=0,
+            filter=Q(user_id=assigned_to, check_progress_date__isnull=False),
+        )
+
+    qs = DashboardCounter.objects.all()
+    if user_id is not None:
+        qs = qs.filter(user_id=user_id)
+
+    stats = qs.aggregate(**counts)
+
+    daily_counts = defaultdict(int)
+    for i, d in enumerate(days):
+        daily_counts[d] = stats.pop(f"day_{i}")
+
+    stats["daywise"] = daywise_progress(start_of_week, daily_counts)
+    stats["week_difference"] = stats["this_week"] - stats["last_week"]
+    return stats
+
+
+def dashboard_members(roles):
+    """
+    Dashboard member lists for `roles` (role name -> list of users with
+    their voter_allocated_count, summed from the counters) in one query.
+    Admin rows also carry karyakarta_allocated_count (users they created).
+    """
+    from ..models import DashboardCounter, VoterUserMaster
+
+    allocated_count = (
+        DashboardCounter.objects
+        .filter(user_id=OuterRef('user_id'))
+        .values('user_id')
+        .annotate(total=Sum('voters'))
+        .values('total')
+    )
+
+    created_karyakarta_count = (
+        VoterUserMaster.objects
+        .filter(created_by=OuterRef('user_id'))
+        .values('created_by')
+        .annotate(count=Count('*'))
+        .values('count')
+    )
+
+    rows = (
+        VoterUserMaster.objects
+        .filter(role__role_name__in=roles)
+        .annotate(
+            voter_allocated_count=Coalesce(
+                Subquery(allocated_count, output_field=IntegerField()),
+                Value(0),
+            ),
+            karyakarta_allocated_count=Coalesce(
+                Subquery(created_karyakarta_count, output_field=IntegerField()),
+                Value(0),
+            ),
+        )
+        .values(
+            "user_id",
+            "first_name",
+            "last_name",
+            "mobile_no",
+            "voter_allocated_count",
+            "karyakarta_allocated_count",
+            "role__role_name",
+        )
+    )
+
+    members = {role: [] for role in roles}
+    for row in rows:
+        role = row.pop("role__role_name")
+        if role != "Admin":
+            row.pop("karyakarta_allocated_count")
+        members[role].append(row)
+
+    return members
@@ -0,0 +1,43 @@
+from .voter_rows import split_marathi_name
+
+# Marathi display values of list rows, precomputed so Marathi pages are a
+# plain column read; kept in sync by VoterList.save()
+# (columns added / backfilled by `manage.py build_display_columns`)
+DISPLAY_COLUMNS = ["first_name_mar", "middle_name_mar", "last_name_mar", "location_mar"]
+
+# source column -> the display columns derived from it
+SOURCE_COLUMNS = {
+    "voter_name_marathi": ["first_name_mar", "middle_name_mar", "last_name_mar"],
+    "location": ["location_mar"],
+}
+
+LOCATION_MR = {"Remote": "रिमोट"}
+LOCATION_MR_DEFAULT = "स्थानिक"
+
+
+def localized_location(location):
+    return LOCATION_MR.get(location, LOCATION_MR_DEFAULT)
+
+
+def display_values(voter_name_marathi, location):
+    first_name, middle_name, last_name = split_marathi_name(voter_name_marathi)
+    return {
+        "first_name_mar": first_name,
+        "middle_name_mar": middle_name,
+        "last_name_mar": last_name,
+        "location_mar": localized_location(location),
+    }
+
+
+def display_columns(fields):
+    """Display columns affected by an update of `fields` (None = every field)."""
+    if fields is None:
+        return list(DISPLAY_COLUMNS)
+    return [c for source in fields for c in SOURCE_COLUMNS.get(source, [])]
+
+
+def sync_display_columns(voter, columns=None):
+    """Recompute the display columns (or only `columns`) on a VoterList instance (not saved)."""
+    for column, value in display_values(voter.voter_name_marathi, voter.location).items():
+        if columns is None or column in columns:
+            setattr(voter, column, value)
@@ -0,0 +1,74 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from .search_cache import _initial_version, search_cache_version
+from .user_scope import get_user_scope
+
+# ETags for conditional GETs (django.views.decorators.http.condition).
+# They are built from data-version stamps, never from the response body,
+# so an unchanged page is answered with a 304 before any voter query runs.
+
+# master tables (tags / roles / religion / caste / occupation) carry a
+# version stamp, bumped on every write: by their models' save() / delete()
+# (MasterDataModel) and by `manage.py bump_master_data_version` after
+# edits made directly in the database
+MASTER_DATA_VERSION_KEY = "master_data:version"
+
+
+def _etag(*parts):
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _params(request):
+    return sorted(request.GET.lists())
+
+
+def _language(request):
+    return request.headers.get("Accept-Language", "en").lower()
+
+
+def master_data_version():
+    version = cache.get(MASTER_DATA_VERSION_KEY)
+    if version is None:
+        cache.add(MASTER_DATA_VERSION_KEY, _initial_version(), timeout=None)
+        version = cache.get(MASTER_DATA_VERSION_KEY)
+    return version
+
+
+def bump_master_data_version():
+    """Invalidate the master data ETags (call after a master table write)."""
+    cache.add(MASTER_DATA_VERSION_KEY, _initial_version(), timeout=None)
+    try:
+        cache.incr(MASTER_DATA_VERSION_KEY)
+    except ValueError:
+        pass
+
+
+def master_data_etag(request, *args, **kwargs):
+    """tags / roles / religion / caste / occupation dropdowns, per language."""
+    version = master_data_version()
+    if version is None:
+        return None  # cache unavailable: no conditional response
+
+    return _etag(request.path, version, _language(request), _params(request))
+
+
+def voter_list_etag(request, *args, **kwargs):
+    """
+    Voter list pages: changes with every voter / assignment write (the
+    search cache version), the caller's scope, language and page params.
+    """
+    version = search_cache_version()
+    if version is None:
+        return None  # cache unavailable: no conditional response
+
+    return _etag(
+        request.path,
+        version,
+        get_user_scope(request.user).name,
+        _language(request),
+        _params(request),
+    )
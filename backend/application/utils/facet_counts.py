@@ -0,0 +1,68 @@
+from django.db import connection
+
+# facet name -> column of the filtered voter query (as emitted by .values())
+FACET_COLUMNS = {
+    "tag": "tag_id",
+    "gender": "gender_eng",
+    "caste": "cast",
+    "religion": "religion_id",
+    "occupation": "occupation",
+}
+
+# same "lo-hi" format the age_ranges filter takes
+AGE_BANDS = ((18, 25), (26, 35), (36, 45), (46, 60), (61, 120))
+
+
+def _age_band_sql():
+    whens = " ".join(
+        f"WHEN age_num BETWEEN {lo} AND {hi} THEN '{lo}-{hi}'" for lo, hi in AGE_BANDS
+    )
+    return f"CASE {whens} END"
+
+
+def facet_counts(qs):
+    """
+    Per-value counts of every facet for the voters in qs, in one query:
+    the filtered rows are grouped once per facet with GROUPING SETS.
+
+    Returns (total, {facet: {value: count}}); NULL values are counted
+    under None, except for age_band: ages outside AGE_BANDS (or missing)
+    have no value the age_ranges filter could take, so they get no bucket.
+    """
+    inner = qs.order_by().values(*FACET_COLUMNS.values(), "age_num")
+    inner_sql, params = inner.query.sql_with_params()
+
+    columns = [connection.ops.quote_name(c) for c in FACET_COLUMNS.values()]
+    facets = list(FACET_COLUMNS) + ["age_band"]
+    keys = columns + ["age_band"]
+
+    sql = f"""
+        WITH banded AS (
+            SELECT {", ".join(columns)}, {_age_band_sql()} AS age_band
+            FROM ({inner_sql}) voters
+        )
+        SELECT {", ".join(f"GROUPING({k})" for k in keys)},
+               {", ".join(keys)},
+               COUNT(*)
+        FROM banded
+        GROUP BY GROUPING SETS ({", ".join(f"({k})" for k in keys)}, ())
+    """
+
+    total = 0
+    counts = {facet: {} for facet in facets}
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for row in cursor.fetchall():
+            grouping, values, count = row[:len(keys)], row[len(keys):-1], row[-1]
+
+            if all(grouping):
+                total = count
+                continue
+
+            pos = grouping.index(0)
+            if facets[pos] == "age_band" and values[pos] is None:
+                continue
+            counts[facets[pos]][values[pos]] = count
+
+    return total, counts
@@ -0,0 +1,297 @@
+import threading
+import time
+
+import numpy as np
+from django.core.cache import cache
+
+from logger import logger
+
+# facet name -> VoterList field; all low-cardinality columns
+FACET_FIELDS = {
+    "tag": "tag_id",
+    "gender": "gender_eng",
+    "caste": "cast",
+    "religion": "religion",
+    "occupation": "occupation",
+    "location": "location",
+    "ward": "ward_no",
+    "user": "user",
+}
+
+# bumped by VoterList.save() when a facet column changes and by bulk
+# updates (assignments)
+FACET_VERSION_KEY = "voter_facet_index:version"
+
+FACET_MAX_AGE = 15 * 60
+
+# spare rows allocated on every grow, so add_voter doesn't resize each time
+GROW_BY = 1024
+
+
+def facet_key(value):
+    """Bitmap key for a column value / filter value: strings, None for NULL."""
+    if value is None or str(value).lower() == "null":
+        return None
+    return str(value)
+
+
+def _nbytes(rows):
+    return (rows + 7) // 8
+
+
+def _set_bit(bitmap, ordinal):
+    bitmap[ordinal >> 3] |= 0x80 >> (ordinal & 7)
+
+
+def _clear_bit(bitmap, ordinal):
+    bitmap[ordinal >> 3] &= ~np.uint8(0x80 >> (ordinal & 7))
+
+
+class FacetIndex:
+    """
+    Per-process bitmap index over the categorical VoterList columns.
+
+    Every voter gets a dense ordinal (sr_no order); each facet value keeps a
+    packed bitset of the ordinals that have it. Filters become bitwise
+    OR (within a facet) / AND (across facets), totals are popcounts.
+
+    New voters can only be appended while that keeps the ordinals in sr_no
+    order; any other insert needs a rebuild.
+    """
+
+    def __init__(self):
+        self._ids = np.zeros(0, dtype=np.int64)      # ordinal -> voter_list_id
+        self._ordinal = {}                            # voter_list_id -> ordinal
+        self._rows = []                               # ordinal -> facet keys
+        self._alive = np.zeros(0, dtype=np.uint8)
+        self._bitmaps = {facet: {} for facet in FACET_FIELDS}
+        self._size = 0
+        self._last_key = None                         # (sr_no, voter_list_id) of the last ordinal
+        self.version = None
+        self.built_at = 0
+
+    def __len__(self):
+        return len(self._ordinal)
+
+    # ---------- BUILD / MAINTAIN ----------
+
+    def build(self, rows, version=None):
+        """rows: (voter_list_id, sr_no, *FACET_FIELDS values) in display (sr_no, voter_list_id) order."""
+        rows = list(rows)
+        n = len(rows)
+        capacity = n + GROW_BY
+
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._ids[:n] = [r[0] for r in rows]
+        self._ordinal = {r[0]: i for i, r in enumerate(rows)}
+        self._rows = [tuple(facet_key(v) for v in r[2:]) for r in rows]
+        self._size = n
+        self._last_key = (rows[-1][1], rows[-1][0]) if rows else None
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:n] = True
+        self._alive = np.packbits(alive)
+
+        for pos, facet in enumerate(FACET_FIELDS):
+            groups = {}
+            for ordinal, keys in enumerate(self._rows):
+                groups.setdefault(keys[pos], []).append(ordinal)
+
+            bitmaps = {}
+            for key, ordinals in groups.items():
+                bits = np.zeros(capacity, dtype=bool)
+                bits[ordinals] = True
+                bitmaps[key] = np.packbits(bits)
+            self._bitmaps[facet] = bitmaps
+
+        self.version = version
+        self.built_at = time.monotonic()
+
+    def _grow(self):
+        capacity = len(self._ids) + GROW_BY
+        extra = _nbytes(capacity) - len(self._alive)
+
+        self._ids = np.concatenate([self._ids, np.zeros(GROW_BY, dtype=np.int64)])
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=np.uint8)])
+        for bitmaps in self._bitmaps.values():
+            for key, bitmap in bitmaps.items():
+                bitmaps[key] = np.concatenate([bitmap, np.zeros(extra, dtype=np.uint8)])
+
+    def _empty_bitmap(self):
+        return np.zeros(len(self._alive), dtype=np.uint8)
+
+    def upsert(self, voter_list_id, values, sr_no=None):
+        """
+        values: {facet: column value} for one voter (new or changed).
+        Returns False, leaving the index untouched, for a new voter that
+        would not sort after every indexed one (the index must be rebuilt).
+        """
+        keys = tuple(facet_key(values.get(facet)) for facet in FACET_FIELDS)
+
+        ordinal = self._ordinal.get(voter_list_id)
+        if ordinal is None:
+            sort_key = (sr_no, voter_list_id)
+            if sr_no is None or (self._last_key is not None and sort_key <= self._last_key):
+                return False
+
+            self._last_key = sort_key
+            if self._size >= len(self._ids):
+                self._grow()
+            ordinal = self._size
+            self._size += 1
+            self._ordinal[voter_list_id] = ordinal
+            self._ids[ordinal] = voter_list_id
+            self._rows.append((None,) * len(FACET_FIELDS))
+            old = None
+        else:
+            old = self._rows[ordinal]
+
+        for pos, facet in enumerate(FACET_FIELDS):
+            bitmaps = self._bitmaps[facet]
+            if old is not None and old[pos] != keys[pos] and old[pos] in bitmaps:
+                _clear_bit(bitmaps[old[pos]], ordinal)
+            if keys[pos] not in bitmaps:
+                bitmaps[keys[pos]] = self._empty_bitmap()
+            _set_bit(bitmaps[keys[pos]], ordinal)
+
+        self._rows[ordinal] = keys
+        _set_bit(self._alive, ordinal)
+        return True
+
+    def remove(self, voter_list_id):
+        ordinal = self._ordinal.get(voter_list_id)
+        if ordinal is not None:
+            _clear_bit(self._alive, ordinal)
+
+    # ---------- QUERIES ----------
+
+    def mask(self, filters):
+        """
+        filters: {facet: values}; values of one facet are OR-ed, facets are
+        AND-ed. Unknown values match nothing, "null" / None matches NULL.
+        """
+        result = self._alive.copy()
+
+        for facet, values in filters.items():
+            bitmaps = self._bitmaps[facet]
+            facet_mask = self._empty_bitmap()
+            for value in values:
+                bitmap = bitmaps.get(facet_key(value))
+                if bitmap is not None:
+                    facet_mask |= bitmap
+            result &= facet_mask
+
+        return result
+
+    @staticmethod
+    def count(mask):
+        return int(np.bitwise_count(mask).sum())
+
+    def ids(self, mask):
+        """voter_list_ids set in mask, in ordinal (sr_no) order."""
+        ordinals = np.flatnonzero(np.unpackbits(mask, count=self._size))
+        return self._ids[ordinals].tolist()
+
+    def counts(self, facet, mask):
+        """{value: number of voters in mask with that value} for one facet."""
+        result = {}
+        for key, bitmap in self._bitmaps[facet].items():
+            n = self.count(bitmap & mask)
+            if n:
+                result[key] = n
+        return result
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def _current_version():
+    return cache.get(FACET_VERSION_KEY)
+
+
+def _bump_version():
+    cache.add(FACET_VERSION_KEY, 0, timeout=None)
+    try:
+        return cache.incr(FACET_VERSION_KEY)
+    except ValueError:
+        return None
+
+
+def _fresh(idx, version):
+    return (
+        idx is not None
+        and idx.version == version
+        and time.monotonic() - idx.built_at < FACET_MAX_AGE
+    )
+
+
+def get_facet_index():
+    """Return the process-wide facet index, rebuilding it when another worker wrote."""
+    global _index
+    from ..models import VoterList
+
+    version = _current_version()
+    if _fresh(_index, version):
+        return _index
+
+    with _lock:
+        if _fresh(_index, version):
+            return _index
+
+        started = time.monotonic()
+        idx = FacetIndex()
+        idx.build(
+            VoterList.objects
+            .order_by("sr_no", "voter_list_id")
+            .values_list("voter_list_id", "sr_no", *FACET_FIELDS.values())
+            .iterator(chunk_size=5000),
+            version=version,
+        )
+        _index = idx
+        logger.info(
+            f"facet_index: Built facet index for {len(idx)} voters "
+            f"in {(time.monotonic() - started) * 1000:.0f} ms"
+        )
+        return idx
+
+
+def voter_facet_values(voter):
+    """{facet: column value} of a VoterList instance."""
+    return {
+        facet: getattr(voter, voter._meta.get_field(field).attname)
+        for facet, field in FACET_FIELDS.items()
+    }
+
+
+def refresh_voter_in_facets(voter, old_values=None):
+    """
+    Apply a single VoterList write to this process and flag it for the
+    others. old_values: voter_facet_values() before the write (None for a
+    new voter); a write that changes no facet column is a no-op.
+    """
+    if old_values is not None and old_values == voter_facet_values(voter):
+        return
+
+    new_version = _bump_version()
+
+    idx = _index
+    if idx is None:
+        return
+
+    with _lock:
+        # an out of order insert leaves idx on the old version: rebuilt on next read
+        applied = idx.upsert(voter.voter_list_id, voter_facet_values(voter), voter.sr_no)
+        if applied and new_version is not None and idx.version == new_version - 1:
+            idx.version = new_version
+
+
+def invalidate_facet_index():
+    """Force a rebuild everywhere (after .update() calls that skip save())."""
+    _bump_version()
+
+
+def facet_voter_ids(filters):
+    """voter_list_ids (sr_no order) matching facet filters, straight from the bitmaps."""
+    idx = get_facet_index()
+    return idx.ids(idx.mask(filters))
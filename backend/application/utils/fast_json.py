@@ -0,0 +1,67 @@
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .compact_format import compact_payload
+
+# orjson renderer / parser pair for REST_FRAMEWORK (see settings.py).
+# The output is the same JSON DRF's JSONRenderer sent before: datetimes,
+# dates, times, Decimals, UUIDs, lazy strings, querysets... are passed to
+# DRF's encoder (the DjangoJSONEncoder equivalent JSONRenderer uses) and
+# only plain dicts / lists / strings / numbers are encoded natively.
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS            # facet counts keyed by id / None
+    | orjson.OPT_PASSTHROUGH_DATETIME  # keep DRF's datetime format
+)
+
+_default = JSONEncoder().default
+
+
+def dumps(data, indent=False):
+    options = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    return orjson.dumps(data, default=_default, option=options)
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        # honour ?indent / Accept: application/json; indent=4 like JSONRenderer
+        indent = False
+        if accepted_media_type:
+            params = dict(
+                p.strip().split("=", 1)
+                for p in accepted_media_type.split(";")[1:]
+                if "=" in p
+            )
+            indent = bool(params.get("indent"))
+        if renderer_context and renderer_context.get("indent"):
+            indent = True
+
+        return dumps(data, indent=indent)
+
+
+class CompactJSONRenderer(ORJSONRenderer):
+    """`?format=compact`: voter row lists sent column-wise (utils/compact_format.py)."""
+    format = "compact"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(compact_payload(data), accepted_media_type, renderer_context)
+
+
+class ORJSONParser(BaseParser):
+    media_type = "application/json"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,245 @@
+import hashlib
+import json
+from dataclasses import asdict, dataclass, fields
+
+from django.db.models import Q
+from django.db.models.functions import Lower, Reverse
+
+from logger import logger
+from .id_lookup import apply_id_search, classify_query, id_lookup
+from .search_backends import get_search_backend
+
+TAG_NAME_TO_ID = {
+    "green": 1,
+    "orange": 2,
+    "red": 3,
+    "golden": 4,
+    "white": 5,
+}
+
+# query param -> VoterList column for the comma separated "in" filters
+MULTI_FILTERS = {
+    "caste": "cast",
+    "religion": "religion_id",
+    "occupation": "occupation",
+    "gender": "gender_eng",
+}
+
+# spec field -> facet_index facet, for specs the bitmaps can answer alone
+FACET_FILTERS = {
+    "caste": "caste",
+    "religion": "religion",
+    "occupation": "occupation",
+    "gender": "gender",
+    "tag_ids": "tag",
+}
+
+# query param -> (column, lookup) for the single value text filters
+TEXT_FILTERS = {
+    "first_name": ("first_name", "istartswith"),
+    "middle_name": ("middle_name", "istartswith"),
+    "last_name": ("last_name", "istartswith"),
+    "location": ("location", "icontains"),
+}
+
+# "ends with" params -> name column. Compiled as a starts-with on
+# reverse(lower(column)), which the fvl_*_rev indexes serve as a range scan.
+ENDS_FILTERS = {
+    "first_ends": "first_name",
+    "middle_ends": "middle_name",
+    "last_ends": "last_name",
+}
+
+
+def _text(value):
+    value = (value or "").strip()
+    return value or None
+
+
+def _values(value):
+    """Comma separated values, sorted; ("null",) stands for IS NULL."""
+    values = [v.strip() for v in (value or "").split(",") if v.strip()]
+    if "null" in [v.lower() for v in values]:
+        return ("null",)
+    return tuple(sorted(set(values)))
+
+
+def _age_ranges(value):
+    """"18-25,20-30,60-70" -> ((18, 30), (60, 70)): parsed, sorted and merged."""
+    ranges = []
+    for r in (value or "").split(","):
+        try:
+            lo, hi = r.split("-")
+            ranges.append((int(lo.strip()), int(hi.strip())))
+        except ValueError:
+            continue  # skip invalid ranges
+
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(hi, merged[-1][1]))
+        else:
+            merged.append((lo, hi))
+    return tuple(merged)
+
+
+def _tag_ids(value):
+    names = [t.strip().lower() for t in (value or "").split(",")]
+    return tuple(sorted({TAG_NAME_TO_ID[t] for t in names if t in TAG_NAME_TO_ID}))
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """
+    The voter list filters shared by filter, unassigned_voters,
+    volunteer_voters_page_filter and build_voter_queryset (exports,
+    campaigns), parsed once and normalised.
+
+    Specs are hashable and equal whenever two requests select the same
+    voters, so key() can be used for caching.
+    """
+
+    search: str = None
+    voter_id: str = None
+    kramank: str = None
+
+    first_name: str = None
+    middle_name: str = None
+    last_name: str = None
+    location: str = None
+    first_ends: str = None
+    middle_ends: str = None
+    last_ends: str = None
+
+    age_ranges: tuple = ()
+    caste: tuple = ()
+    religion: tuple = ()
+    occupation: tuple = ()
+    gender: tuple = ()
+    tag_ids: tuple = ()
+
+    @classmethod
+    def from_params(cls, params):
+        """Build a spec from request.GET (or any dict of query params)."""
+        search = " ".join((params.get("search") or "").split()) or None
+
+        return cls(
+            search=search,
+            voter_id=_text(params.get("voter_id")),
+            kramank=_text(params.get("kramank")),
+            age_ranges=_age_ranges(params.get("age_ranges")),
+            tag_ids=_tag_ids(params.get("tag_id")),
+            **{name: _text(params.get(name)) for name in TEXT_FILTERS},
+            **{name: _text(params.get(name)) for name in ENDS_FILTERS},
+            **{name: _values(params.get(name)) for name in MULTI_FILTERS},
+        )
+
+    def __bool__(self):
+        return any(getattr(self, f.name) for f in fields(self))
+
+    def key(self):
+        raw = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def facet_filters(self):
+        """
+        {facet: values} for utils/facet_index when every part of the spec is
+        a categorical filter (no search / text / ID / age); None otherwise.
+        """
+        for f in fields(self):
+            if f.name not in FACET_FILTERS and getattr(self, f.name):
+                return None
+
+        return {
+            facet: getattr(self, name)
+            for name, facet in FACET_FILTERS.items()
+            if getattr(self, name)
+        }
+
+    # ---------- COMPILE ----------
+
+    def _where(self):
+        """Every plain column predicate as one Q, so they land in a single WHERE."""
+        q = Q()
+        predicates = 0
+
+        for name, (column, lookup) in TEXT_FILTERS.items():
+            value = getattr(self, name)
+            if value:
+                q &= Q(**{f"{column}__{lookup}": value})
+                predicates += 1
+
+        for name, column in ENDS_FILTERS.items():
+            value = getattr(self, name)
+            if value:
+                q &= Q(**{f"{column}_rev__startswith": value.lower()[::-1]})
+                predicates += 1
+
+        if self.age_ranges:
+            age_q = Q()
+            for lo, hi in self.age_ranges:
+                age_q |= Q(age_num__gte=lo, age_num__lte=hi)
+            q &= age_q
+            predicates += 1
+
+        for name, column in MULTI_FILTERS.items():
+            values = getattr(self, name)
+            if values == ("null",):
+                q &= Q(**{f"{column}__isnull": True})
+            elif values:
+                q &= Q(**{f"{column}__in": values})
+            if values:
+                predicates += 1
+
+        if self.tag_ids:
+            q &= Q(tag_id__in=self.tag_ids)
+            predicates += 1
+
+        return q, predicates
+
+    def _id_filter(self, qs, value, kinds, column, plan):
+        classified = classify_query(value)
+        if classified and classified[0] in kinds:
+            matched = id_lookup(qs, *classified)
+            if matched.exists():
+                plan.append(f"{column}: {classified[0]} index probe")
+                return matched
+
+        plan.append(f"{column}: substring scan")
+        return qs.filter(**{f"{column}__icontains": value})
+
+    def compile(self, qs):
+        """
+        Apply the spec to qs. Returns (queryset, plan) where plan lists the
+        access path chosen for each part, e.g.
+        ["where: 3 predicates", "kramank: kramank index probe", "search: index backend"].
+        """
+        plan = []
+
+        q, predicates = self._where()
+        if predicates:
+            qs = qs.alias(**{
+                f"{column}_rev": Reverse(Lower(column))
+                for name, column in ENDS_FILTERS.items()
+                if getattr(self, name)
+            }).filter(q)
+            plan.append(f"where: {predicates} predicates")
+
+        if self.voter_id:
+            qs = self._id_filter(qs, self.voter_id, ("epic", "epic_prefix"), "voter_id", plan)
+
+        if self.kramank:
+            qs = self._id_filter(qs, self.kramank, ("kramank", "kramank_prefix"), "kramank", plan)
+
+        if self.search:
+            id_qs = apply_id_search(qs, self.search)
+            if id_qs is not None:
+                qs = id_qs
+                plan.append("search: id index probe")
+            else:
+                backend = get_search_backend()
+                qs = backend.search(qs, self.search)
+                plan.append(f"search: {backend.name} backend")
+
+        logger.info(f"filter_spec: {self.key()[:8]} plan {plan or ['no filters']}")
+        return qs, plan
@@ -0,0 +1,65 @@
+import re
+
+# EPIC (voter id card) numbers: 3 letters + 7 digits, e.g. ABC1234567.
+# Two or more letters followed by 3+ digits is treated as the start of one.
+EPIC_RE = re.compile(r"^[A-Z]{3}\d{7}$")
+EPIC_PREFIX_RE = re.compile(r"^[A-Z]{2,3}\d{3,6}$")
+
+# kramank is part/section/serial, e.g. 37/123/456 (unique in final_voter_list);
+# "37/123/" or "37/123" is the start of one
+KRAMANK_RE = re.compile(r"^\d+/\d+/\d+$")
+KRAMANK_PREFIX_RE = re.compile(r"^\d+/\d+/?$")
+
+SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_id(value):
+    return SPACES_RE.sub("", value or "").upper()
+
+
+def classify_query(search):
+    """
+    ("epic" | "epic_prefix" | "kramank" | "kramank_prefix", normalized value)
+    for ID-shaped input, None for anything that should go through name search.
+    """
+    value = normalize_id(search)
+    if not value:
+        return None
+
+    if EPIC_RE.match(value):
+        return "epic", value
+    if EPIC_PREFIX_RE.match(value):
+        return "epic_prefix", value
+    if KRAMANK_RE.match(value):
+        return "kramank", value
+    if KRAMANK_PREFIX_RE.match(value):
+        return "kramank_prefix", value.rstrip("/") + "/"
+    return None
+
+
+def id_lookup(qs, kind, value):
+    """
+    Single index probe for a classified ID. The lookups are written so they
+    hit the btree indexes from create_search_indexes:
+    UPPER(voter_id::text) for EPIC, the unique kramank index otherwise.
+    """
+    if kind == "epic":
+        return qs.filter(voter_id__iexact=value)
+    if kind == "epic_prefix":
+        return qs.filter(voter_id__istartswith=value)
+    if kind == "kramank":
+        return qs.filter(kramank=value)
+    return qs.filter(kramank__startswith=value)
+
+
+def apply_id_search(qs, search):
+    """
+    Narrow qs with the ID fast path when `search` looks like an EPIC number
+    or kramank and at least one voter matches; None otherwise.
+    """
+    classified = classify_query(search)
+    if not classified:
+        return None
+
+    matched = id_lookup(qs, *classified)
+    return matched if matched.exists() else None
@@ -0,0 +1,447 @@
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+
+from logger import logger
+from .phonetic import MIN_CODE_LENGTH, phonetic_code
+from .transliteration import token_key
+
+WORDS_RE = re.compile(r"[A-Za-z]+")
+
+# shared across workers: every VoterList write that changes an indexed
+# column bumps it so other processes know their in-memory copy is stale
+INDEX_VERSION_KEY = "voter_name_index:version"
+
+# safety net in case the cache is unreachable and versions can't be compared
+INDEX_MAX_AGE = 15 * 60
+
+# VoterList columns the index is built from (in NameTokenIndex.upsert order)
+INDEX_FIELDS = ("voter_name_eng", "voter_id", "voter_name_translit", "voter_name_phonetic")
+
+
+def name_words(name):
+    """Lower-cased latin words of a voter name (same split the old regex search used)."""
+    return tuple(WORDS_RE.findall((name or "").lower()))
+
+
+def search_tokens(search):
+    """Split a raw search string into lower-cased tokens with their required counts."""
+    tokens = [t.strip().lower() for t in (search or "").split() if t.strip()]
+    return Counter(tokens)
+
+
+class _PrefixPostings:
+    """word -> {voter_list_id} postings with a sorted word list for prefix range scans."""
+
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._sorted = []
+        self._dirty = False
+
+    def add(self, words, voter_list_id):
+        for w in words:
+            ids = self._postings.get(w)
+            if ids is None:
+                ids = self._postings[w] = set()
+                self._dirty = True
+            ids.add(voter_list_id)
+
+    def discard(self, words, voter_list_id):
+        for w in words:
+            ids = self._postings.get(w)
+            if ids is None:
+                continue
+            ids.discard(voter_list_id)
+            if not ids:
+                del self._postings[w]
+                self._dirty = True
+
+    def prefix_ids(self, prefix):
+        if self._dirty:
+            self._sorted = sorted(self._postings)
+            self._dirty = False
+
+        words = self._sorted
+        ids = set()
+        i = bisect_left(words, prefix)
+        while i < len(words) and words[i].startswith(prefix):
+            ids |= self._postings[words[i]]
+            i += 1
+        return ids
+
+
+class _NgramPostings:
+    """
+    trigram -> {voter_list_id} postings over one short value per voter
+    (the voter_id), answering "token is a substring of the value" without
+    scanning every entry.
+    """
+
+    N = 3
+
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._values = {}
+        # values shorter than N have no trigram
+        self._short = {}
+
+    @classmethod
+    def _grams(cls, value):
+        return {value[i:i + cls.N] for i in range(len(value) - cls.N + 1)}
+
+    def add(self, value, voter_list_id):
+        if not value:
+            return
+        if len(value) < self.N:
+            self._short[voter_list_id] = value
+            return
+
+        self._values[voter_list_id] = value
+        for gram in self._grams(value):
+            self._postings[gram].add(voter_list_id)
+
+    def discard(self, value, voter_list_id):
+        if self._short.pop(voter_list_id, None) is not None:
+            return
+        if self._values.pop(voter_list_id, None) is None:
+            return
+
+        for gram in self._grams(value):
+            ids = self._postings.get(gram)
+            if ids is None:
+                continue
+            ids.discard(voter_list_id)
+            if not ids:
+                del self._postings[gram]
+
+    def substring_ids(self, token):
+        ids = {i for i, value in self._short.items() if token in value}
+
+        if len(token) < self.N:
+            # every trigram containing the token (a few thousand at most)
+            for gram, gram_ids in self._postings.items():
+                if token in gram:
+                    ids |= gram_ids
+            return ids
+
+        # rarest trigram first, then confirm the candidates
+        candidates = None
+        for gram in sorted(self._grams(token), key=lambda g: len(self._postings.get(g, ()))):
+            gram_ids = self._postings.get(gram)
+            if not gram_ids:
+                return ids
+            candidates = set(gram_ids) if candidates is None else candidates & gram_ids
+            if not candidates:
+                return ids
+
+        return ids | {i for i in candidates if token in self._values[i]}
+
+
+def _count_prefixed(words, prefix):
+    return sum(1 for w in words if w.startswith(prefix))
+
+
+def _in_name_order(tokens, words):
+    """True when the tokens prefix name words in the same order they were typed."""
+    i = 0
+    for w in words:
+        if i < len(tokens) and w.startswith(tokens[i]):
+            i += 1
+    return i == len(tokens)
+
+
+def relevance_score(tokens, entry, keys_for_tokens=None):
+    """
+    Rank of one indexed voter for a (non fuzzy) search, higher is better:
+    voter_id hits first, then exact word > word prefix > transliterated key
+    match per token, plus a bonus when the tokens follow the name order.
+    """
+    words, epic, keys, _ = entry
+    keys_for_tokens = keys_for_tokens or [token_key(t) for t in tokens]
+    score = 0
+
+    for token, key in zip(tokens, keys_for_tokens):
+        if epic and token == epic:
+            score += 100
+        elif epic and token in epic and any(c.isdigit() for c in token):
+            # only ID-like tokens; "ram" inside "RAM1234567" is no signal
+            score += 50
+
+        if token in words:
+            score += 3
+        elif any(w.startswith(token) for w in words):
+            score += 2
+        elif key and key in keys:
+            score += 2
+        elif key and any(k.startswith(key) for k in keys):
+            score += 1
+
+    if len(tokens) > 1 and _in_name_order(tokens, words):
+        score += len(tokens)
+
+    return score
+
+
+class NameTokenIndex:
+    """
+    In-process inverted index over final_voter_list names.
+
+    Holds prefix postings for the english name words, the transliterated
+    keys of the Marathi name (voter_name_translit) and the fuzzy phonetic
+    codes (voter_name_phonetic), so a token is answered with bisect range
+    scans instead of a regex over every row; voter_id containment is
+    answered from trigram postings.
+    """
+
+    def __init__(self):
+        self._words = _PrefixPostings()
+        self._keys = _PrefixPostings()
+        self._codes = _PrefixPostings()
+        self._epics = _NgramPostings()
+        # voter_list_id -> (words, voter_id lower, translit keys, phonetic codes)
+        self._entries = {}
+        self.version = None
+        self.built_at = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---------- BUILD / MAINTAIN ----------
+
+    def build(self, rows, version=None):
+        """rows: iterable of (voter_list_id, voter_name_eng, voter_id, voter_name_translit, voter_name_phonetic)."""
+        self._words = _PrefixPostings()
+        self._keys = _PrefixPostings()
+        self._codes = _PrefixPostings()
+        self._epics = _NgramPostings()
+        self._entries = {}
+
+        for row in rows:
+            self.upsert(*row)
+
+        self.version = version
+        self.built_at = time.monotonic()
+
+    def remove(self, voter_list_id):
+        entry = self._entries.pop(voter_list_id, None)
+        if not entry:
+            return
+
+        self._words.discard(entry[0], voter_list_id)
+        self._keys.discard(entry[2], voter_list_id)
+        self._codes.discard(entry[3], voter_list_id)
+        self._epics.discard(entry[1], voter_list_id)
+
+    def upsert(self, voter_list_id, name, voter_id, translit=None, phonetic=None):
+        self.remove(voter_list_id)
+
+        words = name_words(name)
+        keys = tuple((translit or "").split())
+        codes = tuple((phonetic or "").split())
+        epic = (voter_id or "").lower()
+        self._entries[voter_list_id] = (words, epic, keys, codes)
+
+        self._words.add(words, voter_list_id)
+        self._keys.add(keys, voter_list_id)
+        self._codes.add(codes, voter_list_id)
+        self._epics.add(epic, voter_list_id)
+
+    def entry(self, voter_list_id):
+        """(words, voter_id lower, translit keys, phonetic codes) for a voter, or None."""
+        return self._entries.get(voter_list_id)
+
+    # ---------- LOOKUPS ----------
+
+    def _token_ids(self, token, required):
+        ids = self._words.prefix_ids(token)
+        if required > 1:
+            ids = {i for i in ids if _count_prefixed(self._entries[i][0], token) >= required}
+
+        key = token_key(token)
+        if key:
+            key_ids = self._keys.prefix_ids(key)
+            if required > 1:
+                key_ids = {
+                    i for i in key_ids
+                    if _count_prefixed(self._entries[i][2], key) >= required
+                }
+            ids |= key_ids
+
+        return ids | self._voter_id_ids(token)
+
+    def _voter_id_ids(self, token):
+        return self._epics.substring_ids(token)
+
+    def search(self, token_counts):
+        """
+        Same rules as the old regex + Counter validation:
+        every token must prefix at least `required` name words (english,
+        or the transliterated Marathi keys), or be contained in the voter_id.
+        """
+        per_token = [
+            self._token_ids(token, required)
+            for token, required in token_counts.items()
+        ]
+
+        # rarest tokens first keeps the intersections small
+        result = None
+        for ids in sorted(per_token, key=len):
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+
+        return result or set()
+
+    def narrow(self, ids, token_counts):
+        """
+        Keep the ids (in order) that still match token_counts, checked against
+        the stored entries only, so the cost is O(len(ids)) not O(index).
+        """
+        checks = [(token, required, token_key(token)) for token, required in token_counts.items()]
+
+        def matches(entry):
+            words, epic, keys, _ = entry
+            for token, required, key in checks:
+                if epic and token in epic:
+                    continue
+                if _count_prefixed(words, token) >= required:
+                    continue
+                if key and _count_prefixed(keys, key) >= required:
+                    continue
+                return False
+            return True
+
+        return [i for i in ids if i in self._entries and matches(self._entries[i])]
+
+    def rank(self, ids, search, limit):
+        """
+        The `limit` most relevant of ids (kept in their given order on equal
+        score). Uses a bounded heap, so only the requested pages are sorted.
+        """
+        tokens = list(search_tokens(search).elements())
+        keys = [token_key(t) for t in tokens]
+        empty = ((), "", (), ())
+
+        def sort_key(pos):
+            entry = self._entries.get(ids[pos], empty)
+            return -relevance_score(tokens, entry, keys), pos
+
+        return [ids[pos] for pos in heapq.nsmallest(limit, range(len(ids)), key=sort_key)]
+
+    def fuzzy_candidates(self, tokens):
+        """Voters whose phonetic codes cover every (long enough) token."""
+        result = None
+
+        for token in tokens:
+            code = phonetic_code(token)
+            if len(code) < MIN_CODE_LENGTH:
+                continue
+
+            ids = self._codes.prefix_ids(code)
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+
+        return result or set()
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def _current_version():
+    return cache.get(INDEX_VERSION_KEY)
+
+
+def _bump_version():
+    cache.add(INDEX_VERSION_KEY, 0, timeout=None)
+    try:
+        return cache.incr(INDEX_VERSION_KEY)
+    except ValueError:
+        return None
+
+
+def get_name_index():
+    """Return the process-wide index, rebuilding it if another worker changed names."""
+    global _index
+    from ..models import VoterList
+
+    version = _current_version()
+    idx = _index
+
+    if (
+        idx is not None
+        and idx.version == version
+        and time.monotonic() - idx.built_at < INDEX_MAX_AGE
+    ):
+        return idx
+
+    with _lock:
+        idx = _index
+        if (
+            idx is not None
+            and idx.version == version
+            and time.monotonic() - idx.built_at < INDEX_MAX_AGE
+        ):
+            return idx
+
+        started = time.monotonic()
+        idx = NameTokenIndex()
+        idx.build(
+            VoterList.objects
+            .values_list("voter_list_id", *INDEX_FIELDS)
+            .iterator(chunk_size=5000),
+            version=version,
+        )
+        _index = idx
+        logger.info(
+            f"name_index: Built name index for {len(idx)} voters "
+            f"in {(time.monotonic() - started) * 1000:.0f} ms"
+        )
+        return idx
+
+
+def index_values(voter):
+    """INDEX_FIELDS of a VoterList instance."""
+    return tuple(getattr(voter, field) for field in INDEX_FIELDS)
+
+
+def refresh_voter_in_index(voter, old_values=None):
+    """
+    Apply a single VoterList write to this process and flag it for the
+    others. old_values: the voter's INDEX_FIELDS before the write (None for
+    a new voter); a write that leaves them unchanged (tag, status, ...)
+    is a no-op, so other workers keep their index.
+    """
+    if old_values is not None and tuple(old_values) == index_values(voter):
+        return
+
+    new_version = _bump_version()
+
+    idx = _index
+    if idx is None:
+        return
+
+    with _lock:
+        idx.upsert(voter.voter_list_id, *index_values(voter))
+        # only adopt the new version if we did not miss anybody else's write
+        if new_version is not None and idx.version == new_version - 1:
+            idx.version = new_version
+
+
+def invalidate_name_index():
+    """Force every worker to rebuild its index (after bulk writes that skip save())."""
+    _bump_version()
+
+
+def search_voter_ids(search):
+    """Set of voter_list_ids matching a free-text search (None when there is nothing to search)."""
+    token_counts = search_tokens(search)
+    if not token_counts:
+        return None
+    return get_name_index().search(token_counts)
@@ -0,0 +1,45 @@
+import re
+
+DIGITS_RE = re.compile(r"^\s*(\d+)\s*$")
+
+# integer shadows of varchar columns, kept in sync by VoterList.save()
+# (columns added / backfilled by `manage.py build_numeric_columns`)
+NUMERIC_COLUMNS = ["age_num", "kramank_serial_num"]
+
+# varchar source column -> the shadow columns derived from it
+SOURCE_COLUMNS = {
+    "age_eng": ["age_num"],
+    "kramank": ["kramank_serial_num"],
+}
+
+
+def to_int(value):
+    """int for a purely numeric string ("45", " 45 "), None otherwise."""
+    match = DIGITS_RE.match(str(value)) if value is not None else None
+    return int(match.group(1)) if match else None
+
+
+def kramank_serial(kramank):
+    """Serial (last segment) of a kramank like 37/123/456 -> 456; None where not numeric."""
+    return to_int(str(kramank or "").split("/")[-1])
+
+
+def numeric_values(age_eng, kramank):
+    return {
+        "age_num": to_int(age_eng),
+        "kramank_serial_num": kramank_serial(kramank),
+    }
+
+
+def shadow_columns(fields):
+    """Shadow columns affected by an update of `fields` (None = every field)."""
+    if fields is None:
+        return list(NUMERIC_COLUMNS)
+    return [c for source in fields for c in SOURCE_COLUMNS.get(source, [])]
+
+
+def sync_numeric_columns(voter, columns=None):
+    """Recompute the shadow columns (or only `columns`) on a VoterList instance (not saved)."""
+    for column, value in numeric_values(voter.age_eng, voter.kramank).items():
+        if columns is None or column in columns:
+            setattr(voter, column, value)
@@ -0,0 +1,106 @@
+import re
+
+from .transliteration import devanagari_to_latin, fold_latin_word, fold_token, has_devanagari
+
+VOWELS_RE = re.compile(r"[aeiou]")
+REPEAT_RE = re.compile(r"(.)\1+")
+
+# sounds that Indian name spellings use interchangeably
+CONSONANT_CLASSES = str.maketrans({
+    "q": "k",
+    "c": "k",
+    "z": "j",
+    "f": "p",
+    "w": "v",
+})
+
+# codes shorter than this are too ambiguous to fuzzy-match on
+MIN_CODE_LENGTH = 2
+
+
+def phonetic_code(word):
+    """
+    Soundex-style key for one name word, built on the transliteration fold.
+
+    Kulkarni / Kulkarny / कुलकर्णी -> "klkrn", Deshmukh / Deshmuk -> "dsmk".
+    """
+    if has_devanagari(word):
+        word = devanagari_to_latin(word)
+
+    w = fold_latin_word(word)
+    if not w:
+        return ""
+
+    w = w.replace("x", "ks").replace("y", "i").translate(CONSONANT_CLASSES)
+
+    # keep the first letter, drop the remaining vowels
+    w = w[0] + VOWELS_RE.sub("", w[1:])
+    return REPEAT_RE.sub(r"\1", w)
+
+
+def name_phonetic_codes(name_eng, name_marathi):
+    """Space separated codes for every word of both names (stored in voter_name_phonetic)."""
+    codes = []
+    for name in (name_eng, name_marathi):
+        for word in (name or "").split():
+            code = phonetic_code(word)
+            if code and code not in codes:
+                codes.append(code)
+
+    return " ".join(codes) or None
+
+
+def edit_distance(a, b):
+    """Plain Levenshtein distance (names are short, so the O(n*m) table is fine)."""
+    if a == b:
+        return 0
+    if not a or not b:
+        return len(a or b)
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        previous = current
+
+    return previous[-1]
+
+
+def fuzzy_distance(tokens, words):
+    """
+    How far a voter's name words are from the search tokens: each token
+    takes its closest word, compared both whole and on the word prefix of
+    the same length so partially typed tokens are not penalised.
+    """
+    if not words:
+        return sum(len(t) for t in tokens)
+
+    total = 0
+    for token in tokens:
+        total += min(
+            min(edit_distance(token, w), edit_distance(token, w[:len(token)]))
+            for w in words
+        )
+    return total
+
+
+def fuzzy_rank(tokens, rows):
+    """
+    rows: (voter_list_id, english name words, transliterated keys).
+    Returns the ids closest first; voters without an english name are
+    compared on their Marathi keys with the tokens folded the same way.
+    """
+    folded = [fold_token(t) for t in tokens]
+
+    def distance(row):
+        _, words, keys = row
+        if words:
+            return fuzzy_distance(tokens, words)
+        return fuzzy_distance(folded, keys)
+
+    return [row[0] for row in sorted(rows, key=distance)]
@@ -0,0 +1,141 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .dashboard_stats import TAG_COUNTS, week_bounds
+
+# Daily progress rollup: tag transitions per (day, acting user, from tag,
+# to tag) in voter_progress_daily, so progress trends over any range are
+# read from a small table instead of GROUP BYs over final_voter_list.
+#
+# Filled by update_voter (record_tag_change) as tags change, and rebuilt
+# from the tag changes in voter_activity_log by
+# `manage.py build_progress_rollup`.
+#
+# A visit is a transition to any tag but "clear" (tag 5, which also
+# clears check_progress_date); a voter retagged twice counts twice.
+
+CLEAR_TAG_ID = 5
+
+GRANULARITIES = ("day", "week", "month")
+
+# longest range served (any granularity)
+MAX_DAYS = 366
+
+CONFLICT_KEY = (
+    "day, COALESCE(user_id, 0), COALESCE(from_tag_id, 0), COALESCE(to_tag_id, 0)"
+)
+
+CREATE_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS voter_progress_daily (
+    id bigserial PRIMARY KEY,
+    day date NOT NULL,
+    user_id integer NULL,
+    from_tag_id integer NULL,
+    to_tag_id integer NULL,
+    transitions integer NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS voter_progress_daily_key
+    ON voter_progress_daily ({CONFLICT_KEY});
+"""
+
+# tag changes logged by update_voter store tag names, not ids
+BACKFILL_SQL = """
+INSERT INTO voter_progress_daily (day, user_id, from_tag_id, to_tag_id, transitions)
+SELECT l.created_at::date, l.user_id, ft.tag_id, tt.tag_id, COUNT(*)
+FROM voter_activity_log l
+LEFT JOIN voter_tags ft ON ft.tag_name = l.old_data->>'tag_id'
+LEFT JOIN voter_tags tt ON tt.tag_name = l.new_data->>'tag_id'
+WHERE l.new_data ? 'tag_id'
+GROUP BY 1, 2, 3, 4
+"""
+
+
+def record_tag_change(user_id, from_tag_id, to_tag_id, day=None):
+    """Count one tag transition made by `user_id` (today by default)."""
+    day = day or timezone.now().date()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO voter_progress_daily
+                (day, user_id, from_tag_id, to_tag_id, transitions)
+            VALUES (%s, %s, %s, %s, 1)
+            ON CONFLICT ({CONFLICT_KEY})
+            DO UPDATE SET transitions = voter_progress_daily.transitions + 1
+            """,
+            [day, user_id, from_tag_id, to_tag_id],
+        )
+
+
+def rebuild_rollup():
+    """Recompute the rollup from voter_activity_log; returns the row count."""
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute("DELETE FROM voter_progress_daily")
+        cursor.execute(BACKFILL_SQL)
+        return cursor.rowcount
+
+
+def period_start(day, granularity):
+    if granularity == "week":
+        return week_bounds(day)[0]  # Sunday, as on the dashboards
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(start, granularity):
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def progress_series(date_from, date_to, granularity="day", user_id=None):
+    """
+    Visits / transitions per period between date_from and date_to
+    (inclusive), optionally for one acting user. One query over the rollup;
+    empty periods are included so the series is continuous.
+    """
+    from ..models import ProgressDaily
+
+    counts = {
+        "visits": Sum("transitions", default=0, filter=~Q(to_tag_id=CLEAR_TAG_ID)),
+        "transitions": Sum("transitions", default=0),
+    }
+    for key, tag_id in TAG_COUNTS.items():
+        counts[key] = Sum("transitions", default=0, filter=Q(to_tag_id=tag_id))
+
+    qs = ProgressDaily.objects.filter(day__range=(date_from, date_to))
+    if user_id is not None:
+        qs = qs.filter(user_id=user_id)
+
+    # per day in SQL, bucketed into weeks / months here ("n_" keeps the
+    # aliases clear of the model's own `transitions` column)
+    periods = defaultdict(lambda: dict.fromkeys(counts, 0))
+    annotations = {f"n_{key}": agg for key, agg in counts.items()}
+    for row in qs.values("day").annotate(**annotations).order_by():
+        bucket = periods[period_start(row["day"], granularity)]
+        for key in counts:
+            bucket[key] += row[f"n_{key}"]
+
+    series = []
+    cumulative_visits = 0
+    start = period_start(date_from, granularity)
+
+    while start <= date_to:
+        bucket = periods[start]
+        cumulative_visits += bucket["visits"]
+        series.append({
+            "period_start": start,
+            **bucket,
+            "cumulative_visits": cumulative_visits,
+        })
+        start = _next_period(start, granularity)
+
+    return series
@@ -0,0 +1,204 @@
+import re
+
+from django.conf import settings
+from django.db.models import BooleanField, Case, FloatField, IntegerField, Q, When
+from django.db.models.expressions import RawSQL
+
+from logger import logger
+from .name_index import get_name_index, name_words, search_tokens, search_voter_ids
+from .phonetic import MIN_CODE_LENGTH, fuzzy_rank, phonetic_code
+from .transliteration import token_key
+
+# fuzzy mode is for typo lookups, a few hundred closest matches is plenty
+FUZZY_MAX_RESULTS = 500
+
+# short prefixes ("a", "pa") match a large share of the list; past this many
+# ids an IN list costs more than letting Postgres evaluate the search
+INDEX_MAX_IDS = 5000
+
+
+def filter_in_order(qs, ids):
+    """Restrict `qs` to `ids` and keep that order (ids already ranked in Python)."""
+    if not ids:
+        return qs.none()
+
+    ordering = Case(
+        *[When(voter_list_id=pk, then=pos) for pos, pk in enumerate(ids)],
+        output_field=IntegerField(),
+    )
+    return qs.filter(voter_list_id__in=ids).order_by(ordering)
+
+
+class BaseSearchBackend:
+    """
+    A voter search backend narrows a VoterList queryset for a free-text query.
+
+    Implementations must return a lazy queryset (never a list) so callers can
+    keep stacking filters, ordering and pagination into one SQL statement.
+    """
+
+    name = None
+
+    def search(self, qs, search):
+        raise NotImplementedError
+
+    def fuzzy_search(self, qs, search):
+        """Spelling-tolerant search, closest names first."""
+        raise NotImplementedError
+
+    def ranked_ids(self, qs, search):
+        """
+        voter_list_ids of `qs` (a search() result), most relevant first;
+        equal scores keep the queryset's order.
+        """
+        raise NotImplementedError
+
+
+class NameIndexSearchBackend(BaseSearchBackend):
+    """
+    Resolves candidates from the in-process token-prefix index. Broad
+    queries (over INDEX_MAX_IDS matches) are handed to the postgres backend
+    instead of being sent as a huge IN list.
+    """
+
+    name = "index"
+
+    def search(self, qs, search):
+        ids = search_voter_ids(search)
+        if ids is None:
+            return qs
+
+        if not ids:
+            return qs.none()
+
+        if len(ids) > INDEX_MAX_IDS:
+            return PostgresSearchBackend().search(qs, search)
+
+        return qs.filter(voter_list_id__in=ids)
+
+    def fuzzy_search(self, qs, search):
+        tokens = list(search_tokens(search))
+        if not tokens:
+            return qs
+
+        index = get_name_index()
+        ids = index.fuzzy_candidates(tokens)
+        if not ids:
+            return qs.none()
+
+        rows = []
+        for voter_list_id in qs.filter(voter_list_id__in=ids).values_list("voter_list_id", flat=True):
+            words, _, keys, _ = index.entry(voter_list_id) or ((), "", (), ())
+            rows.append((voter_list_id, words, keys))
+
+        return filter_in_order(qs, fuzzy_rank(tokens, rows)[:FUZZY_MAX_RESULTS])
+
+    def ranked_ids(self, qs, search):
+        ids = list(qs.values_list("voter_list_id", flat=True))
+        return get_name_index().rank(ids, search, len(ids))
+
+
+def _repeated_word_regex(token, required):
+    word = rf"\m{re.escape(token)}"
+    return ".*".join([word] * required)
+
+
+def _tsquery_prefix(token):
+    # quoted lexeme so punctuation in the token can't break to_tsquery syntax
+    return "'" + token.replace("\\", "\\\\").replace("'", "''") + "':*"
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Pushes the search into Postgres.
+
+    Needs the objects created by `manage.py create_search_indexes`:
+    a generated `search_vector` tsvector (GIN) for word-prefix matches and
+    pg_trgm GIN indexes that serve the voter_id substring and repeated-token
+    regex checks. The voter_name_translit / voter_name_phonetic trigram
+    indexes come from `manage.py build_search_keys`.
+    """
+
+    name = "postgres"
+
+    def search(self, qs, search):
+        token_counts = search_tokens(search)
+        if not token_counts:
+            return qs
+
+        for token, required in token_counts.items():
+            if required > 1:
+                name_q = Q(voter_name_eng__iregex=_repeated_word_regex(token, required))
+            else:
+                name_q = Q(RawSQL(
+                    "\"final_voter_list\".\"search_vector\" @@ to_tsquery('simple', %s)",
+                    [_tsquery_prefix(token)],
+                    output_field=BooleanField(),
+                ))
+
+            # latin <-> devanagari through the phonetic key column
+            key = token_key(token)
+            if key:
+                name_q |= Q(voter_name_translit__regex=_repeated_word_regex(key, required))
+
+            qs = qs.filter(name_q | Q(voter_id__icontains=token))
+
+        return qs
+
+    def fuzzy_search(self, qs, search):
+        tokens = list(search_tokens(search))
+        if not tokens:
+            return qs
+
+        candidates = qs
+        for token in tokens:
+            code = phonetic_code(token)
+            if len(code) >= MIN_CODE_LENGTH:
+                candidates = candidates.filter(voter_name_phonetic__regex=rf"\m{re.escape(code)}")
+
+        if candidates is qs:
+            return qs.none()
+
+        rows = [
+            (voter_list_id, name_words(name), tuple((translit or "").split()))
+            for voter_list_id, name, translit in candidates.values_list(
+                "voter_list_id", "voter_name_eng", "voter_name_translit"
+            )
+        ]
+        return filter_in_order(qs, fuzzy_rank(tokens, rows)[:FUZZY_MAX_RESULTS])
+
+    def ranked_ids(self, qs, search):
+        tokens = list(search_tokens(search))
+        if tokens:
+            # voter_id hits first, then full-text rank + trigram closeness
+            score = RawSQL(
+                "CASE WHEN upper(\"final_voter_list\".\"voter_id\") = ANY(%s) THEN 100 ELSE 0 END"
+                " + ts_rank(\"final_voter_list\".\"search_vector\", to_tsquery('simple', %s))"
+                " + similarity(coalesce(\"final_voter_list\".\"voter_name_eng\", ''), %s)",
+                [
+                    [t.upper() for t in tokens],
+                    " & ".join(_tsquery_prefix(t) for t in tokens),
+                    " ".join(tokens),
+                ],
+                output_field=FloatField(),
+            )
+            qs = qs.annotate(search_rank=score).order_by("-search_rank", *qs.query.order_by)
+
+        return list(qs.values_list("voter_list_id", flat=True))
+
+
+SEARCH_BACKENDS = {
+    NameIndexSearchBackend.name: NameIndexSearchBackend,
+    PostgresSearchBackend.name: PostgresSearchBackend,
+}
+
+
+def get_search_backend(name=None):
+    name = name or getattr(settings, "VOTER_SEARCH_BACKEND", NameIndexSearchBackend.name)
+
+    backend_cls = SEARCH_BACKENDS.get(name)
+    if backend_cls is None:
+        logger.warning(f"search_backends: Unknown search backend '{name}', falling back to index")
+        backend_cls = NameIndexSearchBackend
+
+    return backend_cls()
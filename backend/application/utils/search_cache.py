@@ -0,0 +1,116 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+
+from .name_index import search_tokens
+
+# bumped by every endpoint that changes what a search/filter can return
+# (voter edits, new voters, assignments); entries from an older version
+# are ignored
+SEARCH_CACHE_VERSION_KEY = "voter_search_cache:version"
+
+SEARCH_CACHE_TTL = 10 * 60
+
+# very broad filters are cheaper to re-run than to ship through redis
+SEARCH_CACHE_MAX_IDS = 50000
+
+# request params that only pick the page, not the result set
+PAGINATION_PARAMS = {"page", "size", "cursor", "include_total"}
+
+
+def _initial_version():
+    # seeded from the clock rather than 0, so a flushed cache never hands out
+    # a version (or an ETag built on it, see utils/etags.py) seen before
+    return int(time.time() * 1000)
+
+
+def search_cache_version():
+    version = cache.get(SEARCH_CACHE_VERSION_KEY)
+    if version is None:
+        cache.add(SEARCH_CACHE_VERSION_KEY, _initial_version(), timeout=None)
+        version = cache.get(SEARCH_CACHE_VERSION_KEY)
+    return version
+
+
+def bump_search_cache_version():
+    """Invalidate every cached search result (call after voter / assignment writes)."""
+    cache.add(SEARCH_CACHE_VERSION_KEY, _initial_version(), timeout=None)
+    try:
+        cache.incr(SEARCH_CACHE_VERSION_KEY)
+    except ValueError:
+        pass
+
+
+def _normalize_param(name, value):
+    if name == "search":
+        return sorted(search_tokens(value).items())
+    if "," in value:
+        return sorted(v.strip().lower() for v in value.split(",") if v.strip())
+    return value.strip().lower()
+
+
+def search_cache_key(endpoint, params, scope):
+    """
+    Cache key for a search/filter result set: the search as a token multiset,
+    the other (non pagination) params normalised and the caller's scope.
+    """
+    normalized = {
+        name: _normalize_param(name, value)
+        for name, value in params.items()
+        if name not in PAGINATION_PARAMS and value not in (None, "")
+    }
+    raw = json.dumps([endpoint, scope, normalized], sort_keys=True)
+    return f"voter_search:{endpoint}:" + hashlib.md5(raw.encode()).hexdigest()
+
+
+def filter_cache_key(endpoint, spec, scope):
+    """Cache key for a FilterSpec result set (the spec is already normalised)."""
+    return f"voter_search:{endpoint}:{scope}:{spec.key()}"
+
+
+def _row_id(row):
+    # qs may be a .values() projection (utils/voter_rows)
+    return row["voter_list_id"] if isinstance(row, dict) else row.voter_list_id
+
+
+def cached_voter_ids(key, qs, ids_of=None):
+    """
+    Ordered voter_list_ids of qs, served from the cache while the version
+    stamp matches. ids_of(qs) computes the list on a miss when the result
+    order differs from the query's (relevance), so it is ranked once per
+    query rather than per page.
+    """
+    version = search_cache_version()
+
+    entry = cache.get(key)
+    if entry and version is not None and entry["version"] == version:
+        return entry["ids"]
+
+    if ids_of is None:
+        ids = list(qs.values_list("voter_list_id", flat=True))
+    else:
+        ids = ids_of(qs)
+    if version is not None and len(ids) <= SEARCH_CACHE_MAX_IDS:
+        cache.set(key, {"version": version, "ids": ids}, SEARCH_CACHE_TTL)
+    return ids
+
+
+def paginate_cached_ids(qs, key, size, page, ids_of=None):
+    """
+    Page through the cached id list and load only that page's rows from qs.
+    Returns (rows, paginator).
+    """
+    return paginate_ids(qs, cached_voter_ids(key, qs, ids_of), size, page)
+
+
+def paginate_ids(qs, ids, size, page):
+    """paginate_cached_ids for an id list that is already known (e.g. from the facet index)."""
+    paginator = Paginator(ids, size)
+    page_obj = paginator.get_page(page)
+    page_ids = list(page_obj)
+
+    rows = {_row_id(v): v for v in qs.filter(voter_list_id__in=page_ids)}
+    return [rows[i] for i in page_ids if i in rows], paginator
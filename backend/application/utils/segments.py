@@ -0,0 +1,224 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from logger import logger
+from .filter_spec import ENDS_FILTERS, MULTI_FILTERS, TEXT_FILTERS, FilterSpec
+from .user_scope import get_user_scope
+
+# query params a segment definition keeps (everything FilterSpec reads)
+SEGMENT_PARAMS = [
+    "search", "voter_id", "kramank", "age_ranges", "tag_id",
+    *TEXT_FILTERS, *ENDS_FILTERS, *MULTI_FILTERS,
+]
+
+ADMIN_ROLES = ["SuperAdmin", "Admin"]
+
+# segment param -> VoterList fields it reads, so a refresh can skip the
+# segments a write cannot affect (name search also probes voter_id / kramank)
+PARAM_FIELDS = {
+    "search": {
+        "voter_name_eng", "voter_name_marathi", "voter_name_translit",
+        "voter_name_phonetic", "voter_id", "kramank",
+    },
+    "voter_id": {"voter_id"},
+    "kramank": {"kramank"},
+    "age_ranges": {"age_eng", "age_num"},
+    "tag_id": {"tag_id"},
+    **{name: {column} for name, (column, _) in TEXT_FILTERS.items()},
+    **{name: {column} for name, column in ENDS_FILTERS.items()},
+    **{name: {column} for name, column in MULTI_FILTERS.items()},
+}
+
+# voter_segment is not migrated; `manage.py create_segment_table` runs this
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS voter_segment (
+    id bigserial PRIMARY KEY,
+    name varchar(255) NOT NULL,
+    owner_id integer NOT NULL
+        REFERENCES voter_user_master (user_id) ON DELETE CASCADE,
+    params jsonb NOT NULL DEFAULT '{}'::jsonb,
+    spec_key varchar(32) NOT NULL,
+    scope_user_id integer NULL,
+    voter_ids integer[] NOT NULL DEFAULT '{}',
+    member_count integer NOT NULL DEFAULT 0,
+    refreshed_at timestamp with time zone NULL,
+    created_at timestamp with time zone NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS voter_segment_owner_id ON voter_segment (owner_id);
+"""
+
+
+def create_segment_table():
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+
+
+def segment_params(params):
+    """The non-empty filter params of a request (request.GET or a JSON body)."""
+    kept = {}
+    for name in SEGMENT_PARAMS:
+        value = params.get(name)
+        if isinstance(value, (list, tuple)):
+            value = ",".join(str(v) for v in value)
+        if value not in (None, ""):
+            kept[name] = str(value)
+    return kept
+
+
+def segment_spec(segment):
+    return FilterSpec.from_params(segment.params)
+
+
+def _segment_queryset(segment):
+    from ..models import VoterList
+
+    qs = VoterList.objects.all()
+    if segment.scope_user_id is not None:
+        qs = qs.filter(user_id=segment.scope_user_id)
+    return qs
+
+
+def materialize_segment(segment):
+    """Evaluate the segment's filter once and store its member ids (saved)."""
+    spec = segment_spec(segment)
+    qs, _ = spec.compile(_segment_queryset(segment))
+
+    segment.spec_key = spec.key()
+    segment.voter_ids = list(
+        qs.order_by("voter_list_id").values_list("voter_list_id", flat=True)
+    )
+    segment.member_count = len(segment.voter_ids)
+    segment.refreshed_at = timezone.now()
+    segment.save()
+
+    logger.info(f"segments: materialized '{segment.name}' with {segment.member_count} voters")
+    return segment
+
+
+def refresh_segments(voter_ids, assignment=False, fields=None):
+    """
+    Incremental refresh after voters were changed: the filter of every
+    segment is re-evaluated on the touched voters only and their membership
+    patched, instead of re-running it over the whole list.
+
+    fields: the VoterList fields that changed (None = unknown / new voters);
+    only segments whose params read one of them are re-evaluated.
+    assignment=True is short for fields={"user"}: just the user scoped
+    segments can be affected.
+
+    Runs once the caller's transaction commits, and never raises: the
+    voter change is already saved, a failed refresh is logged and the
+    segment is fixed by its next refresh / re-materialize.
+    """
+    touched = {int(v) for v in voter_ids}
+    if not touched:
+        return
+
+    if assignment:
+        fields = {"user"}
+    elif fields is not None:
+        fields = field_names(fields)
+        if not fields:
+            return
+
+    transaction.on_commit(lambda: _refresh_segments_safely(touched, fields))
+
+
+def _refresh_segments_safely(touched, fields):
+    try:
+        _refresh_segments(touched, fields)
+    except Exception as e:
+        logger.error(f"segments: refresh for {len(touched)} voters failed: {e}")
+
+
+def field_names(names):
+    """VoterList field names for field names or attnames (religion_id -> religion)."""
+    from django.core.exceptions import FieldDoesNotExist
+    from ..models import VoterList
+
+    result = set()
+    for name in names:
+        try:
+            result.add(VoterList._meta.get_field(name).name)
+        except FieldDoesNotExist:
+            result.add(name)
+    return result
+
+
+def segment_reads(params, scope_user_id, fields):
+    """True when a segment (its params and user scope) depends on one of `fields`."""
+    if fields is None:
+        return True
+    if scope_user_id is not None and "user" in fields:
+        return True
+    return any(fields & field_names(PARAM_FIELDS.get(name, ())) for name in params)
+
+
+def patched_members(members, touched, matched):
+    """Segment members after re-evaluating `touched` voters (None when unchanged)."""
+    updated = (members - touched) | matched
+    return None if updated == members else updated
+
+
+def _refresh_segments(touched, fields):
+    from ..models import VoterSegment
+
+    segment_ids = [
+        segment_id
+        for segment_id, params, scope_user_id in (
+            VoterSegment.objects.values_list("id", "params", "scope_user_id")
+        )
+        if segment_reads(params, scope_user_id, fields)
+    ]
+
+    changed = 0
+    for segment_id in segment_ids:
+        with transaction.atomic():
+            segment = VoterSegment.objects.select_for_update().get(id=segment_id)
+
+            qs, _ = segment_spec(segment).compile(
+                _segment_queryset(segment).filter(voter_list_id__in=touched)
+            )
+            matched = set(qs.values_list("voter_list_id", flat=True))
+
+            updated = patched_members(set(segment.voter_ids), touched, matched)
+            if updated is None:
+                continue
+
+            segment.voter_ids = sorted(updated)
+            segment.member_count = len(updated)
+            segment.refreshed_at = timezone.now()
+            segment.save(update_fields=["voter_ids", "member_count", "refreshed_at"])
+            changed += 1
+
+    if changed:
+        logger.info(f"segments: refreshed {changed} segments for {len(touched)} voters")
+    return changed
+
+
+def visible_segments(user):
+    """Segments the user may use: admins see all, others their own."""
+    from ..models import VoterSegment
+
+    qs = VoterSegment.objects.all()
+    if get_user_scope(user).role not in ADMIN_ROLES:
+        qs = qs.filter(owner_id=user.user_id)
+    return qs
+
+
+def segment_voter_ids(segment_id, user):
+    """
+    Materialized member ids of a segment, for the endpoints that take a
+    segment_id (exports, WhatsApp sends, assignment). Raises
+    VoterSegment.DoesNotExist when missing (or not a number) or not
+    visible to the user.
+    """
+    from ..models import VoterSegment
+
+    if not str(segment_id).isdigit():
+        raise VoterSegment.DoesNotExist(f"Invalid segment id {segment_id!r}")
+    return (
+        visible_segments(user)
+        .values_list("voter_ids", flat=True)
+        .get(id=segment_id)
+    )
@@ -0,0 +1,85 @@
+import re
+
+from indic_transliteration import sanscript
+from indic_transliteration.sanscript import transliterate
+
+DEVANAGARI_RE = re.compile(r"[ऀ-ॿ]")
+NON_LETTERS_RE = re.compile(r"[^a-z]")
+ASPIRATE_RE = re.compile(r"([bcdfgjklmnpqrstvxyz])h")
+REPEAT_RE = re.compile(r"(.)\1+")
+
+# Harvard-Kyoto spellings that Marathi speakers write differently in Latin
+HK_REPLACEMENTS = (
+    ("jJ", "dny"),   # ज्ञ -> dnyaneshwar
+    ("R", "ru"),     # ऋ  -> rushikesh
+    ("M", "n"),      # anusvara
+)
+
+# Shortest folded token that is matched against the transliterated keys.
+# Shorter Latin tokens would match half the ward once vowels are dropped.
+MIN_LATIN_KEY_LENGTH = 3
+
+
+def has_devanagari(text):
+    return bool(text) and bool(DEVANAGARI_RE.search(text))
+
+
+def fold_latin_word(word):
+    """
+    Coarse phonetic key for one latin word.
+
+    Both Devanagari names (after transliteration) and what volunteers type
+    go through this, so "Deshmukh" and देशमुख ("dezamukha") both end up
+    as "desmuk".
+    """
+    w = (word or "").lower()
+    w = w.replace("sh", "s").replace("z", "s").replace("w", "v")
+    w = ASPIRATE_RE.sub(r"\1", w)
+    w = w.replace("ee", "i").replace("ii", "i").replace("oo", "u").replace("uu", "u")
+    w = w.replace("mb", "nb").replace("mp", "np")
+    w = NON_LETTERS_RE.sub("", w)
+
+    if not w:
+        return ""
+
+    # inherent / unstressed "a" is the main spelling difference (pATIla vs patil)
+    w = w[0] + w[1:].replace("a", "")
+    return REPEAT_RE.sub(r"\1", w)
+
+
+def devanagari_to_latin(text):
+    latin = transliterate(text, sanscript.DEVANAGARI, sanscript.HK)
+    for src, dst in HK_REPLACEMENTS:
+        latin = latin.replace(src, dst)
+    return latin
+
+
+def marathi_name_key(name):
+    """Space separated phonetic keys for a Devanagari name (stored in voter_name_translit)."""
+    if not name or not name.strip():
+        return None
+
+    keys = [fold_latin_word(w) for w in devanagari_to_latin(name.strip()).split()]
+    keys = [k for k in keys if k]
+    return " ".join(keys) or None
+
+
+def fold_token(token):
+    """Phonetic key for a token in either script, without any length cut-off."""
+    if has_devanagari(token):
+        token = devanagari_to_latin(token)
+    return fold_latin_word(token)
+
+
+def token_key(token):
+    """
+    Phonetic key for one search token, or None when the token should not be
+    matched against transliterated names (too short / no letters).
+    """
+    key = fold_token(token)
+    if has_devanagari(token):
+        return key or None
+
+    if len(key) < MIN_LATIN_KEY_LENGTH:
+        return None
+    return key
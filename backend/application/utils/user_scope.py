@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+USER_SCOPE_TTL = 10 * 60
+
+# roles whose lists are narrowed to their assigned voters (when they have any)
+SCOPED_ROLES = ["Volunteer"]
+
+
+def _key(user_id):
+    return f"voter_user_scope:{user_id}"
+
+
+@dataclass(frozen=True)
+class UserScope:
+    """
+    What a user's voter lists cover: role name plus assignment state.
+    Resolved once and kept in the shared cache, so list endpoints skip the
+    role lookup and the "has assigned voters" query.
+    """
+
+    user_id: int
+    role: str
+    assigned_count: int
+
+    @property
+    def has_assigned(self):
+        return self.assigned_count > 0
+
+    @property
+    def restricted(self):
+        """True when the lists show only this user's assigned voters."""
+        return self.role in SCOPED_ROLES and self.has_assigned
+
+    @property
+    def name(self):
+        """Scope label used in search / filter cache keys."""
+        return f"assigned:{self.user_id}" if self.restricted else "all"
+
+    def apply(self, qs):
+        return qs.filter(user_id=self.user_id) if self.restricted else qs
+
+
+def get_user_scope(user):
+    """UserScope for an authenticated VoterUserMaster (cached per user)."""
+    from ..models import Roles, VoterList
+
+    key = _key(user.user_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return UserScope(user.user_id, *cached)
+
+    role = (
+        Roles.objects
+        .filter(role_id=user.role_id)
+        .values_list("role_name", flat=True)
+        .first()
+    )
+    assigned_count = VoterList.objects.filter(user_id=user.user_id).count()
+
+    cache.set(key, (role, assigned_count), USER_SCOPE_TTL)
+    return UserScope(user.user_id, role, assigned_count)
+
+
+def invalidate_user_scope(*user_ids):
+    """Drop cached scopes (call after assignment or role changes)."""
+    keys = [_key(u) for u in user_ids if u is not None]
+    if keys:
+        cache.delete_many(keys)
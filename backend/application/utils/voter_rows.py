@@ -0,0 +1,108 @@
+# Row projection shared by the voter list endpoints (voters_info,
+# voters_search, family_dropdown_search, filter, unassigned_voters,
+# volunteer_voters_page): the page is loaded with .values() over only the
+# columns a row needs, instead of hydrating every VoterList field (image,
+# addresses, comments...).
+
+# columns every list row reads
+ROW_COLUMNS = [
+    "voter_list_id",
+    "sr_no",
+    "voter_id",
+    "kramank",
+    "ward_no",
+    "badge",
+    "location",
+    "mobile_no",
+    "alternate_mobile1",
+    "alternate_mobile2",
+    "tag_id__tag_name",
+]
+
+# language specific columns (is_marathi -> columns)
+LANG_COLUMNS = {
+    False: ["first_name", "last_name", "voter_name_eng", "age_eng", "gender_eng"],
+    # name split / localized location are precomputed (utils/display_columns.py)
+    True: [
+        "first_name_mar", "last_name_mar", "voter_name_marathi",
+        "age", "age_eng", "gender", "location_mar",
+    ],
+}
+
+
+def split_marathi_name(full_name):
+    if not full_name:
+        return None, None, None
+
+    parts = full_name.strip().split()
+
+    last_name = parts[0] if len(parts) > 0 else None
+    first_name = parts[1] if len(parts) > 1 else None
+    middle_name = " ".join(parts[2:]) if len(parts) > 2 else None
+
+    return first_name, middle_name, last_name
+
+
+def format_mobile_with_country_code(mobile: str) -> str:
+    """Prepend 91 to 10-digit mobile numbers."""
+    if not mobile:
+        return None
+    mobile = mobile.strip()
+    if len(mobile) == 10:
+        return f"91{mobile}"
+    return mobile
+
+
+def project_voters(qs, is_marathi, extra=()):
+    """qs as .values() dicts with just the columns voter_rows() reads (plus `extra`)."""
+    return qs.values(*ROW_COLUMNS, *LANG_COLUMNS[is_marathi], *extra)
+
+
+def voter_rows(rows, is_marathi, localize_location=False, marathi_age="age"):
+    """
+    Response dicts for projected rows (see project_voters).
+
+    localize_location: Marathi clients get रिमोट / स्थानिक (location_mar)
+    instead of the stored value. marathi_age: column used for the Marathi age.
+    """
+    data = []
+    append = data.append
+
+    for v in rows:
+        mobile = v["mobile_no"] or v["alternate_mobile1"] or v["alternate_mobile2"]
+        location = v["location"]
+
+        if is_marathi:
+            first_name = v["first_name_mar"]
+            last_name = v["last_name_mar"]
+            voter_name = v["voter_name_marathi"]
+            age = v[marathi_age]
+            gender = v["gender"]
+            if localize_location:
+                location = v["location_mar"]
+        else:
+            first_name = v["first_name"]
+            last_name = v["last_name"]
+            voter_name = v["voter_name_eng"]
+            age = v["age_eng"]
+            gender = v["gender_eng"]
+
+        append({
+            "sr_no": v["sr_no"],
+            "voter_list_id": v["voter_list_id"],
+            "voter_id": v["voter_id"],
+            "first_name": first_name,
+            "last_name": last_name,
+            "voter_name_eng": voter_name,
+            "kramank": v["kramank"],
+            "age": age,
+            "gender": gender,
+            "ward_id": v["ward_no"],
+            "tag": v["tag_id__tag_name"],
+            "badge": v["badge"],
+            "location": location,
+            "show_whatsapp": bool(mobile),
+            "mobile_no": format_mobile_with_country_code(mobile),
+        })
+
+    return data
@@ -1,4 +1,4 @@
-from .search_api import voters_search,family_dropdown_search
+from .search_api import voters_search,family_dropdown_search,voters_autocomplete
 from .single_voters_api import single_voters_info
 from .update_api import update_voter
 from .voters_info_api import voters_info
@@ -6,7 +6,7 @@ from .add_voter_api import add_voter
 from .db_list_api import tags ,index , roles
 from .add_relationship_api import add_relation,remove_relation
 from .super_admin_dashboard_api import dashboard,admin_allocation_panel,unassigned_voters,assign_voters_to_karyakarta,auto_select_unassigned_voters,auto_unassign_voters,unassign_voters,unassign_all_voters_of_karyakarta
-from .filter_api import filter
+from .filter_api import filter,filter_facets
 from .caste_religion_api import caste_dropdown,religion_dropdown
 from .occupation_api import occupation_dropdown
 from .registration_api import registration,upload_login_credentials_excel,list_uploaded_login_excels,download_login_excel,delete_uploaded_login_excel
@@ -25,6 +25,8 @@ from .user_details import list_all_users
 from .twilio_api import otp_start,otp_verify,health,reset_password
 from .print_api import list_voters_for_print
 from .captcha import get_captcha
+from .segment_api import segments,segment_detail,segment_refresh
+from .progress_api import progress_trend
 
 __all__ = [
     "tags",
@@ -85,4 +87,5 @@ __all__ = [
     "list_voters_for_print",
     "voters_export",
     "get_captcha",
+    "progress_trend",
 ]
\ No newline at end of file
@@ -7,6 +7,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from logger import logger
+from ..utils.search_cache import bump_search_cache_version
+from ..utils.segments import refresh_segments
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -97,6 +99,8 @@ def add_voter(request):
         )
 
         voter.refresh_from_db()
+        bump_search_cache_version()
+        refresh_segments([voter.voter_list_id])
         return JsonResponse({
             "status": True,
             "message": "Voter added successfully",
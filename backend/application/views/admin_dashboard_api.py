@@ -1,18 +1,20 @@
 from ..models import VoterList,VoterUserMaster
-from django.db.models import Count
-from django.utils import timezone
-from datetime import timedelta
-from django.db.models import Count, OuterRef
 from django.db import transaction
 import json
 from django.core.paginator import Paginator, EmptyPage
-from collections import defaultdict
 from .voters_info_api import split_marathi_name
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from logger import logger
 from .view_utils import log_action_user
+from ..utils.facet_index import invalidate_facet_index
+from ..utils.search_cache import bump_search_cache_version
+from ..utils.segments import refresh_segments
+from ..utils.assignment_counts import allocation_members
+from ..utils.dashboard_counters import track_counters
+from ..utils.dashboard_stats import dashboard_members, dashboard_stats
+from ..utils.user_scope import get_user_scope, invalidate_user_scope
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
@@ -20,138 +22,20 @@ def admin_dashboard(request):
     logger.info("admin_dashboard_api: Admin dashboard request received")
 
     user = request.user
-    user_id = user.user_id
-
-    # -------- GET USER & ROLE --------
-    try:
-        user = (
-            VoterUserMaster.objects
-            .select_related("role")
-            .get(user_id=user_id)
-        )
-    except VoterUserMaster.DoesNotExist:
-        return Response(
-            {"status": False, "message": "User not found"},
-            status=404
-        )
 
     # -------- ROLE-BASED QUERY --------
-    from django.db.models import Q
-
     privileged_roles = ["Admin"]
 
-    if user.role.role_name in privileged_roles:   
-        assigned_count = VoterList.objects.filter(user=user).count()
-
-        visited_count = VoterList.objects.filter(
-            user=user,
-            check_progress_date__isnull=False
-        ).count()
-
-        # sr_range = VoterList.objects.filter(user=user).aggregate(
-        #     min_sr=Min("sr_no"),
-        #     max_sr=Max("sr_no")
-        # )
+    if get_user_scope(user).role in privileged_roles:
+        # every count (own assigned / visited included) in one aggregate
+        stats = dashboard_stats(assigned_to=user.user_id)
 
+        assigned_count = stats["assigned"]
+        visited_count = stats["assigned_visited"]
         pending_count = assigned_count - visited_count
-        
-        today = timezone.now().date()
-
-        # Sunday start
-        start_of_week = today - timedelta(days=(today.weekday() + 1) % 7)
-        end_of_week = start_of_week + timedelta(days=6)
-
-        start_of_last_week = start_of_week - timedelta(days=7)
-        end_of_last_week = start_of_week - timedelta(days=1)
-
-        this_week_count = VoterList.objects.filter(
-            # check_progress=True,
-            check_progress_date__range=(start_of_week, end_of_week)
-        ).count()
-
-        last_week_count = VoterList.objects.filter(
-            # check_progress=True,
-            check_progress_date__range=(start_of_last_week, end_of_last_week)
-        ).count()
-
-        difference = this_week_count - last_week_count  
-        
-        total_voters = VoterList.objects.count()
-        # voter_list_count = VoterList.objects.filter(vo)
-        golden_color_tags = VoterList.objects.filter(tag_id = 4).count()
-        red_color_tags = VoterList.objects.filter(tag_id = 3).count()
-        orange_color_tags = VoterList.objects.filter(tag_id = 2).count()
-        green_color_tags = VoterList.objects.filter(tag_id = 1).count()
-
-        created_karyakarta_count = (
-            VoterUserMaster.objects
-            .filter(created_by=OuterRef('user_id'))
-            .values('created_by')
-            .annotate(count=Count('*'))
-            .values('count')
-        )
-
-        karyakarta_users = (
-            VoterUserMaster.objects
-            .filter(role__role_name="Volunteer")
-            .annotate(
-                voter_allocated_count=Count("voterlist"),
-                # karyakarta_allocated_count=Coalesce(
-                # Subquery(created_karyakarta_count, output_field=IntegerField()),
-                # Value(0),)
-            )
-            .values(
-                "user_id",
-                "first_name",
-                "last_name",
-                "mobile_no",
-                "voter_allocated_count",
-                # "karyakarta_allocated_count"
-            )
-        )
-
-        # daywise = (
-        #     VoterList.objects
-        #     .filter(check_progress=True, user__role__role_name="Admin")   # only checked voters under admin
-        #     .values("check_progress_date")                     # group by admin + date
-        #     .annotate(count=Count("voter_list_id"))                       # count checked voters
-        #     .order_by("check_progress_date")
-        # )
-        
-        today = timezone.now().date()
-        start_of_week = today - timedelta(days=(today.weekday() + 1) % 7)
-        end_of_week = start_of_week + timedelta(days=6)
-
-        daily_qs = (
-            VoterList.objects
-            .filter(
-                # check_progress=True,
-                check_progress_date__range=(start_of_week, end_of_week),
-                # user__role__role_name="Admin"
-            )
-            .values("check_progress_date")
-            .annotate(daily_count=Count("voter_list_id"))
-        )
-
-        daily_map = defaultdict(int)
-        for row in daily_qs:
-            daily_map[row["check_progress_date"]] = row["daily_count"]
-
-        daywise = []
-        running_total = 0
 
-        for i in range(7):
-            d = start_of_week + timedelta(days=i)
-            running_total += daily_map[d]
+        karyakarta_users = dashboard_members(["Volunteer"])["Volunteer"]
 
-            daywise.append({
-                "date": d,
-                "day": d.strftime("%A"),
-                "daily_count": daily_map[d],
-                "cumulative_count": running_total
-            })
-
-        total_visited = VoterList.objects.filter(check_progress_date__isnull=False).count()
         logger.info("admin_dashboard_api: Admin dashboard data prepared successfully")
         return Response({
             "SUCCESS": True,
@@ -163,17 +47,17 @@ def admin_dashboard(request):
                     "visited": visited_count,
                     "pending": pending_count,
                 
-                    "golden_voter":golden_color_tags,
-                    "guaranteed_voter" :green_color_tags,
-                    "unsure_voter" : orange_color_tags,
-                    "red_color_tags" : red_color_tags,
-                    "total_voters": total_voters,  # convert queryset to list
-                    "karyakartas": list(karyakarta_users),
-                    "daywise_check_progress": list(daywise),
-                    "total_visited" : total_visited,
-                    "week_difference": difference,
-                    "this_week": this_week_count,
-                    "last_week": last_week_count 
+                    "golden_voter": stats["golden_voter"],
+                    "guaranteed_voter": stats["guaranteed_voter"],
+                    "unsure_voter": stats["unsure_voter"],
+                    "red_color_tags": stats["red_color_tags"],
+                    "total_voters": stats["total"],
+                    "karyakartas": karyakarta_users,
+                    "daywise_check_progress": stats["daywise"],
+                    "total_visited" : stats["visited"],
+                    "week_difference": stats["week_difference"],
+                    "this_week": stats["this_week"],
+                    "last_week": stats["last_week"]
             }
         })
     else:
@@ -187,72 +71,41 @@ def admin_dashboard(request):
 @permission_classes([IsAuthenticated])
 def volunteer_allocation_panel(request):
     user = request.user
-    user_id = user.user_id
-
-    # -------- GET USER & ROLE --------
-    try:
-        user = (
-            VoterUserMaster.objects
-            .select_related("role")
-            .get(user_id=user_id)
-        )
-    except VoterUserMaster.DoesNotExist:
-        return Response(
-            {"status": False, "message": "User not found"},
-            status=404
-        )
 
     # -------- ROLE-BASED QUERY --------
-    from django.db.models import Q
-
     privileged_roles = ["Admin"]
 
-    if user.role.role_name in privileged_roles: 
-        total_voters = VoterList.objects.count()
-        karyakarta_qs = (
-            VoterUserMaster.objects
-            .filter(role__role_name="Volunteer")
-            .annotate(
-                voter_allocated_count=Count("voterlist")
-            )
-            .values(
-                "user_id",
-                "first_name",
-                "last_name",
-                "mobile_no",
-                "voter_allocated_count"
-            )
-        )
-        total_karyakartas = karyakarta_qs.count()
-        assigned_karyakartas = len([k for k in karyakarta_qs if k["voter_allocated_count"] > 0])
-        unassigned_karyakartas = total_karyakartas - assigned_karyakartas
-        karyakarta_list = [
-            {
-                "user_id": k["user_id"],
-                "name": f"{k['first_name']} {k['last_name']}",
-                "mobile": k["mobile_no"],
-                "assigned_count": k["voter_allocated_count"],
-                "status": "assigned" if k["voter_allocated_count"] > 0 else "unassigned"
+    if get_user_scope(user).role in privileged_roles: 
+        # one materialized list: karyakartas + cached assignment counts
+        members, total_voters = allocation_members(["Volunteer"])
+
+        karyakarta_list = []
+        assigned_karyakarta_list = []
+        unassigned_karyakarta_list = []
+
+        for m in members:
+            k = {
+                "user_id": m["user_id"],
+                "name": m["name"],
+                "mobile": m["mobile"],
+                "assigned_count": m["assigned_count"],
+                "status": m["status"]
             }
-            for k in karyakarta_qs
-        ]
-        
-        # ---------------- SECOND SCREEN FILTERS ----------------
-        assigned_karyakarta_list = [
-            k for k in karyakarta_list if k["assigned_count"] > 0
-        ]
-        # ---------------- THIRD SCREEN (UNASSIGNED) ----------------
-        unassigned_karyakarta_list = [
-            k for k in karyakarta_list if k["assigned_count"] == 0
-        ]
+            karyakarta_list.append(k)
+            # ---------------- SECOND / THIRD SCREEN ----------------
+            if k["assigned_count"] > 0:
+                assigned_karyakarta_list.append(k)
+            else:
+                unassigned_karyakarta_list.append(k)
+
         return Response({
             "SUCCESS" :True,
             "data":{ 
                 "summary": {
                     "total_voters": total_voters,
-                    "total_karyakartas": total_karyakartas,
-                    "assigned_karyakartas": assigned_karyakartas,
-                    "unassigned_karyakartas": unassigned_karyakartas
+                    "total_karyakartas": len(karyakarta_list),
+                    "assigned_karyakartas": len(assigned_karyakarta_list),
+                    "unassigned_karyakartas": len(unassigned_karyakarta_list)
                     },
                     
                     # ---------- FIRST SCREEN ----------
@@ -298,8 +151,6 @@ def unassigned_voters(request):
         )
 
     # -------- ROLE-BASED QUERY --------
-    from django.db.models import Q
-
     privileged_roles = ["Admin"]
 
     if user.role.role_name in privileged_roles:
@@ -428,14 +279,19 @@ def assign_voters_to_karyakarta(request):
             }, status=404)
 
         with transaction.atomic():
-            updated_count = (
-                VoterList.objects
-                .filter(
-                    voter_list_id__in=voter_ids,
-                    user__isnull=True  
+            with track_counters(voter_ids):
+                updated_count = (
+                    VoterList.objects
+                    .filter(
+                        voter_list_id__in=voter_ids,
+                        user__isnull=True  
+                    )
+                    .update(user=karyakarta)
                 )
-                .update(user=karyakarta)
-            )
+        bump_search_cache_version()
+        invalidate_facet_index()
+        refresh_segments(voter_ids, assignment=True)
+        invalidate_user_scope(karyakarta.user_id)
         log_action_user(
             request=request,
             user=user,
@@ -563,11 +419,16 @@ def auto_assign_unassigned_voters(request):
                 })
 
             # assign them
-            updated = (
-                VoterList.objects
-                .filter(voter_list_id__in=voters, user__isnull=True)
-                .update(user=karyakarta)
-            )
+            with track_counters(voters):
+                updated = (
+                    VoterList.objects
+                    .filter(voter_list_id__in=voters, user__isnull=True)
+                    .update(user=karyakarta)
+                )
+            bump_search_cache_version()
+            invalidate_facet_index()
+            refresh_segments(voters, assignment=True)
+            invalidate_user_scope(karyakarta.user_id)
             log_action_user(
                 request=request,
                 user=request.user,
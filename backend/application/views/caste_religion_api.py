@@ -3,9 +3,12 @@ from ..models import Religion,Caste
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.views.decorators.http import condition
+from ..utils.etags import master_data_etag
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=master_data_etag)
 def religion_dropdown(request):
     data = list(Religion.objects.all()
                 .values("religion_id","religion_name")
@@ -18,6 +21,7 @@ def religion_dropdown(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=master_data_etag)
 def caste_dropdown(request):
     
     religion_id = request.GET.get("religion_id")
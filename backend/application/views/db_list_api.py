@@ -3,6 +3,8 @@ from django.http import JsonResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.views.decorators.http import condition
+from ..utils.etags import master_data_etag
 
 # index api
 def index(request):
@@ -15,6 +17,7 @@ def index(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=master_data_etag)
 def tags(request):
     tags = VoterTag.objects.all().order_by("tag_id")
     data = []
@@ -34,6 +37,7 @@ from rest_framework.response import Response
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=master_data_etag)
 def roles(request):
     roles = Roles.objects.all().order_by("role_id")
     data = []
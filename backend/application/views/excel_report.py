@@ -3,6 +3,7 @@ from django.utils.timezone import now
 from ..models import (
     VoterUserMaster,
     VoterRelationshipDetails,
+    VoterSegment,
     ActivityLog
 )
 import csv
@@ -267,6 +268,12 @@ def export_voters_excel(request):
 
         return response
 
+    except VoterSegment.DoesNotExist:
+        return Response(
+            {"status": False, "message": "Segment not found"},
+            status=404
+        )
+
     except Exception as e:
         log_action_user(
             request=request,
@@ -421,6 +428,11 @@ def voters_export(request):
         )
 
         return response
+    except VoterSegment.DoesNotExist:
+        return Response(
+            {"status": False, "message": "Segment not found"},
+            status=404
+        )
     except Exception as e:
         log_action_user(
             request=request,
@@ -1,80 +1,37 @@
-from ..models import VoterList
-from django.db.models import Q
-from django.core.paginator import Paginator
-from .voters_info_api import format_mobile_with_country_code, split_marathi_name
-import re
-from collections import Counter
+from ..models import VoterList, VoterTag, Caste, Religion, Occupation
+from ..utils.cursor_pagination import paginate_voters
+from ..utils.facet_index import facet_voter_ids
+from ..utils.facet_counts import facet_counts
+from ..utils.filter_spec import TAG_NAME_TO_ID, FilterSpec
+from ..utils.id_lookup import apply_id_search
+from ..utils.search_backends import get_search_backend
+from ..utils.search_cache import filter_cache_key
+from ..utils.user_scope import get_user_scope
+from ..utils.voter_rows import project_voters, voter_rows
 from logger import logger
 
 def apply_dynamic_initial_search(qs, search):
+    """
+    Narrow `qs` to voters matching every search token, either as a name-word
+    prefix (repeated tokens need that many words) or inside the voter_id.
 
-    tokens = [t.strip().lower() for t in search.split() if t.strip()]
-    token_counts = Counter(tokens)
+    ID-shaped input (EPIC number, kramank) is answered with a single index
+    probe first; only a miss goes through the configured search backend
+    (settings.VOTER_SEARCH_BACKEND). The result is always a lazy queryset.
+    """
+    id_qs = apply_id_search(qs, search)
+    if id_qs is not None:
+        return id_qs
 
-    # --------- DB side presence filter ---------
-    for token in token_counts:
-        qs = qs.filter(
-            Q(voter_name_eng__iregex=rf'\m{token}') |
-            Q(voter_id__icontains=token)
-        )
-
-    # --------- Python side frequency validation ---------
-    final_results = []
-    words_re = re.compile(r"[A-Za-z]+")
-
-    for v in qs:
-        words = words_re.findall((v.voter_name_eng or "").lower())
-        voter_id = (v.voter_id or "").lower()
-
-        counts = Counter()
-        for t in token_counts:
-            for w in words:
-                if w.startswith(t):
-                    counts[t] += 1
-
-        valid = True
-        for t, required in token_counts.items():
-            # If token matched voter_id, accept it without name matching
-            if t in voter_id:
-                continue
-
-            if counts[t] < required:
-                valid = False
-                break
-
-        if valid:
-            final_results.append(v)
+    return get_search_backend().search(qs, search)
 
-    return final_results
 
-
-def apply_multi_filter(qs, field, value):
-    if not value:
-        return qs
-
-    values = [v.strip() for v in value.split(",") if v.strip()]
-
-    if "null" in [v.lower() for v in values]:
-        return qs.filter(**{f"{field}__isnull": True})
-
-    return qs.filter(**{f"{field}__in": values})
-
-def apply_tag_filter(qs, tag_value):
-    if not tag_value:
-        return qs
-
-    TAG_NAME_TO_ID = {
-        "green": 1,
-        "orange": 2,
-        "red": 3,
-        "golden": 4,
-        "white": 5,
-    }
-
-    tag_names = [t.strip().lower() for t in tag_value.split(",")]
-    tag_ids = [TAG_NAME_TO_ID[t] for t in tag_names if t in TAG_NAME_TO_ID]
-
-    return qs.filter(tag_id__in=tag_ids) if tag_ids else qs
+def apply_fuzzy_search(qs, search):
+    """
+    `fuzzy=1` mode: match spelling variants (Kulkarni / Kulkarny) through the
+    phonetic codes, closest names first by edit distance.
+    """
+    return get_search_backend().fuzzy_search(qs, search)
 
 
 from rest_framework.decorators import api_view, permission_classes
@@ -90,183 +47,111 @@ def filter(request):
     page = int(request.GET.get("page", 1))
     size = int(request.GET.get("size", 100))
     # sort = request.GET.get("sort")
-    search = request.GET.get("search")
-
-    first_name = request.GET.get("first_name")
-    middle_name = request.GET.get("middle_name")
-    last_name = request.GET.get("last_name")
-
-    age_max = request.GET.get("age_max")
-    age_min = request.GET.get("age_min")
-
-    location = request.GET.get("location")
-    tag = request.GET.get("tag_id")
-    gender = request.GET.get("gender")
-    first_ends = request.GET.get("first_ends")
-    middle_ends = request.GET.get("middle_ends")
-    last_ends = request.GET.get("last_ends")
-    
-    kramank = request.GET.get("kramank")
-    voter_id = request.GET.get("voter_id")
-    
-    religion = request.GET.get("religion")
-    age_ranges = request.GET.get("age_ranges")
-    # caste = request.GET.get("caste")
-
-    # badge = request.GET.get("badge")
+    spec = FilterSpec.from_params(request.GET)
 
     user = request.user
     user_id = user.user_id
 
-    from django.db.models import Q
-    
-    privileged_roles = ["Volunteer"]
-    
-    if user.role.role_name in privileged_roles:
-        # Check if user has any assigned voters
-        has_assigned_voters = VoterList.objects.filter(user_id=user_id).exists()
+    # Role / assignment scope (cached per user)
+    user_scope = get_user_scope(user)
+    scope = user_scope.name
+    qs = user_scope.apply(VoterList.objects.order_by("sr_no"))
+
+    # Filters + search, compiled into one query
+    qs, plan = spec.compile(qs)
     
-        if has_assigned_voters:
-            qs = (
-                VoterList.objects
-                .select_related("tag_id")
-                .filter(user_id=user_id)
-                .order_by("sr_no")
-            )
-        else:
-            qs = (
-                VoterList.objects
-                .select_related("tag_id")
-                .order_by("sr_no")
-            )
-    else:
-        qs = (
-            VoterList.objects
-            .select_related("tag_id")
-            .order_by("sr_no")
+    # Purely categorical filters are answered by the facet bitmaps
+    ids = None
+    facets = spec.facet_filters()
+    if facets is not None and "cursor" not in request.GET:
+        if user_scope.restricted:
+            facets["user"] = (user_id,)
+        ids = facet_voter_ids(facets)
+        plan = ["facets: bitmap index"]
+
+    # Pagination (result ids are cached per query + scope)
+    cache_key = filter_cache_key("filter", spec, scope)
+    try:
+        page_obj, pagination = paginate_voters(
+            request, project_voters(qs, is_marathi), size, page, cache_key=cache_key, ids=ids
+        )
+    except ValueError:
+        return Response(
+            {"status": False, "message": "Invalid cursor"},
+            status=400
         )
-    
-    # Apply advanced search (name + voter_id)
-    if search:
-        qs = apply_dynamic_initial_search(qs, search)
 
-    if voter_id:
-        qs = qs.filter(voter_id__icontains=voter_id)
+    data = voter_rows(page_obj, is_marathi, marathi_age="age_eng")
+    logger.info(f"filter_api: Returning page {page} with {len(data)} records")
+    response = {
+        "status": True,
+        **pagination,
+        "records_returned": len(data),
+        "data": data
+    }
+    if request.GET.get("explain") == "1":
+        response["plan"] = plan
+    return Response(response)
     
-    if kramank:
-        qs = qs.filter(kramank__icontains=kramank)
-        
-    # Field filters
-    if first_name:
-        # qs = qs.filter(first_name__icontains=first_name)
-        qs = qs.filter(first_name__istartswith=first_name)
-        
-
-    if middle_name:
-        # qs = qs.filter(middle_name__icontains=middle_name)
-        qs = qs.filter(middle_name__istartswith=middle_name)
-        
-
-    if last_name:
-        # qs = qs.filter(last_name__icontains=last_name)
-        qs = qs.filter(last_name__istartswith=last_name)
-
-
-    from django.db.models import Q
-
-    if age_ranges:
-        age_q = Q()
-        ranges = age_ranges.split(",")
-
-        for r in ranges:
-            try:
-                min_age, max_age = r.split("-")
-                age_q |= Q(
-                    age_eng__gte=int(min_age.strip()),
-                    age_eng__lte=int(max_age.strip())
-                )
-            except ValueError:
-                continue  # skip invalid ranges
-
-        qs = qs.filter(age_q)
-
-    if location:
-        qs = qs.filter(location__icontains=location)
-     
     
-    # if sort:
-    #     qs = qs.order_by(sort)
 
-    # Apply ENDS WITH filters
-    if first_ends:
-        qs = qs.filter(first_name__iendswith=first_ends)
-    
-    if middle_ends:
-        qs = qs.filter(middle_name__iendswith=middle_ends)
-    
-    if last_ends:
-        qs = qs.filter(last_name__iendswith=last_ends)
-        
-    qs = apply_multi_filter(qs, "cast", request.GET.get("caste"))
-    qs = apply_multi_filter(qs, "religion_id", request.GET.get("religion"))
-    qs = apply_multi_filter(qs, "occupation", request.GET.get("occupation"))
-    qs = apply_multi_filter(qs, "gender_eng", request.GET.get("gender"))
-    qs = apply_tag_filter(qs, request.GET.get("tag_id"))
-    
-    # Pagination
-    paginator = Paginator(qs, size)
-    page_obj = paginator.get_page(page)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def filter_facets(request):
+    """Counts per tag / gender / caste / religion / occupation / age band for the `filter` params."""
+    logger.info("filter_api: Filter facets request received")
+    lang = request.headers.get("Accept-Language", "en")
+    is_marathi = lang.lower().startswith("mr")
+    spec = FilterSpec.from_params(request.GET)
 
-    data = []
-    for v in page_obj:
-        if is_marathi:
-            first_name, middle_name, last_name = split_marathi_name(
-                v.voter_name_marathi
-            )
-            voter_name_eng = v.voter_name_marathi
-            age_eng = v.age_eng
-            gender_eng = v.gender
-            tag_name = v.tag_id.tag_name_mar if v.tag_id else None
-        else:
-            first_name = v.first_name
-            middle_name = v.middle_name
-            last_name = v.last_name
-            voter_name_eng = v.voter_name_eng
-            age_eng = v.age_eng
-            gender_eng = v.gender_eng
-            tag_name = v.tag_id.tag_name if v.tag_id else None
+    user = request.user
 
-        has_whatsapp = any([
-        bool(v.mobile_no),
-        bool(v.alternate_mobile1),
-        bool(v.alternate_mobile2),
-    ])
-        data.append({
-            "sr_no" : v.sr_no,
-            "voter_list_id": v.voter_list_id,
-            "voter_name_eng": voter_name_eng,
-            "voter_id": v.voter_id,
-            "gender": gender_eng,
-            "location": v.location,
-            "badge": v.badge,
-            "tag":v.tag_id.tag_name if v.tag_id else None,
-            "kramank": v.kramank,
-            "age":age_eng,
-            "ward_id": v.ward_no,
-            "show_whatsapp": has_whatsapp,
-            "mobile_no": format_mobile_with_country_code(
-                v.mobile_no or v.alternate_mobile1 or v.alternate_mobile2 or None
-            ),
-        })
-    logger.info(f"filter_api: Returning page {page} with {len(data)} records")
-    return Response({
+    # same scope as `filter`
+    qs = get_user_scope(user).apply(VoterList.objects.all())
+
+    qs, plan = spec.compile(qs)
+    total, counts = facet_counts(qs)
+
+    # ---------- LABELS ----------
+    tag_names = {v: k for k, v in TAG_NAME_TO_ID.items()}
+    labels = {
+        "tag": VoterTag.objects.filter(tag_id__in=[v for v in counts["tag"] if v]).values_list(
+            "tag_id", "tag_name_mar" if is_marathi else "tag_name"
+        ),
+        "caste": Caste.objects.filter(caste_id__in=[v for v in counts["caste"] if v]).values_list(
+            "caste_id", "caste_name_mar" if is_marathi else "caste_name"
+        ),
+        "religion": Religion.objects.filter(religion_id__in=[v for v in counts["religion"] if v]).values_list(
+            "religion_id", "religion_name_mar" if is_marathi else "religion_name"
+        ),
+        "occupation": Occupation.objects.filter(occupation_id__in=[v for v in counts["occupation"] if v]).values_list(
+            "occupation_id", "occupation_name_mar" if is_marathi else "occupation_name"
+        ),
+    }
+    labels = {facet: dict(rows) for facet, rows in labels.items()}
+
+    facets = {}
+    for facet, values in counts.items():
+        items = []
+        for value, count in sorted(values.items(), key=lambda kv: -kv[1]):
+            # `value` is what the filter param expects back
+            if facet == "tag":
+                param = tag_names.get(value, "null" if value is None else value)
+            else:
+                param = "null" if value is None else value
+            items.append({
+                "value": param,
+                "label": labels.get(facet, {}).get(value, value),
+                "count": count,
+            })
+        facets[facet] = items
+
+    logger.info(f"filter_api: Returning facet counts for {total} voters")
+    response = {
         "status": True,
-        "page": page,
-        "page_size": size,
-        "total_pages": paginator.num_pages,
-        "total_records": paginator.count,
-        "records_returned": len(data),
-        "data": data
-    })
-    
-    
\ No newline at end of file
+        "total_records": total,
+        "facets": facets,
+    }
+    if request.GET.get("explain") == "1":
+        response["plan"] = plan
+    return Response(response)
@@ -3,9 +3,12 @@ from django.http import JsonResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.views.decorators.http import condition
+from ..utils.etags import master_data_etag
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=master_data_etag)
 def occupation_dropdown(request):
     
     data = list(Occupation.objects.all()
@@ -6,9 +6,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Q
-from django.core.paginator import Paginator
 from logger import logger
 from .view_utils import log_action_user
+from ..utils.cursor_pagination import paginate_voters
+from ..utils.user_scope import get_user_scope
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -110,32 +111,13 @@ def list_voters_for_print(request):
     page = int(request.GET.get("page", 1))
     size = int(request.GET.get("size", 100))
 
-    # ---------- ROLE BASED QUERY ----------
-    privileged_roles = ["Volunteer"]
-
-    if user.role.role_name in privileged_roles:
-        has_assigned_voters = VoterList.objects.filter(user_id=user.user_id).exists()
-
-        if has_assigned_voters:
-            qs = (
-                VoterList.objects
-                .filter(user_id=user.user_id)
-                .order_by("sr_no")
-            )
-        else:
-            qs = (
-                VoterList.objects
-                .order_by("sr_no")
-            )
-    else:
-        qs = (
-            VoterList.objects
-            .order_by("sr_no")
-        )
+    # ---------- ROLE BASED QUERY (cached per user) ----------
+    qs = get_user_scope(user).apply(VoterList.objects.order_by("sr_no"))
 
     # ---------- SELECT ONLY REQUIRED FIELDS ----------
     qs = qs.values(
         "voter_list_id",
+        "sr_no",
         "voter_id",
         "voter_name_marathi",
         "kramank",
@@ -147,8 +129,13 @@ def list_voters_for_print(request):
     )
 
     # ---------- PAGINATE ----------
-    paginator = Paginator(qs, size)
-    page_obj = paginator.get_page(page)
+    try:
+        page_obj, pagination = paginate_voters(request, qs, size, page)
+    except ValueError:
+        return Response(
+            {"status": False, "message": "Invalid cursor"},
+            status=400
+        )
 
     # ---------- FORMAT RESPONSE ----------
     voters = []
@@ -174,16 +161,13 @@ def list_voters_for_print(request):
             "page": page,
             "page_size": size,
             "records_returned": len(voters),
-            "total_records": paginator.count
+            "total_records": pagination.get("total_records")
         }
     )
 
     return Response({
         "status": True,
-        "page": page,
-        "page_size": size,
-        "total_pages": paginator.num_pages,
-        "total_records": paginator.count,
+        **pagination,
         "records_returned": len(voters),
         "voters": voters
     })
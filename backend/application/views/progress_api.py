@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from logger import logger
+from ..utils.progress_rollup import GRANULARITIES, MAX_DAYS, progress_series
+from ..utils.user_scope import get_user_scope
+
+# roles that may see other users' progress (and everyone's combined)
+PRIVILEGED_ROLES = ["SuperAdmin", "Admin"]
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def progress_trend(request):
+    """
+    GET ?from=YYYY-MM-DD&to=YYYY-MM-DD&granularity=day|week|month&user_id=
+
+    Visits / tag transitions per period, read from the daily rollup.
+    Defaults to the last 30 days by day; ranges are capped at MAX_DAYS
+    whatever the granularity. Volunteers always get their own
+    progress; admins get everyone's unless user_id is given.
+    """
+    logger.info("progress_api: Progress trend request received")
+    user = request.user
+
+    granularity = request.GET.get("granularity", "day")
+    if granularity not in GRANULARITIES:
+        return Response(
+            {"status": False, "message": f"granularity must be one of {', '.join(GRANULARITIES)}"},
+            status=400
+        )
+
+    try:
+        date_to = date.fromisoformat(request.GET["to"]) if request.GET.get("to") else date.today()
+        date_from = (
+            date.fromisoformat(request.GET["from"]) if request.GET.get("from")
+            else date_to - timedelta(days=29)
+        )
+    except ValueError:
+        return Response(
+            {"status": False, "message": "from / to must be YYYY-MM-DD"},
+            status=400
+        )
+
+    if date_from > date_to:
+        return Response(
+            {"status": False, "message": "from must not be after to"},
+            status=400
+        )
+    if (date_to - date_from).days >= MAX_DAYS:
+        return Response(
+            {"status": False, "message": f"Range must not exceed {MAX_DAYS} days"},
+            status=400
+        )
+
+    if get_user_scope(user).role in PRIVILEGED_ROLES:
+        user_id = request.GET.get("user_id") or None
+        if user_id is not None and not str(user_id).isdigit():
+            return Response(
+                {"status": False, "message": "user_id must be a number"},
+                status=400
+            )
+    else:
+        user_id = user.user_id
+
+    series = progress_series(date_from, date_to, granularity, user_id=user_id)
+
+    logger.info(f"progress_api: Returned {len(series)} {granularity} periods")
+    return Response({
+        "status": True,
+        "from": date_from,
+        "to": date_to,
+        "granularity": granularity,
+        "user_id": int(user_id) if user_id is not None else None,
+        "data": series,
+    })
@@ -1,5 +1,4 @@
 from ..models import VoterList,VoterTag
-from .voters_info_api import format_mobile_with_country_code, split_marathi_name
 import re
 from collections import Counter
 from django.db.models import Q
@@ -7,7 +6,12 @@ from django.core.paginator import Paginator
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from .filter_api import apply_dynamic_initial_search
+from .filter_api import apply_dynamic_initial_search, apply_fuzzy_search
+from ..utils.search_cache import paginate_cached_ids, search_cache_key
+from ..utils.search_backends import get_search_backend
+from ..utils.autocomplete import AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MAX_LIMIT, autocomplete_ids, top_matches
+from ..utils.user_scope import get_user_scope
+from ..utils.voter_rows import project_voters, voter_rows
 from logger import logger
 
 @api_view(["GET"])
@@ -18,84 +22,45 @@ def voters_search(request):
     is_marathi = lang.lower() in ["mr", "mr-in", "marathi"]
 
     search = request.GET.get("search", "").strip()
+    fuzzy = request.GET.get("fuzzy") == "1"
     page = int(request.GET.get("page", 1))
     size = int(request.GET.get("size", 100))
 
     user = request.user
-    user_id = user.user_id
-    role = user.role.role_name
-
-    privileged_roles = ["Volunteer"]
-
-    base_qs = VoterList.objects.select_related("tag_id")
-
-    # ---------- ASSIGNMENT LOGIC ----------
-    if role in privileged_roles:
-        has_assigned = base_qs.filter(user_id=user_id).exists()
 
-        if has_assigned:
-            qs = base_qs.filter(user_id=user_id)
-        else:
-            qs = base_qs.all()
-    else:
-        qs = base_qs.all()
+    # ---------- ASSIGNMENT LOGIC (cached per user) ----------
+    user_scope = get_user_scope(user)
+    scope = user_scope.name
+    qs = user_scope.apply(VoterList.objects.all())
 
     # ---------- SEARCH ----------
-    if search:
-        qs = apply_dynamic_initial_search(qs, search)
+    if search and fuzzy:
+        qs = apply_fuzzy_search(qs.order_by("sr_no"), search)
+    elif search:
+        qs = apply_dynamic_initial_search(qs, search).order_by("sr_no")
 
     # ---------- PAGINATION ----------
-    paginator = Paginator(qs, size)
-    page_obj = paginator.get_page(page)
+    # result ids are cached per query + scope until the next voter write
+    cache_key = search_cache_key("voters_search", request.GET, scope)
 
-    data = []
+    # plain searches come back by relevance, ranked once by the configured
+    # backend when the ids are cached (fuzzy ones are already ranked)
+    ids_of = None
+    if search and not fuzzy:
+        def ids_of(_projected):
+            return get_search_backend().ranked_ids(qs, search)
 
-    for v in page_obj:
-        if is_marathi:
-            first_name, middle_name, last_name = split_marathi_name(
-                v.voter_name_marathi
-            )
-            voter_name = v.voter_name_marathi
-            age = v.age
-            gender = v.gender
-        else:
-            first_name = v.first_name
-            middle_name = v.middle_name
-            last_name = v.last_name
-            voter_name = v.voter_name_eng
-            age = v.age_eng
-            gender = v.gender_eng
-
-        has_whatsapp = any([
-            bool(v.mobile_no),
-            bool(v.alternate_mobile1),
-            bool(v.alternate_mobile2),
-        ])
-
-        data.append({
-            "sr_no": v.sr_no,
-            "voter_list_id": v.voter_list_id,
-            "voter_id": v.voter_id,
-            "first_name": first_name,
-            "last_name": last_name,
-            "voter_name_eng": voter_name,
-            "kramank": v.kramank,
-            "age": age,
-            "gender": gender,
-            "ward_id": v.ward_no,
-            "tag": v.tag_id.tag_name if v.tag_id else None,
-            "badge": v.badge,
-            "location": v.location,
-            "show_whatsapp": has_whatsapp,
-            "mobile_no": format_mobile_with_country_code(
-                v.mobile_no or v.alternate_mobile1 or v.alternate_mobile2
-            ),
-        })
+    page_obj, paginator = paginate_cached_ids(
+        project_voters(qs, is_marathi), cache_key, size, page, ids_of=ids_of
+    )
+
+    data = voter_rows(page_obj, is_marathi)
     logger.info(f"voters_search_api: Returning {len(data)} records for search query '{search}'")
     
     return Response({
         "status": True,
         "query": search,
+        "fuzzy": fuzzy,
         "page": page,
         "page_size": size,
         "total_pages": paginator.num_pages,
@@ -115,68 +80,27 @@ def family_dropdown_search(request):
     is_marathi = lang in ["mr", "mr-in", "marathi"]
     
     exclude_id = request.GET.get("exclude_id")   
+    fuzzy = request.GET.get("fuzzy") == "1"
     # print(exclude_id)
     page = int(request.GET.get("page", 1))
     size = 30   
 
-    qs = VoterList.objects.all()
+    # stable order so pages don't overlap (fuzzy mode re-orders by closeness)
+    qs = VoterList.objects.order_by("sr_no", "voter_list_id")
 
     # Exclude the current voter (self cannot be father/mother)
     if exclude_id:
         qs = qs.exclude(voter_list_id=exclude_id)
 
-    if search:
+    if search and fuzzy:
+        qs = apply_fuzzy_search(qs, search)
+    elif search:
         qs = apply_dynamic_initial_search(qs, search)
 
-    paginator = Paginator(qs, size)
+    paginator = Paginator(project_voters(qs, is_marathi), size)
     page_obj = paginator.get_page(page)
 
-    data=[]
-    for v in page_obj:
-        if is_marathi:
-            first_name, middle_name, last_name = split_marathi_name(
-                v.voter_name_marathi
-            )
-
-            voter_name_eng = v.voter_name_marathi
-            age_eng = v.age
-            gender_eng = v.gender
-            tag = v.tag_id.tag_name_mar if v.tag_id else None
-        else:
-            first_name = v.first_name
-            middle_name = v.middle_name
-            last_name = v.last_name
-
-            voter_name_eng = v.voter_name_eng
-            age_eng = v.age_eng
-            gender_eng = v.gender_eng
-            tag = v.tag_id.tag_name if v.tag_id else None
-            
-        has_whatsapp = any([
-        bool(v.mobile_no),
-        bool(v.alternate_mobile1),
-        bool(v.alternate_mobile2),
-    ])
-        data.append({
-            "sr_no" : v.sr_no,
-            "voter_list_id": v.voter_list_id,
-            "voter_id": v.voter_id,
-            "first_name": first_name,
-            "last_name": last_name,
-            # "voter_name_marathi": translator.translate(v.voter_name_marathi, lang),
-            "voter_name_eng": voter_name_eng,
-            "kramank": v.kramank,
-            "age": age_eng,
-            "gender": gender_eng,
-            "ward_id": v.ward_no,
-            "tag": v.tag_id.tag_name if v.tag_id else None,
-            "badge": v.badge,
-            "location": v.location,
-            "show_whatsapp": has_whatsapp,
-            "mobile_no": format_mobile_with_country_code(
-                v.mobile_no or v.alternate_mobile1 or v.alternate_mobile2 or None
-            ),
-        })
+    data = voter_rows(page_obj, is_marathi)
     logger.info(f"family_dropdown_search_api: Returning {len(data)} records for search query '{search}' excluding voter_list_id '{exclude_id}'")
     return Response({
         "status": True,
@@ -189,4 +113,72 @@ def family_dropdown_search(request):
         "results": data
     })
 
-  
\ No newline at end of file
+  
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def voters_autocomplete(request):
+    lang = request.headers.get("Accept-Language", "en")
+    is_marathi = lang.lower() in ["mr", "mr-in", "marathi"]
+
+    search = request.GET.get("search", "").strip()
+    exclude_id = request.GET.get("exclude_id")
+
+    try:
+        limit = min(int(request.GET.get("limit", AUTOCOMPLETE_LIMIT)), AUTOCOMPLETE_MAX_LIMIT)
+    except ValueError:
+        limit = AUTOCOMPLETE_LIMIT
+
+    user = request.user
+    user_id = user.user_id
+
+    # ---------- SCOPE ----------
+    scope = "all"
+    scope_ids = None
+    if get_user_scope(user).restricted:
+        scope = "assigned"
+
+        def scope_ids():
+            return set(
+                VoterList.objects
+                .filter(user_id=user_id)
+                .values_list("voter_list_id", flat=True)
+            )
+
+    ids, narrowed = autocomplete_ids(user_id, scope, search, scope_ids)
+
+    if exclude_id and exclude_id.isdigit():
+        excluded = int(exclude_id)
+        ids = [i for i in ids if i != excluded]
+
+    # ---------- TOP N (best matches first) ----------
+    top_ids = top_matches(ids, search, limit)
+    rows = {
+        r["voter_list_id"]: r
+        for r in VoterList.objects
+        .filter(voter_list_id__in=top_ids)
+        .values("voter_list_id", "voter_id", "voter_name_eng", "voter_name_marathi", "age_eng", "age")
+    }
+    rows = [rows[i] for i in top_ids if i in rows]
+
+    results = [
+        {
+            "voter_list_id": r["voter_list_id"],
+            "voter_name": r["voter_name_marathi"] if is_marathi else r["voter_name_eng"],
+            "voter_id": r["voter_id"],
+            "age": r["age"] if is_marathi else r["age_eng"],
+        }
+        for r in rows
+    ]
+
+    logger.info(
+        f"voters_autocomplete_api: {len(ids)} candidates for '{search}' "
+        f"({'narrowed' if narrowed else 'searched'}), returning {len(results)}"
+    )
+
+    return Response({
+        "status": True,
+        "query": search,
+        "total_records": len(ids),
+        "results": results,
+    })
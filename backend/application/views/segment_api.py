@@ -0,0 +1,108 @@
+from ..models import VoterSegment
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from logger import logger
+from ..utils.segments import materialize_segment, segment_params, visible_segments
+from ..utils.user_scope import get_user_scope
+
+
+def _segment_data(segment):
+    return {
+        "segment_id": segment.id,
+        "name": segment.name,
+        "owner_id": segment.owner_id,
+        "filters": segment.params,
+        "scoped_to_user_id": segment.scope_user_id,
+        "member_count": segment.member_count,
+        "refreshed_at": segment.refreshed_at,
+        "created_at": segment.created_at,
+    }
+
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated])
+def segments(request):
+    """
+    GET  -> saved segments visible to the user
+    POST -> {"name": ..., "filters": {<filter query params>}} save + materialize
+    """
+    user = request.user
+
+    if request.method == "GET":
+        logger.info("segment_api: List segments request received")
+        return Response({
+            "status": True,
+            "data": [_segment_data(s) for s in visible_segments(user)],
+        })
+
+    logger.info("segment_api: Create segment request received")
+    name = (request.data.get("name") or "").strip()
+    params = segment_params(request.data.get("filters") or {})
+
+    if not name:
+        return Response(
+            {"status": False, "message": "name is required"},
+            status=400
+        )
+    if not params:
+        return Response(
+            {"status": False, "message": "At least one filter is required"},
+            status=400
+        )
+
+    # same scope as `filter`: volunteers with assigned voters see only those
+    scope_user_id = user.user_id if get_user_scope(user).restricted else None
+
+    segment = materialize_segment(VoterSegment(
+        name=name,
+        owner_id=user.user_id,
+        params=params,
+        scope_user_id=scope_user_id,
+    ))
+
+    return Response({
+        "status": True,
+        "message": "Segment saved",
+        "data": _segment_data(segment),
+    }, status=201)
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAuthenticated])
+def segment_detail(request, segment_id):
+    try:
+        segment = visible_segments(request.user).get(id=segment_id)
+    except VoterSegment.DoesNotExist:
+        return Response(
+            {"status": False, "message": "Segment not found"},
+            status=404
+        )
+
+    if request.method == "DELETE":
+        logger.info(f"segment_api: Delete segment {segment_id} request received")
+        segment.delete()
+        return Response({"status": True, "message": "Segment deleted"})
+
+    data = _segment_data(segment)
+    if request.GET.get("include_ids") == "1":
+        data["voter_ids"] = segment.voter_ids
+
+    return Response({"status": True, "data": data})
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def segment_refresh(request, segment_id):
+    """Full re-materialization (incremental refresh happens on voter updates)."""
+    logger.info(f"segment_api: Refresh segment {segment_id} request received")
+    try:
+        segment = visible_segments(request.user).get(id=segment_id)
+    except VoterSegment.DoesNotExist:
+        return Response(
+            {"status": False, "message": "Segment not found"},
+            status=404
+        )
+
+    segment = materialize_segment(segment)
+    return Response({"status": True, "data": _segment_data(segment)})
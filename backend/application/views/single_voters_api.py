@@ -62,20 +62,9 @@ def single_voters_info(request, voter_list_id):
 
     user = request.user
 
-    # ---------- HELPERS ----------
-    def safe_age(v):
-        try:
-            return int(str(v).strip())
-        except:
-            return None
-    def parse_kramank(value):
-        try:
-            return int(str(value).split("/")[-1])
-        except:
-            return 0
-        
-    kramank = parse_kramank(voter.kramank)
-    age = safe_age(voter.age_eng)
+    # numeric shadows of kramank serial / age_eng (see utils/numeric_columns.py)
+    kramank = voter.kramank_serial_num
+    age = voter.age_num
     
     def calculate_and_save_family(voter):
         is_male = voter.gender_eng.lower() == "male"
@@ -115,8 +104,8 @@ def single_voters_info(request, voter_list_id):
                 gender_eng__iexact="male"
             ).first()
 
-            voter_age = safe_age(voter.age_eng)
-            male_age = safe_age(male_match.age_eng) if male_match else None
+            voter_age = voter.age_num
+            male_age = male_match.age_num if male_match else None
 
             if male_match and voter_age and male_age:
                 age_gap = male_age - voter_age
@@ -149,13 +138,17 @@ def single_voters_info(request, voter_list_id):
         )
 
         if father_first_name_for_siblings and age and kramank:
+            # age / kramank proximity as indexed range conditions
             family_members = VoterList.objects.filter(
-                last_name=voter.last_name
+                last_name=voter.last_name,
+                middle_name=father_first_name_for_siblings,
+                age_num__range=(age - 18, age + 18),
+                kramank_serial_num__range=(kramank - 5, kramank + 5),
             ).exclude(voter_list_id=voter.voter_list_id)
 
             for p in family_members:
-                p_age = safe_age(p.age_eng)
-                p_kramank = parse_kramank(p.kramank)
+                p_age = p.age_num
+                p_kramank = p.kramank_serial_num
 
                 if (
                     p.middle_name == father_first_name_for_siblings and
@@ -193,12 +186,14 @@ def single_voters_info(request, voter_list_id):
         if parent_firstname_for_child and age and kramank:
             kids = VoterList.objects.filter(
                 middle_name=parent_firstname_for_child,
-                last_name=voter.last_name
+                last_name=voter.last_name,
+                age_num__lte=age - 15,
+                kramank_serial_num__range=(kramank - 5, kramank + 5),
             ).exclude(voter_list_id=voter.voter_list_id)
 
             for kid in kids:
-                kid_age = safe_age(kid.age_eng)
-                kid_kramank = parse_kramank(kid.kramank)
+                kid_age = kid.age_num
+                kid_kramank = kid.kramank_serial_num
 
                 if kid_age and age - kid_age >= 15 and abs(kid_kramank - kramank) <= 5:
                     children.append({
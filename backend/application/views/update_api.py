@@ -14,6 +14,9 @@ from ..models import (
     Caste,
 )
 from .view_utils import rematch_contacts_for_voter, log_user_update
+from ..utils.progress_rollup import record_tag_change
+from ..utils.search_cache import bump_search_cache_version
+from ..utils.segments import refresh_segments
 
 
 @api_view(["PUT"])
@@ -125,6 +128,7 @@ def update_voter(request, voter_list_id):
                     status=400
                 )
 
+        old_tag_id = voter.tag_id_id
         tag_id = body.get("tag_id")
         if tag_id is not None:
             try:
@@ -144,6 +148,8 @@ def update_voter(request, voter_list_id):
         # ---------- SAVE ----------
         if changed_fields:
             voter.save()
+            bump_search_cache_version()
+            refresh_segments([voter.voter_list_id], fields=changed_fields)
 
         # ---------- PHONE SNAPSHOT (AFTER) ----------
         new_numbers = {
@@ -174,6 +180,8 @@ def update_voter(request, voter_list_id):
                 ip=ip,
                 voter_list_id=voter_list_id
             )
+            if "tag_id" in changed_fields:
+                record_tag_change(user.user_id, old_tag_id, voter.tag_id_id)
         logger.info(f"update_api: Voter {voter_list_id} updated successfully with changes: {changed_fields}")
         return Response({
             "status": True,
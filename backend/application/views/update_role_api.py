@@ -10,6 +10,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .view_utils import log_action_user
+from ..utils.user_scope import invalidate_user_scope
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
@@ -156,7 +157,8 @@ def promote_user(request):
             # target_user.updated_by = logged_in_user.user_id
             target_user.updated_date = timezone.now()
             target_user.save()
-            
+        invalidate_user_scope(target_user.user_id)
+
         logger.info(f"super_admin_dashboard_api: User {target_user_id} promoted to {new_role_name}")
         log_action_user(
             request=request,
@@ -206,6 +208,7 @@ def delete_user(request, user_id):
         logger.info(f"super_admin_dashboard_api: Delete user request received for user_id {user_id}")
         target_user = VoterUserMaster.objects.get(user_id=user_id)
         target_user.delete()
+        invalidate_user_scope(user_id)
         logger.info(f"super_admin_dashboard_api: User {user_id} deleted successfully")
         log_action_user(
             request=request,
@@ -1,9 +1,8 @@
-from .filter_api import apply_multi_filter, apply_tag_filter
-from .filter_api import apply_dynamic_initial_search
+from ..utils.filter_spec import FilterSpec
+from ..utils.segments import segment_voter_ids
 from ..models import VoterList, VoterRelationshipDetails, ActivityLog, UserContactPayload, UserVoterContact, VoterUserMaster,UserActivityLog
 from deep_translator import GoogleTranslator
 from .contact_match_api import canonicalize_contacts, normalize_phone
-from django.db.models import Q
 from logger import logger
 from django.conf import settings
 import os
@@ -211,50 +210,14 @@ def build_voter_queryset(request, user):
     if user.role.role_name not in ["SuperAdmin", "Admin"]:
         qs = qs.filter(user_id=user.user_id)
 
-    # ---- SEARCH ----
-    search = request.GET.get("search")
-    if search:
-        qs = apply_dynamic_initial_search(qs, search)
-
-    # ---- SIMPLE FILTERS ----
-    if request.GET.get("voter_id"):
-        qs = qs.filter(voter_id__icontains=request.GET["voter_id"])
-
-    if request.GET.get("kramank"):
-        qs = qs.filter(kramank__icontains=request.GET["kramank"])
-
-    # ---- NAME FILTERS ----
-    if request.GET.get("first_name"):
-        qs = qs.filter(first_name__istartswith=request.GET["first_name"])
-
-    if request.GET.get("middle_name"):
-        qs = qs.filter(middle_name__istartswith=request.GET["middle_name"])
-
-    if request.GET.get("last_name"):
-        qs = qs.filter(last_name__istartswith=request.GET["last_name"])
-
-    # ---- AGE RANGES ----
-    age_ranges = request.GET.get("age_ranges")
-    if age_ranges:
-        age_q = Q()
-        for r in age_ranges.split(","):
-            try:
-                lo, hi = r.split("-")
-                age_q |= Q(age_eng__gte=int(lo), age_eng__lte=int(hi))
-            except ValueError:
-                pass
-        qs = qs.filter(age_q)
-
-    # ---- MULTI FILTERS ----
-    qs = apply_multi_filter(qs, "cast", request.GET.get("caste"))
-    qs = apply_multi_filter(qs, "religion_id", request.GET.get("religion"))
-    qs = apply_multi_filter(qs, "occupation", request.GET.get("occupation"))
-    qs = apply_multi_filter(qs, "gender_eng", request.GET.get("gender"))
-    qs = apply_tag_filter(qs, request.GET.get("tag_id"))
-
-    # ---- LOCATION ----
-    if request.GET.get("location"):
-        qs = qs.filter(location__icontains=request.GET["location"])
+    # ---- SAVED SEGMENT (materialized ids) OR SEARCH + FILTERS ----
+    # (raises VoterSegment.DoesNotExist for an unknown / foreign segment)
+    segment_id = request.GET.get("segment_id")
+    if segment_id:
+        qs = qs.filter(voter_list_id__in=segment_voter_ids(segment_id, user))
+    else:
+        qs, _ = FilterSpec.from_params(request.GET).compile(qs)
+
     logger.info(f"Voter queryset built with {qs.count()} records")
     return qs
 
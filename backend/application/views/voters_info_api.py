@@ -1,34 +1,19 @@
-from ..models import VoterList,VoterUserMaster
+from ..models import VoterList
 from django.core.cache import cache
-from django.core.paginator import Paginator
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from ..utils.cursor_pagination import paginate_voters
+# split_marathi_name lives in utils/voter_rows; other views still import it from here
+from ..utils.voter_rows import project_voters, split_marathi_name, voter_rows
+from ..utils.user_scope import get_user_scope
+from ..utils.etags import voter_list_etag
+from django.views.decorators.http import condition
 from logger import logger
 
-def split_marathi_name(full_name):
-    if not full_name:
-        return None, None, None
-
-    parts = full_name.strip().split()
-
-    last_name = parts[0] if len(parts) > 0 else None
-    first_name = parts[1] if len(parts) > 1 else None
-    middle_name = " ".join(parts[2:]) if len(parts) > 2 else None
-
-    return first_name, middle_name, last_name
-
-def format_mobile_with_country_code(mobile: str) -> str:
-    """Prepend 91 to 10-digit mobile numbers."""
-    if not mobile:
-        return None
-    mobile = mobile.strip()
-    if len(mobile) == 10:
-        return f"91{mobile}"
-    return mobile
-
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=voter_list_etag)
 def voters_info(request):
     logger.info("voters_info_api: Voters info request received")
     lang = request.headers.get("Accept-Language", "en")
@@ -37,110 +22,26 @@ def voters_info(request):
     size = int(request.GET.get("size", 100))
     is_marathi = lang in ["mr", "mr-in", "marathi"]
     user = request.user
-    user_id = user.user_id
 
-    # -------- GET USER & ROLE --------
+    # -------- ROLE-BASED QUERY (cached per user) --------
+    scope = get_user_scope(user)
+    qs = project_voters(
+        scope.apply(VoterList.objects.order_by("sr_no")),
+        is_marathi,
+    )
+
     try:
-        user = (
-            VoterUserMaster.objects
-            .select_related("role")
-            .get(user_id=user_id)
-        )
-    except VoterUserMaster.DoesNotExist:
+        page_obj, pagination = paginate_voters(request, qs, size, page)
+    except ValueError:
         return Response(
-            {"status": False, "message": "User not found"},
-            status=404
+            {"status": False, "message": "Invalid cursor"},
+            status=400
         )
 
-    # -------- ROLE-BASED QUERY --------
-    from django.db.models import Q
-
-    privileged_roles = ["Volunteer"]
-
-    if user.role.role_name in privileged_roles:
-        # Check if user has any assigned voters
-        has_assigned_voters = VoterList.objects.filter(user_id=user_id).exists()
-
-        if has_assigned_voters:
-            qs = (
-                VoterList.objects
-                .select_related("tag_id")
-                .filter(user_id=user_id)
-                .order_by("sr_no")
-            )
-        else:
-            qs = (
-                VoterList.objects
-                .select_related("tag_id")
-                .order_by("sr_no")
-            )
-    else:
-        qs = (
-            VoterList.objects
-            .select_related("tag_id")
-            .order_by("sr_no")
-        )
-
-
-    paginator = Paginator(qs, size)
-    page_obj = paginator.get_page(page)
-
-    data = []   
-
-    for v in page_obj:
-        if is_marathi:
-            first_name, middle_name, last_name = split_marathi_name(
-                v.voter_name_marathi
-            )
-
-            voter_name_eng = v.voter_name_marathi
-            age_eng = v.age
-            gender_eng = v.gender
-            tag = v.tag_id.tag_name_mar if v.tag_id else None
-            location = "रिमोट" if v.location == "Remote" else 'स्थानिक'
-            
-        else:
-            first_name = v.first_name
-            middle_name = v.middle_name
-            last_name = v.last_name
-
-            voter_name_eng = v.voter_name_eng
-            age_eng = v.age_eng
-            gender_eng = v.gender_eng
-            tag = v.tag_id.tag_name if v.tag_id else None
-            location = v.location
-            
-        has_whatsapp = any([
-        bool(v.mobile_no),
-        bool(v.alternate_mobile1),
-        bool(v.alternate_mobile2),
-    ])
-        data.append({
-            "sr_no" : v.sr_no,
-            "voter_list_id": v.voter_list_id,
-            "voter_id": v.voter_id,
-            "first_name": first_name,
-            "last_name": last_name,
-            # "voter_name_marathi": translator.translate(v.voter_name_marathi, lang),
-            "voter_name_eng": voter_name_eng,
-            "kramank": v.kramank,
-            "age": age_eng,
-            "gender": gender_eng,
-            "ward_id": v.ward_no,
-            "tag": v.tag_id.tag_name if v.tag_id else None,
-            "badge": v.badge,
-            "location": location,
-            "show_whatsapp": has_whatsapp,
-            "mobile_no": format_mobile_with_country_code(
-                v.mobile_no or v.alternate_mobile1 or v.alternate_mobile2 or None
-            ),
-        })
+    data = voter_rows(page_obj, is_marathi, localize_location=True)
     logger.info(f"voters_info_api: Retrieved page {page} with {len(data)} voters")
     response_data = {
-        "page": page,
-        "page_size": size,
-        "total_pages": paginator.num_pages,
-        "total_records": paginator.count,
+        **pagination,
         "records_returned": len(data),
         "data": data
     }
@@ -63,7 +63,19 @@ SIMPLE_JWT = {
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+    ),
+    # orjson instead of stdlib json (application/utils/fast_json.py)
+    "DEFAULT_RENDERER_CLASSES": (
+        "application.utils.fast_json.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        # only picked with ?format=compact
+        "application.utils.fast_json.CompactJSONRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "application.utils.fast_json.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 INSTALLED_APPS = [
@@ -96,6 +108,8 @@ AUTH_USER_MODEL = "application.VoterUserMaster"
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware', 
+    # compresses large JSON pages; above everything that touches the body
+    'django.middleware.gzip.GZipMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -147,6 +161,11 @@ CACHES = {
         }
     }
 }
+# Voter name search: "index" (in-process token index) or "postgres"
+# (pg_trgm / tsvector, run `manage.py create_search_indexes` first; the
+# index backend also uses it for very broad queries)
+VOTER_SEARCH_BACKEND = os.getenv("VOTER_SEARCH_BACKEND", "index")
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
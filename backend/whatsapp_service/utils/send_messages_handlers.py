@@ -7,7 +7,8 @@ from django.db import transaction
 from django.utils import timezone
 from typing import List, Tuple, Any, Dict, Optional
 from datetime import timedelta
-from application.models import VoterList
+from application.models import VoterList, VoterSegment
+from application.utils.segments import segment_voter_ids
 from ..models import VoterChatMessage
 from logger import logger
 
@@ -60,6 +61,8 @@ def get_recipients_from_request(request) -> Tuple[List[Any], List[str]]:
     Resolve request into a list of recipient objects (VoterList instances).
     Accepts:
       - voter_list_id (single) OR voter_list_ids (list)
+      - segment_id: a saved segment, its materialized members are loaded
+        in one query (the segment filter is not re-evaluated)
     Returns:
       - recipients: list of VoterList instances (skips missing ids)
       - errors: list of non-fatal error messages to return to frontend
@@ -68,6 +71,15 @@ def get_recipients_from_request(request) -> Tuple[List[Any], List[str]]:
     recipients: List[Any] = []
     errors: List[str] = []
 
+    segment_id = data.get("segment_id")
+    if segment_id:
+        try:
+            ids = segment_voter_ids(segment_id, request.user)
+        except VoterSegment.DoesNotExist:
+            return [], [f"Segment {segment_id} not found"]
+        recipients = list(VoterList.objects.filter(voter_list_id__in=ids).order_by("sr_no"))
+        return recipients, errors
+
     voter_list_ids = data.get("voter_list_ids") or data.get("voter_list_id")
     if voter_list_ids is None:
         return [], ["voter_list_id or voter_list_ids required"]